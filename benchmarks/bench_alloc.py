@@ -0,0 +1,83 @@
+"""Steady-state allocation benchmark (fails above the thresholds).
+
+Plays seeded bot games headlessly, skips a warm-up, then measures every
+tick with AllocationMonitor. Exits with status 1 if any threshold is
+exceeded, so it can gate changes to the hot loop.
+
+Usage:
+    python benchmarks/bench_alloc.py [--games 3] [--ticks 3000]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.bots import GreedyBot  # noqa: E402
+from game.config import game_config  # noqa: E402
+from game.memstats import AllocationMonitor  # noqa: E402
+from game.play_state import PlayState  # noqa: E402
+
+# Limits per steady-state tick
+MAX_NET_BLOCKS = 1.0        # live blocks may not keep growing
+MAX_TRANSIENT_KIB = 4.0     # temporary containers built and dropped per tick
+MAX_GEN2_PER_1000 = 0.0     # no full collections while playing
+
+
+def measure(games: int, ticks: int, warmup: int) -> AllocationMonitor:
+    """Run the games and return the monitor with steady-state totals."""
+    width = game_config.get("board", "width", default=240)
+    height = game_config.get("board", "height", default=200)
+    drop_y = game_config.get("board", "drop_y", default=40)
+
+    monitor = AllocationMonitor()
+    monitor.start()
+    try:
+        for game in range(games):
+            state = PlayState(width, height, drop_y, seed=game)
+            bot = GreedyBot(game, think_ticks=15)
+            for tick in range(warmup + ticks):
+                if state.game_over:
+                    break
+                drop_x = bot.choose(state)
+                if tick < warmup:
+                    state.step(drop_x)
+                    continue
+                monitor.begin_frame()
+                state.step(drop_x)
+                monitor.end_frame()
+    finally:
+        monitor.stop()
+    return monitor
+
+
+def main(argv=None) -> int:
+    """Run the benchmark; returns the process exit status."""
+    parser = argparse.ArgumentParser(description="Steady-state allocation benchmark")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--ticks", type=int, default=3000, help="measured ticks per game")
+    parser.add_argument("--warmup", type=int, default=300, help="unmeasured ticks per game")
+    args = parser.parse_args(argv)
+
+    monitor = measure(args.games, args.ticks, args.warmup)
+    print(monitor.report())
+
+    gen2_rate = monitor.collections[2] * 1000 / max(monitor.frames, 1)
+    failures = []
+    if monitor.net_blocks_per_frame > MAX_NET_BLOCKS:
+        failures.append(f"net blocks/frame {monitor.net_blocks_per_frame:.2f} > {MAX_NET_BLOCKS}")
+    if monitor.transient_kib_per_frame > MAX_TRANSIENT_KIB:
+        failures.append(f"transient KiB/frame {monitor.transient_kib_per_frame:.2f} "
+                        f"> {MAX_TRANSIENT_KIB}")
+    if gen2_rate > MAX_GEN2_PER_1000:
+        failures.append(f"gen2 collections/1000 frames {gen2_rate:.1f} > {MAX_GEN2_PER_1000}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
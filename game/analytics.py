@@ -0,0 +1,261 @@
+"""Offline streaming analyzer for gameplay event logs.
+
+Reads any number of event logs (see game.events) one event at a time and
+keeps only fixed-size per-config accumulators, so archives far larger than
+memory can be summarized in a single pass.
+
+Usage:
+    python -m game.analytics logs/*.bin --csv summary.csv --npz summary.npz
+"""
+import argparse
+import csv
+import glob
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from game.events import iter_events
+from game.play_state import PlayState
+
+# Config values copied into the summary so variants can be compared side by side
+CONFIG_COLUMNS = [
+    ("freshness", "spawn_min"),
+    ("freshness", "spawn_max"),
+    ("freshness", "decay_base"),
+    ("freshness", "decay_stage_mult"),
+    ("freshness", "merge_bonus"),
+    ("freshness", "fresh_cap"),
+    ("rot", "rotten_threshold"),
+    ("rot", "rot_rate"),
+    ("score", "fresh_to_score"),
+    ("score", "count_bonus"),
+    ("game_over", "grace_ms"),
+]
+
+
+class ConfigAggregate:
+    """Running totals for every session played with one config."""
+
+    def __init__(self, config_id: str, config: Dict[str, Any], num_stages: int,
+                 num_bins: int):
+        """
+        Initialize empty totals.
+
+        Args:
+            config_id: GameConfig fingerprint
+            config: Config dict recorded at session start
+            num_stages: Length of the fruit ladder
+            num_bins: Number of delivery freshness histogram bins
+        """
+        self.config_id = config_id
+        self.config = config
+        self.sessions = 0
+        self.ended: Dict[str, int] = {}
+        self.ticks = 0
+        self.score_sum = 0
+        self.scored_sessions = 0
+        self.drops = 0
+        self.deliveries = 0
+        self.rotten_deliveries = 0
+        self.board_rot_events = 0
+        self.first_mikan_sessions = 0
+        self.first_mikan_ticks = 0
+        self.merges_by_stage = [0] * num_stages
+        self.fresh_hist = [0] * num_bins
+
+
+class SessionAnalyzer:
+    """Single-pass, bounded-memory aggregation of event logs by config."""
+
+    def __init__(self, bin_width: float = 5.0, max_fresh: float = 200.0):
+        """
+        Initialize analyzer.
+
+        Args:
+            bin_width: Freshness-at-delivery histogram bin width
+            max_fresh: Upper edge of the histogram (higher values land in the last bin)
+        """
+        self.bin_width = bin_width
+        self.num_bins = int(np.ceil(max_fresh / bin_width))
+        self.aggregates: Dict[str, ConfigAggregate] = {}
+
+        # Per-session state
+        self._current: Optional[ConfigAggregate] = None
+        self._first_mikan_tick: Optional[int] = None
+        self._last_tick = 0
+        self._session_events = 0
+
+    def add_file(self, path: str) -> None:
+        """Stream one event log into the aggregates."""
+        self.feed(iter_events(path))
+
+    def feed(self, events: Iterable[Tuple[str, int, Dict[str, Any]]]) -> None:
+        """
+        Stream events into the aggregates.
+
+        Args:
+            events: (kind, tick, fields) tuples in log order
+        """
+        for kind, tick, fields in events:
+            aggregate = self._current
+            if kind == "session_start":
+                self._finish_session("unfinished")
+                self._start_session(fields)
+                continue
+            if aggregate is None:
+                continue  # events before any session_start (truncated head)
+
+            self._last_tick = tick
+            self._session_events += 1
+            if kind == "merge":
+                stage = fields["stage"]
+                if stage < len(aggregate.merges_by_stage):
+                    aggregate.merges_by_stage[stage] += 1
+            elif kind == "deliver":
+                aggregate.deliveries += 1
+                if fields["rotten"]:
+                    aggregate.rotten_deliveries += 1
+                index = min(int(fields["fresh"] // self.bin_width), self.num_bins - 1)
+                aggregate.fresh_hist[max(index, 0)] += 1
+                if self._first_mikan_tick is None:
+                    self._first_mikan_tick = tick
+            elif kind == "drop":
+                aggregate.drops += 1
+            elif kind == "rot":
+                aggregate.board_rot_events += 1
+            elif kind == "end":
+                aggregate.score_sum += fields["score"]
+                aggregate.scored_sessions += 1
+                self._finish_session(fields["reason"])
+
+        self._finish_session("unfinished")
+
+    def _start_session(self, fields: Dict[str, Any]) -> None:
+        """Begin tracking a session."""
+        config_id = fields["config_id"]
+        aggregate = self.aggregates.get(config_id)
+        if aggregate is None:
+            config = fields.get("config", {})
+            num_stages = len(config.get("fruits", [])) or 6
+            aggregate = ConfigAggregate(config_id, config, num_stages, self.num_bins)
+            self.aggregates[config_id] = aggregate
+        self._current = aggregate
+        self._first_mikan_tick = None
+        self._last_tick = 0
+        self._session_events = 0
+
+    def _finish_session(self, reason: str) -> None:
+        """Fold the current session into its config's totals."""
+        aggregate = self._current
+        self._current = None
+        if aggregate is None:
+            return
+        if reason == "unfinished" and not self._session_events:
+            return  # started but never played (e.g. app closed on the title screen)
+
+        aggregate.sessions += 1
+        aggregate.ended[reason] = aggregate.ended.get(reason, 0) + 1
+        aggregate.ticks += self._last_tick
+        if self._first_mikan_tick is not None:
+            aggregate.first_mikan_sessions += 1
+            aggregate.first_mikan_ticks += self._first_mikan_tick
+
+    def _percentile(self, hist: np.ndarray, q: float) -> float:
+        """Approximate percentile (bin upper edge) from a histogram."""
+        total = hist.sum()
+        if total == 0:
+            return float("nan")
+        index = int(np.searchsorted(np.cumsum(hist), q * total))
+        return (index + 1) * self.bin_width
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One summary row per config."""
+        rows = []
+        for aggregate in self.aggregates.values():
+            sessions = max(aggregate.sessions, 1)
+            hist = np.asarray(aggregate.fresh_hist, dtype=np.int64)
+            row = {
+                "config_id": aggregate.config_id,
+                "sessions": aggregate.sessions,
+                "jammed": aggregate.ended.get("JAMMED!", 0),
+                "shipped": aggregate.ended.get("SHIPPED OUT", 0),
+                "unfinished": aggregate.ended.get("unfinished", 0),
+                "mean_score": aggregate.score_sum / max(aggregate.scored_sessions, 1),
+                "mean_seconds": aggregate.ticks * PlayState.TICK_DT / sessions,
+                "drops_per_session": aggregate.drops / sessions,
+                "deliveries": aggregate.deliveries,
+                "rotten_fraction": (aggregate.rotten_deliveries / aggregate.deliveries
+                                    if aggregate.deliveries else 0.0),
+                "board_rot_per_session": aggregate.board_rot_events / sessions,
+                "first_mikan_fraction": aggregate.first_mikan_sessions / sessions,
+                "first_mikan_seconds": (aggregate.first_mikan_ticks * PlayState.TICK_DT
+                                        / aggregate.first_mikan_sessions
+                                        if aggregate.first_mikan_sessions else float("nan")),
+                "fresh_p10": self._percentile(hist, 0.1),
+                "fresh_p50": self._percentile(hist, 0.5),
+                "fresh_p90": self._percentile(hist, 0.9),
+            }
+            for stage, count in enumerate(aggregate.merges_by_stage):
+                row[f"merges_stage{stage}"] = count / sessions
+            for category, key in CONFIG_COLUMNS:
+                row[f"{category}.{key}"] = aggregate.config.get(category, {}).get(key)
+            rows.append(row)
+        return rows
+
+    def write_csv(self, path: str) -> None:
+        """Write the summary table as CSV."""
+        rows = self.rows()
+        fieldnames: List[str] = []
+        for row in rows:
+            fieldnames.extend(name for name in row if name not in fieldnames)
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def write_npz(self, path: str) -> None:
+        """Write summary arrays (one row per config) as a compressed .npz."""
+        aggregates = list(self.aggregates.values())
+        num_stages = max((len(a.merges_by_stage) for a in aggregates), default=0)
+
+        merges = np.zeros((len(aggregates), num_stages), dtype=np.float64)
+        for row, aggregate in enumerate(aggregates):
+            merges[row, :len(aggregate.merges_by_stage)] = aggregate.merges_by_stage
+            merges[row] /= max(aggregate.sessions, 1)
+
+        np.savez_compressed(
+            path,
+            config_id=np.array([a.config_id for a in aggregates]),
+            sessions=np.array([a.sessions for a in aggregates], dtype=np.int64),
+            deliveries=np.array([a.deliveries for a in aggregates], dtype=np.int64),
+            rotten_deliveries=np.array([a.rotten_deliveries for a in aggregates], dtype=np.int64),
+            merges_per_session=merges,
+            fresh_hist=np.array([a.fresh_hist for a in aggregates], dtype=np.int64),
+            fresh_bin_edges=np.arange(self.num_bins + 1) * self.bin_width,
+        )
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Summarize gameplay event logs by config")
+    parser.add_argument("logs", nargs="+", help="event log files or glob patterns")
+    parser.add_argument("--csv", default="summary.csv", help="summary CSV path")
+    parser.add_argument("--npz", help="also write NumPy arrays to this .npz")
+    parser.add_argument("--bin-width", type=float, default=5.0,
+                        help="freshness histogram bin width")
+    args = parser.parse_args(argv)
+
+    analyzer = SessionAnalyzer(bin_width=args.bin_width)
+    for pattern in args.logs:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            analyzer.add_file(path)
+
+    analyzer.write_csv(args.csv)
+    if args.npz:
+        analyzer.write_npz(args.npz)
+    print(f"{len(analyzer.aggregates)} configs summarized to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,20 @@
 """Main application with Pyxel initialization and scene management."""
+import atexit
+import time
 import pyxel
+from game import font
+from game.asset_bundle import BUNDLE_PATH, AssetBundle
+from game.config import game_config
+from game.events import EventLogWriter
+from game.lockstep import LockstepLink, LockstepMatch
+from game.memstats import AllocationMonitor, GCPolicy
+from game.replay_archive import ReplayWriter
 from game.scene_title import TitleScene
 from game.scene_play import PlayScene
 from game.scene_result import ResultScene
+from game.scene_spectate import SpectateScene
+from game.scene_versus import VersusScene
+from game.spectator import LoopbackBroadcaster, StatePublisher
 
 
 class App:
@@ -12,21 +24,99 @@ class App:
     WIDTH = 256
     HEIGHT = 256
 
-    def __init__(self):
-        """Initialize the application."""
+    # Scenes where a game is being played (collector policy applies)
+    GAME_SCENES = ("play", "versus")
+
+    def __init__(self, stream: str = None, spectate: str = None, event_log: str = None,
+                 versus: LockstepLink = None, mem_stats: bool = False,
+                 gc_policy: GCPolicy = None, physics_worker: bool = False,
+                 load_times: bool = False, archive: str = None, autoplay=None):
+        """
+        Initialize the application.
+
+        Args:
+            stream: Address to publish the live play state on (for spectators)
+            spectate: Address of a live game to watch instead of playing
+            event_log: Path to write gameplay events to (.jsonl or .bin)
+            versus: Link to a lockstep versus opponent (starts a versus match)
+            mem_stats: Measure allocations and collections per frame, report
+                memory growth at scene changes and a summary at exit
+            gc_policy: Collector settings applied while a game is played
+            physics_worker: Simulate the play board in a worker process
+            load_times: Print startup and scene switch times
+            archive: Append every played game to this replay archive
+            autoplay: Bot or ReplayPlayer that plays the board instead of the mouse
+        """
+        start = time.perf_counter()
+
         # Initialize Pyxel
         pyxel.init(self.WIDTH, self.HEIGHT, title="Wakayama Mikan Delivery (Beta)")
         pyxel.mouse(True)
 
+        # Index the font and build the glyph atlas before the first frame
+        font.text_renderer()
+
+        # Packed sprites/sound (sections are loaded per scene)
+        self.assets = AssetBundle(game_config.get("assets", "bundle", default=BUNDLE_PATH),
+                                  max_kib=game_config.get("assets", "cache_kib", default=8192))
+
+        # Spectator stream
+        self.publisher = None
+        if stream:
+            self.publisher = StatePublisher(LoopbackBroadcaster(stream))
+
+        # Replay archive (closed at exit so the footer index gets written)
+        self.archive = None
+        if archive and not physics_worker:
+            self.archive = ReplayWriter(archive, game_config.get(
+                "replay", "keyframe_interval", default=300))
+            atexit.register(self.archive.close)
+
         # Initialize scenes
         self.scenes = {
             "title": TitleScene(self),
-            "play": PlayScene(self),
+            "play": PlayScene(self, self.publisher, physics_worker=physics_worker,
+                              event_log=event_log, archive=self.archive, autoplay=autoplay),
             "result": ResultScene(self),
         }
 
         self.current_scene_name = "title"
 
+        # Gameplay event log
+        self.event_log = None
+        if event_log and not physics_worker:  # the worker writes its own log
+            self.event_log = EventLogWriter(event_log)
+            self.scenes["play"].state.events.subscribe(self.event_log)
+            atexit.register(self.event_log.close)
+
+        if spectate:
+            self.scenes["spectate"] = SpectateScene(self, spectate)
+            self.current_scene_name = "spectate"
+
+        if versus:
+            self.scenes["versus"] = VersusScene(self, LockstepMatch(versus))
+            self.current_scene_name = "versus"
+
+        # Memory instrumentation
+        self.gc_policy = gc_policy
+        self.mem_monitor = None
+        if mem_stats:
+            self.mem_monitor = AllocationMonitor()
+            self.mem_monitor.start()
+            self.mem_monitor.snapshot(self.current_scene_name)
+            atexit.register(self._print_mem_report)
+        if self.gc_policy and self.current_scene_name in self.GAME_SCENES:
+            self.gc_policy.enter()
+
+        if physics_worker:
+            atexit.register(self.scenes["play"].state.close)
+
+        self.load_times = load_times
+        asset_seconds = self.assets.enter(self.current_scene_name)
+        if load_times:
+            print(f"Startup: {(time.perf_counter() - start) * 1000:.1f} ms "
+                  f"(assets {asset_seconds * 1000:.1f} ms, {len(self.assets.entries)} in bundle)")
+
     def change_scene(self, scene_name: str) -> None:
         """
         Change to a different scene.
@@ -35,14 +125,34 @@ class App:
             scene_name: Name of scene to switch to
         """
         if scene_name in self.scenes:
+            start = time.perf_counter()
+            asset_seconds = self.assets.enter(scene_name)
+
+            if self.gc_policy:
+                if scene_name in self.GAME_SCENES:
+                    self.gc_policy.enter()
+                else:
+                    self.gc_policy.exit()
+
+            if self.mem_monitor:
+                report = self.mem_monitor.snapshot(scene_name)
+                if report:
+                    print(report)
+
             self.current_scene_name = scene_name
 
             # Reset play scene when entering
             if scene_name == "play":
                 self.scenes["play"].reset()
 
+            if self.load_times:
+                print(f"Scene {scene_name}: {(time.perf_counter() - start) * 1000:.1f} ms "
+                      f"(assets {asset_seconds * 1000:.1f} ms)")
+
     def update(self) -> None:
         """Update current scene."""
+        if self.mem_monitor:
+            self.mem_monitor.begin_frame()
         current_scene = self.scenes[self.current_scene_name]
         current_scene.update()
 
@@ -50,6 +160,12 @@ class App:
         """Draw current scene."""
         current_scene = self.scenes[self.current_scene_name]
         current_scene.draw()
+        if self.mem_monitor:
+            self.mem_monitor.end_frame()
+
+    def _print_mem_report(self) -> None:
+        """Print the per-frame memory summary (at exit)."""
+        print(self.mem_monitor.report())
 
     def run(self) -> None:
         """Start the application."""
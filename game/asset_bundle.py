@@ -0,0 +1,283 @@
+"""Packed asset bundle: one indexed archive for sprites and sound, loaded per scene.
+
+Sources live under ``assets/``::
+
+    assets/sprites/<section>/<name>.png   (sprites/<name>.png -> section "common")
+    assets/sfx/<section>/<name>.json      {"notes", "tones", "volumes", "effects", "speed"}
+                                          or {"mml": "..."}
+
+``build_bundle()`` decodes them into ``assets/bundle.pak`` (sprites as
+palette-indexed pixels, sounds as their settings) so loading is a read, an
+inflate and a copy. Entries whose source bytes hash the same as last time
+are copied over from the previous bundle without decoding.
+
+``AssetBundle`` reads only the index at startup; a section's entries are
+loaded the first time the section (a scene, or "common") is entered, and
+loaded sections are kept in an LRU bounded by their decoded size.
+
+File layout: header (magic, version, index offset), zlib-compressed entry
+payloads, then the JSON index.
+"""
+import ctypes
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+import pyxel
+
+SOURCE_DIR = "assets"
+BUNDLE_PATH = "assets/bundle.pak"
+
+MAGIC = b"MKAB"
+VERSION = 1
+_HEADER = struct.Struct("<4sHQ")  # magic, version, index offset
+
+# Source folders: kind and accepted file extensions
+SOURCE_KINDS = {
+    "sprites": ("image", (".png", ".gif", ".jpg")),
+    "sfx": ("sound", (".json",)),
+}
+COMMON_SECTION = "common"
+
+
+def find_sources(source_dir: str = SOURCE_DIR) -> Dict[str, Tuple[str, str, str]]:
+    """
+    List the asset source files.
+
+    Args:
+        source_dir: Assets folder
+
+    Returns:
+        Dict of entry name ("sprites/play/mikan") -> (path, kind, section)
+    """
+    sources = {}
+    for folder, (kind, extensions) in SOURCE_KINDS.items():
+        root = os.path.join(source_dir, folder)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() not in extensions:
+                    continue
+                path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(os.path.join(dirpath, stem), source_dir)
+                parts = relative.replace(os.sep, "/").split("/")
+                section = parts[1] if len(parts) > 2 else COMMON_SECTION
+                sources["/".join(parts)] = (path, kind, section)
+    return sources
+
+
+def build_bundle(source_dir: str = SOURCE_DIR,
+                 bundle_path: str = BUNDLE_PATH) -> Tuple[int, int, int]:
+    """
+    Pack the asset sources into a bundle, re-decoding only changed files.
+
+    Args:
+        source_dir: Assets folder
+        bundle_path: Bundle to write (its previous contents are reused)
+
+    Returns:
+        (entries decoded, entries reused, entries removed)
+    """
+    previous = AssetBundle(bundle_path)
+    sources = find_sources(source_dir)
+    built = reused = 0
+    index = {}
+
+    temp_path = bundle_path + ".tmp"
+    with open(temp_path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, VERSION, 0))
+        for name in sorted(sources):
+            path, kind, section = sources[name]
+            with open(path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+
+            old = previous.entries.get(name)
+            if old and old["hash"] == digest and old["kind"] == kind:
+                meta = dict(old)
+                payload = previous.read_payload(old)
+                reused += 1
+            else:
+                meta, data = _decode(kind, path)
+                payload = zlib.compress(data, 6)
+                built += 1
+
+            meta.update(kind=kind, section=section, hash=digest,
+                        offset=out.tell(), size=len(payload))
+            index[name] = meta
+            out.write(payload)
+
+        index_offset = out.tell()
+        out.write(json.dumps({"entries": index}, separators=(",", ":")).encode("utf-8"))
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, VERSION, index_offset))
+
+    os.replace(temp_path, bundle_path)
+    removed = len(set(previous.entries) - set(index))
+    return built, reused, removed
+
+
+def _decode(kind: str, path: str) -> Tuple[dict, bytes]:
+    """
+    Decode a source file into bundle form.
+
+    Returns:
+        (index metadata, payload before compression)
+    """
+    if kind == "image":
+        image = pyxel.Image.from_image(path)  # Maps colors to the palette
+        size = image.width * image.height
+        return {"width": image.width, "height": image.height, "raw": size}, bytes(image.data_ptr()[:size])
+
+    with open(path, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    data = json.dumps(settings, separators=(",", ":")).encode("utf-8")
+    return {"raw": len(data)}, data
+
+
+class AssetBundle:
+    """Reads a packed bundle, loading sections on demand (LRU by decoded size)."""
+
+    def __init__(self, path: str = BUNDLE_PATH, max_kib: int = 8192):
+        """
+        Read the bundle index (a missing bundle is treated as empty).
+
+        Args:
+            path: Bundle file
+            max_kib: Decoded size of loaded sections to keep
+        """
+        self.path = path
+        self.max_bytes = max_kib * 1024
+        self.entries: Dict[str, dict] = {}
+        self.sections: Dict[str, List[str]] = {}
+
+        try:
+            with open(path, "rb") as f:
+                magic, version, index_offset = _HEADER.unpack(f.read(_HEADER.size))
+                if magic == MAGIC and version == VERSION:
+                    f.seek(index_offset)
+                    self.entries = json.loads(f.read().decode("utf-8"))["entries"]
+                else:
+                    print(f"Ignoring asset bundle {path}: unknown format")
+        except FileNotFoundError:
+            pass
+
+        for name, meta in self.entries.items():
+            self.sections.setdefault(meta["section"], []).append(name)
+
+        self._loaded: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        self._section_bytes: Dict[str, int] = {}
+        self.loaded_bytes = 0
+        self.load_seconds = 0.0  # Total time spent loading sections
+
+    def read_payload(self, meta: dict) -> bytes:
+        """Read an entry's compressed payload."""
+        with open(self.path, "rb") as f:
+            f.seek(meta["offset"])
+            return f.read(meta["size"])
+
+    def enter(self, scene: str) -> float:
+        """
+        Make sure the common section and a scene's section are loaded.
+
+        Args:
+            scene: Scene name (also its section name)
+
+        Returns:
+            Seconds spent loading (0 if both were already loaded)
+        """
+        keep = (COMMON_SECTION, scene)
+        return sum(self.load_section(section, keep) for section in keep)
+
+    def load_section(self, section: str, keep: Tuple[str, ...] = ()) -> float:
+        """
+        Load every entry of a section (no-op if loaded or absent).
+
+        Args:
+            section: Section name
+            keep: Sections that must not be evicted to make room
+
+        Returns:
+            Seconds spent loading
+        """
+        if section in self._loaded:
+            self._loaded.move_to_end(section)
+            return 0.0
+        names = self.sections.get(section)
+        if not names:
+            return 0.0
+
+        start = time.perf_counter()
+        objects = {}
+        size = 0
+        with open(self.path, "rb") as f:
+            for name in names:
+                meta = self.entries[name]
+                f.seek(meta["offset"])
+                data = zlib.decompress(f.read(meta["size"]))
+                objects[name] = self._build(meta, data)
+                size += len(data)
+
+        self._loaded[section] = objects
+        self._section_bytes[section] = size
+        self.loaded_bytes += size
+        self._evict(keep + (section,))
+
+        seconds = time.perf_counter() - start
+        self.load_seconds += seconds
+        return seconds
+
+    def get(self, name: str):
+        """
+        Get a loaded asset, loading its section if needed.
+
+        Args:
+            name: Entry name, e.g. "sprites/play/mikan"
+
+        Returns:
+            pyxel.Image or pyxel.Sound
+
+        Raises:
+            KeyError: If the bundle has no such entry
+        """
+        section = self.entries[name]["section"]
+        self.load_section(section, (section,))
+        return self._loaded[section][name]
+
+    def image(self, name: str) -> pyxel.Image:
+        """Get a sprite by name without the folder ("play/mikan")."""
+        return self.get(f"sprites/{name}")
+
+    def sound(self, name: str) -> pyxel.Sound:
+        """Get a sound by name without the folder ("play/merge")."""
+        return self.get(f"sfx/{name}")
+
+    def _build(self, meta: dict, data: bytes):
+        """Create the Pyxel object for a decoded payload."""
+        if meta["kind"] == "image":
+            image = pyxel.Image(meta["width"], meta["height"])
+            ctypes.memmove(image.data_ptr(), data, len(data))
+            return image
+
+        settings = json.loads(data.decode("utf-8"))
+        sound = pyxel.Sound()
+        if "mml" in settings:
+            sound.mml(settings["mml"])
+        else:
+            sound.set(settings["notes"], settings.get("tones", "p"),
+                      settings.get("volumes", "7"), settings.get("effects", "n"),
+                      settings.get("speed", 30))
+        return sound
+
+    def _evict(self, keep: Tuple[str, ...]) -> None:
+        """Drop least recently used sections until under the size budget."""
+        for section in list(self._loaded):
+            if self.loaded_bytes <= self.max_bytes:
+                break
+            if section in keep:
+                continue
+            del self._loaded[section]
+            self.loaded_bytes -= self._section_bytes.pop(section)
@@ -0,0 +1,64 @@
+"""Simple scripted players for headless runs, versus matches and benchmarks."""
+import random
+from typing import Optional
+
+
+class GreedyBot:
+    """Drops onto the highest fruit of the same stage, or somewhere random."""
+
+    def __init__(self, seed: Optional[int] = None, think_ticks: int = 20,
+                 ship_after: Optional[int] = None):
+        """
+        Initialize bot.
+
+        Args:
+            seed: Seed for the bot's own choices
+            think_ticks: Ticks to wait before each drop
+            ship_after: Ship out at this tick (play until jammed if None)
+        """
+        self.rng = random.Random(seed)
+        self.think_ticks = think_ticks
+        self.ship_after = ship_after
+        self._wait = think_ticks
+
+    def start(self, state) -> None:
+        """Get ready for a new game on a board."""
+        self._wait = self.think_ticks
+
+    def should_ship(self, state) -> bool:
+        """Check if the bot wants to end its game now."""
+        return self.ship_after is not None and state.tick >= self.ship_after
+
+    def skip(self, ticks: int) -> None:
+        """
+        Count ticks that passed without choose() being called (e.g. during
+        PlayState.settle()) toward the delay before the next drop.
+
+        Args:
+            ticks: Ticks that passed while a drop was allowed
+        """
+        if ticks > 0:
+            self._wait = max(1, self._wait - ticks)
+
+    def choose(self, state) -> Optional[int]:
+        """
+        Pick a drop position.
+
+        Args:
+            state: The bot's PlayState
+
+        Returns:
+            Drop X, or None to wait
+        """
+        if not state.can_drop():
+            return None
+        self._wait -= 1
+        if self._wait > 0:
+            return None
+        self._wait = self.think_ticks
+
+        stage = state.next_fruit.stage
+        targets = [f for f in state.fruits if f.stage == stage]
+        if targets:
+            return int(min(targets, key=lambda f: f.y).x)
+        return self.rng.randint(0, state.width)
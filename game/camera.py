@@ -0,0 +1,83 @@
+"""Camera mapping a (possibly large) play area onto a screen viewport."""
+from typing import Tuple
+
+
+class Camera:
+    """Zoomable, scrollable view of the play area."""
+
+    MIN_ZOOM = 0.05
+    MAX_ZOOM = 4.0
+
+    def __init__(self, view_x: int, view_y: int, view_w: int, view_h: int,
+                 world_w: float, world_h: float):
+        """
+        Initialize camera.
+
+        Args:
+            view_x, view_y: Top-left of the viewport on screen
+            view_w, view_h: Viewport size on screen
+            world_w, world_h: Play area size
+        """
+        self.view_x = view_x
+        self.view_y = view_y
+        self.view_w = view_w
+        self.view_h = view_h
+        self.world_w = world_w
+        self.world_h = world_h
+        self.zoom = 1.0
+        self.scroll_x = 0.0  # World position at the viewport's top-left
+        self.scroll_y = 0.0
+        self.fit()
+
+    def fit(self) -> None:
+        """Show the whole play area (never magnify a board that already fits)."""
+        self.zoom = min(1.0, self.view_w / self.world_w, self.view_h / self.world_h)
+        self.scroll_x = 0.0
+        self.scroll_y = 0.0
+        self._clamp()
+
+    def to_screen(self, x: float, y: float) -> Tuple[float, float]:
+        """Convert a play area position to screen coordinates."""
+        return (self.view_x + (x - self.scroll_x) * self.zoom,
+                self.view_y + (y - self.scroll_y) * self.zoom)
+
+    def to_world_x(self, screen_x: float) -> float:
+        """Convert a screen X coordinate to a play area X."""
+        return self.scroll_x + (screen_x - self.view_x) / self.zoom
+
+    def scale(self, length: float) -> float:
+        """Convert a play area length to screen pixels."""
+        return length * self.zoom
+
+    def is_visible(self, x: float, y: float, radius: float) -> bool:
+        """Check if a circle overlaps the viewport."""
+        return (self.scroll_x - radius < x < self.scroll_x + self.view_w / self.zoom + radius
+                and self.scroll_y - radius < y < self.scroll_y + self.view_h / self.zoom + radius)
+
+    def zoom_by(self, factor: float, screen_x: float, screen_y: float) -> None:
+        """
+        Zoom keeping the play area point under a screen position fixed.
+
+        Args:
+            factor: Zoom multiplier (>1 zooms in)
+            screen_x, screen_y: Anchor on screen (e.g. the mouse)
+        """
+        world_x = self.scroll_x + (screen_x - self.view_x) / self.zoom
+        world_y = self.scroll_y + (screen_y - self.view_y) / self.zoom
+        self.zoom = max(self.MIN_ZOOM, min(self.MAX_ZOOM, self.zoom * factor))
+        self.scroll_x = world_x - (screen_x - self.view_x) / self.zoom
+        self.scroll_y = world_y - (screen_y - self.view_y) / self.zoom
+        self._clamp()
+
+    def scroll_by(self, dx: float, dy: float) -> None:
+        """Scroll by a number of screen pixels."""
+        self.scroll_x += dx / self.zoom
+        self.scroll_y += dy / self.zoom
+        self._clamp()
+
+    def _clamp(self) -> None:
+        """Keep the viewport inside the play area where possible."""
+        max_x = max(0.0, self.world_w - self.view_w / self.zoom)
+        max_y = max(0.0, self.world_h - self.view_h / self.zoom)
+        self.scroll_x = max(0.0, min(max_x, self.scroll_x))
+        self.scroll_y = max(0.0, min(max_y, self.scroll_y))
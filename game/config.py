@@ -1,4 +1,5 @@
 """Configuration management for the game."""
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -14,6 +15,7 @@ class GameConfig:
         """Initialize with default configuration."""
         self.config: Dict[str, Any] = {}
         self.config_path = self.DEFAULT_CONFIG_PATH
+        self.revision = 0  # Bumped on every change so derived tables can recompile
         self.load()
 
     def load(self, path: str = None) -> None:
@@ -21,6 +23,8 @@ class GameConfig:
         if path:
             self.config_path = path
 
+        self.revision += 1
+
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 self.config = json.load(f)
@@ -47,6 +51,7 @@ class GameConfig:
 
     def _load_defaults(self) -> None:
         """Load hardcoded default configuration."""
+        self.revision += 1
         self.config = {
             "freshness": {
                 "fresh_max": 100,
@@ -70,11 +75,21 @@ class GameConfig:
                 "line_y": 0.2,
                 "grace_ms": 3000
             },
+            "board": {
+                "width": 240,
+                "height": 200,
+                "drop_y": 40,
+                "spawn_y": 50,
+                "spawn_stage_min": 0,
+                "spawn_stage_max": 2
+            },
             "physics": {
                 "gravity": 300.0,
                 "bounce": 0.3,
                 "friction": 0.98,
-                "merge_cooldown": 0.5
+                "merge_cooldown": 0.5,
+                "sleep_speed": 12.0,
+                "sleep_time": 0.5
             },
             "fruits": [
                 {"name": "ume", "display_name": "梅", "radius": 12, "color": 10},
@@ -101,11 +116,22 @@ class GameConfig:
                 return default
         return value
 
+    def fingerprint(self) -> str:
+        """Short stable hash of the current configuration (identifies balance variants)."""
+        encoded = json.dumps(self.config, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:12]
+
+    def replace(self, config: Dict[str, Any]) -> None:
+        """Replace the whole configuration (e.g. with a copy from another process)."""
+        self.revision += 1
+        self.config = config
+
     def set(self, *keys, value) -> None:
         """Set nested configuration value."""
         if not keys:
             return
 
+        self.revision += 1
         config = self.config
         for key in keys[:-1]:
             if key not in config:
@@ -0,0 +1,392 @@
+"""Gym-style environments for training drop policies.
+
+``MikanEnv`` wraps one PlayState:
+
+- ``reset(seed)`` starts a game and returns the first observation
+- ``step(drop_x)`` drops the waiting fruit at ``drop_x`` (``None`` ships
+  out) and simulates until the next drop is possible; it returns
+  ``(observation, reward, done, info)`` where reward is the change in
+  ``ScoreTracker.get_score`` and done means the board jammed or was shipped
+
+Observations are dicts of fixed-size float32 arrays written in place into
+preallocated buffers (the same arrays are returned every step):
+
+- ``fruits`` (max_fruits, 4): stage, x / width, y / height, fresh / fresh_max
+  per board fruit; unused rows have stage -1
+- ``grid`` (rows, cols): 1 where a cell center lies inside a fruit
+- ``next`` (1 + preview, 2): stage and fresh / fresh_max of the waiting
+  fruit and the upcoming spawns
+
+``VecEnv`` steps many environments in worker processes; observations,
+rewards and done flags live in one shared memory block, so results are
+read without copying or unpickling.
+"""
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game.config import game_config
+from game.play_state import PlayState
+
+Observation = Dict[str, np.ndarray]
+
+
+def observation_shapes(max_fruits: int = 64, grid_shape: Tuple[int, int] = (20, 24),
+                       preview: int = 2) -> Dict[str, Tuple[int, ...]]:
+    """
+    Observation array shapes for the given settings.
+
+    Returns:
+        Dict of key -> shape (all float32)
+    """
+    return {"fruits": (max_fruits, 4), "grid": tuple(grid_shape), "next": (1 + preview, 2)}
+
+
+class MikanEnv:
+    """One board as a reinforcement learning environment."""
+
+    def __init__(self, max_fruits: int = 64, grid_shape: Tuple[int, int] = (20, 24),
+                 preview: int = 2, ticks_per_action: int = 15, max_ticks: int = 5400,
+                 out: Optional[Observation] = None):
+        """
+        Initialize environment.
+
+        Args:
+            max_fruits: Rows in the fruit table (fruits beyond it are left out)
+            grid_shape: Occupancy grid (rows, cols) over the board
+            preview: Upcoming spawns included after the waiting fruit
+            ticks_per_action: Minimum ticks simulated per step (15 = the drop
+                cooldown; steps always wait for the cooldown to pass)
+            max_ticks: Ship out after this many ticks
+            out: Arrays to write observations into (allocated if None)
+        """
+        self.width = game_config.get("board", "width", default=240)
+        self.height = game_config.get("board", "height", default=200)
+        drop_y = game_config.get("board", "drop_y", default=40)
+        self.state = PlayState(self.width, self.height, drop_y)
+        self.ticks_per_action = ticks_per_action
+        self.max_ticks = max_ticks
+        self.preview = preview
+
+        shapes = observation_shapes(max_fruits, grid_shape, preview)
+        if out is None:
+            out = {key: np.zeros(shape, dtype=np.float32) for key, shape in shapes.items()}
+        self.observation = out
+        self._fruits = out["fruits"]
+        self._grid = out["grid"]
+        self._next = out["next"]
+        self._rows_used = max_fruits  # Rows to clear on the next write
+
+        # Grid cell centers in board coordinates
+        rows, cols = grid_shape
+        self._cell_w = self.width / cols
+        self._cell_h = self.height / rows
+
+        self._last_score = 0
+
+    def reset(self, seed: Optional[int] = None) -> Observation:
+        """
+        Start a new game.
+
+        Args:
+            seed: Spawn sequence seed (random if None)
+
+        Returns:
+            Observation (the preallocated arrays)
+        """
+        self.state.reset(seed)
+        self._last_score = 0
+        self._observe()
+        return self.observation
+
+    def step(self, drop_x: Optional[float]) -> Tuple[Observation, float, bool, Dict[str, Any]]:
+        """
+        Drop the waiting fruit and simulate until the next drop is possible.
+
+        Args:
+            drop_x: Drop X position (clamped to the board), or None to ship out
+
+        Returns:
+            (observation, reward, done, info); info has score, tick, reason
+            and truncated (shipped because max_ticks was reached)
+        """
+        state = self.state
+        truncated = False
+        if drop_x is None:
+            state.ship()
+        elif not state.game_over:
+            # Wait out the drop cooldown, then drop on the next tick
+            ticks = 0
+            while state.drop_cooldown > PlayState.TICK_DT and not state.game_over:
+                state.step()
+                ticks += 1
+            state.step(drop_x)
+            ticks += 1
+            while ticks < self.ticks_per_action and not state.game_over:
+                state.step()
+                ticks += 1
+            if not state.game_over and state.tick >= self.max_ticks:
+                state.ship()
+                truncated = True
+
+        score = state.score_tracker.get_score()
+        reward = score - self._last_score
+        self._last_score = score
+        self._observe()
+        info = {"score": score, "tick": state.tick, "reason": state.game_over_reason,
+                "truncated": truncated}
+        return self.observation, float(reward), state.game_over, info
+
+    def _observe(self) -> None:
+        """Write the board into the observation arrays."""
+        state = self.state
+        fruits = self._fruits
+        grid = self._grid
+        width, height = self.width, self.height
+        fresh_max = game_config.get("freshness", "fresh_max", default=100) or 1
+
+        # Fruit table (only rows used last time need clearing)
+        count = min(len(state.fruits), len(fruits))
+        for row in range(count, self._rows_used):
+            fruits[row, 0] = -1.0
+            fruits[row, 1] = fruits[row, 2] = fruits[row, 3] = 0.0
+        for row in range(count):
+            fruit = state.fruits[row]
+            fruits[row, 0] = fruit.stage
+            fruits[row, 1] = fruit.x / width
+            fruits[row, 2] = fruit.y / height
+            fruits[row, 3] = fruit.fresh / fresh_max
+        self._rows_used = count
+
+        # Occupancy: cells whose center is inside a fruit
+        grid.fill(0.0)
+        rows, cols = grid.shape
+        cell_w, cell_h = self._cell_w, self._cell_h
+        for fruit in state.fruits:
+            radius = fruit.radius
+            limit = radius * radius
+            first_col = max(0, int((fruit.x - radius) / cell_w))
+            last_col = min(cols - 1, int((fruit.x + radius) / cell_w))
+            first_row = max(0, int((fruit.y - radius) / cell_h))
+            last_row = min(rows - 1, int((fruit.y + radius) / cell_h))
+            for row in range(first_row, last_row + 1):
+                dy = (row + 0.5) * cell_h - fruit.y
+                for col in range(first_col, last_col + 1):
+                    dx = (col + 0.5) * cell_w - fruit.x
+                    if dx * dx + dy * dy <= limit:
+                        grid[row, col] = 1.0
+
+        # Waiting fruit and upcoming spawns
+        upcoming = self._next
+        waiting = state.next_fruit
+        if waiting is not None and not state.game_over:
+            upcoming[0, 0] = waiting.stage
+            upcoming[0, 1] = waiting.fresh / fresh_max
+            spawns = state.preview(self.preview)
+        else:
+            upcoming[0, 0] = -1.0
+            upcoming[0, 1] = 0.0
+            spawns = ()
+        for slot in range(self.preview):
+            if slot < len(spawns):
+                upcoming[slot + 1, 0] = spawns[slot][0]
+                upcoming[slot + 1, 1] = spawns[slot][1] / fresh_max
+            else:
+                upcoming[slot + 1, 0] = -1.0
+                upcoming[slot + 1, 1] = 0.0
+
+
+def _vec_arrays(buffer, num_envs: int,
+                shapes: Dict[str, Tuple[int, ...]]) -> Dict[str, np.ndarray]:
+    """
+    Map the VecEnv arrays onto a shared buffer (or compute the size if None).
+
+    Returns:
+        Observation arrays (num_envs leading axis) plus rewards, dones and
+        actions; with buffer None, {"size": bytes needed}
+    """
+    layout = [(key, (num_envs,) + shape, np.float32) for key, shape in shapes.items()]
+    layout += [("rewards", (num_envs,), np.float64), ("dones", (num_envs,), np.bool_),
+               ("actions", (num_envs,), np.float64)]
+    arrays = {}
+    offset = 0
+    for key, shape, dtype in layout:
+        if buffer is not None:
+            arrays[key] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += (int(np.prod(shape)) * np.dtype(dtype).itemsize + 7) & ~7
+    if buffer is None:
+        return {"size": offset}
+    return arrays
+
+
+def _vec_worker(conn, shm_name: str, num_envs: int, first: int, last: int,
+                config: Dict[str, Any], env_kwargs: Dict[str, Any]) -> None:
+    """
+    Worker process: step environments first..last-1 of a VecEnv.
+
+    Commands (replies in parentheses):
+        ("reset", seed) -> (None)
+        ("step",) -> (list of (env index, info) for episodes that ended)
+        ("close",)
+    """
+    game_config.replace(config)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    shapes = observation_shapes(**{key: env_kwargs[key] for key in
+                                   ("max_fruits", "grid_shape", "preview") if key in env_kwargs})
+    arrays = _vec_arrays(shm.buf, num_envs, shapes)
+    envs = {}
+    for index in range(first, last):
+        out = {key: arrays[key][index] for key in shapes}
+        envs[index] = MikanEnv(out=out, **env_kwargs)
+    seeds: Dict[int, Optional[int]] = {index: None for index in envs}
+    episodes = {index: 0 for index in envs}
+
+    def next_seed(index: int) -> Optional[int]:
+        seed = seeds[index]
+        return None if seed is None else seed + num_envs * episodes[index]
+
+    rewards, dones, actions = arrays["rewards"], arrays["dones"], arrays["actions"]
+    try:
+        while True:
+            try:
+                command = conn.recv()
+            except EOFError:
+                break
+            op = command[0]
+            if op == "reset":
+                base = command[1]
+                for index, env in envs.items():
+                    seeds[index] = None if base is None else base + index
+                    episodes[index] = 0
+                    env.reset(next_seed(index))
+                conn.send(None)
+            elif op == "step":
+                finished = []
+                for index, env in envs.items():
+                    action = actions[index]
+                    _, reward, done, info = env.step(None if np.isnan(action) else float(action))
+                    rewards[index] = reward
+                    dones[index] = done
+                    if done:
+                        # Auto-reset: the returned observation starts the next episode
+                        finished.append((index, info))
+                        episodes[index] += 1
+                        env.reset(next_seed(index))
+                conn.send(finished)
+            elif op == "close":
+                break
+    finally:
+        envs.clear()
+        arrays.clear()
+        shm.close()
+        conn.close()
+
+
+class VecEnv:
+    """
+    Many MikanEnvs stepped in parallel by worker processes.
+
+    Observations, rewards and dones returned by reset()/step() are views of
+    shared memory: valid until the next call (copy them to keep them).
+    Episodes that end are reset automatically; their final info is returned
+    and the observation already belongs to the next episode.
+    """
+
+    def __init__(self, num_envs: int, workers: Optional[int] = None, **env_kwargs):
+        """
+        Start the workers.
+
+        Args:
+            num_envs: Number of environments
+            workers: Worker processes (CPU count if None, at most num_envs)
+            **env_kwargs: MikanEnv settings (max_fruits, grid_shape, preview,
+                ticks_per_action, max_ticks)
+        """
+        self.num_envs = num_envs
+        self.shapes = observation_shapes(**{key: env_kwargs[key] for key in
+                                            ("max_fruits", "grid_shape", "preview")
+                                            if key in env_kwargs})
+        size = _vec_arrays(None, num_envs, self.shapes)["size"]
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._arrays = _vec_arrays(self._shm.buf, num_envs, self.shapes)
+        self.observation = {key: self._arrays[key] for key in self.shapes}
+
+        workers = max(1, min(num_envs, workers or os.cpu_count() or 1))
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        context = multiprocessing.get_context()
+        self._conns = []
+        self._processes = []
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_vec_worker,
+                args=(child_conn, self._shm.name, num_envs, int(first), int(last),
+                      game_config.config, env_kwargs),
+                name="vec-env", daemon=True)
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+    def reset(self, seed: Optional[int] = None) -> Observation:
+        """
+        Reset every environment.
+
+        Args:
+            seed: Environment i plays seed + i (later episodes continue with
+                seed + i + num_envs * episode); random if None
+
+        Returns:
+            Observation arrays with a leading env axis
+        """
+        for conn in self._conns:
+            conn.send(("reset", seed))
+        for conn in self._conns:
+            conn.recv()
+        return self.observation
+
+    def step(self, actions: Sequence[Optional[float]]
+             ) -> Tuple[Observation, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Step every environment once.
+
+        Args:
+            actions: Drop X per environment (None or NaN ships out)
+
+        Returns:
+            (observations, rewards, dones, infos); infos[i] is the final info
+            of an episode that just ended, else empty
+        """
+        self._arrays["actions"][:] = [np.nan if action is None else action
+                                      for action in actions]
+        for conn in self._conns:
+            conn.send(("step",))
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        for conn in self._conns:
+            for index, info in conn.recv():
+                infos[index] = info
+        return self.observation, self._arrays["rewards"], self._arrays["dones"], infos
+
+    def close(self) -> None:
+        """Stop the workers and free the shared memory."""
+        if not self._processes:
+            return
+        for conn in self._conns:
+            try:
+                conn.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._processes = []
+        self._arrays = {}
+        self.observation = {}
+        self._shm.close()
+        self._shm.unlink()
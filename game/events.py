@@ -0,0 +1,206 @@
+"""Gameplay event bus and buffered event log writer.
+
+PlayState emits one event per gameplay moment:
+
+- session_start: session, config_id, config
+- drop: stage, x, fresh
+- merge: stage (new), fresh_a, fresh_b, fresh (new), x, y
+- deliver: fresh, rotten
+- rot: stage, fresh (a fruit on the board crossed rotten_threshold)
+- danger_enter / danger_exit
+- end: reason, score, delivered, rotten
+
+Logs are either JSONL (one compact object per line) or a binary record file
+(``.bin``): an 8 byte header followed by ``<BIH`` (kind, tick, payload size)
+records with fixed struct payloads per kind.
+"""
+import json
+import mmap
+import struct
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Binary record layouts: kind -> (id, field names, payload struct or None for JSON)
+EVENT_SCHEMAS: Dict[str, Tuple[int, Tuple[str, ...], Any]] = {
+    "session_start": (1, (), None),
+    "drop": (2, ("stage", "x", "fresh"), struct.Struct("<Bff")),
+    "merge": (3, ("stage", "fresh_a", "fresh_b", "fresh", "x", "y"), struct.Struct("<Bfffff")),
+    "deliver": (4, ("fresh", "rotten"), struct.Struct("<f?")),
+    "rot": (5, ("stage", "fresh"), struct.Struct("<Bf")),
+    "danger_enter": (6, (), struct.Struct("<")),
+    "danger_exit": (7, (), struct.Struct("<")),
+    "end": (8, (), None),
+}
+KIND_BY_ID = {kind_id: kind for kind, (kind_id, _, _) in EVENT_SCHEMAS.items()}
+
+BIN_MAGIC = b"MKEV\x01\x00\x00\x00"
+RECORD = struct.Struct("<BIH")  # kind id, tick, payload size
+
+EventCallback = Callable[[str, int, Dict[str, Any]], None]
+
+
+class EventBus:
+    """Fans gameplay events out to subscribers."""
+
+    def __init__(self):
+        """Initialize with no subscribers."""
+        self.subscribers: List[EventCallback] = []
+
+    def subscribe(self, callback: EventCallback) -> None:
+        """
+        Register a subscriber.
+
+        Args:
+            callback: Called as callback(kind, tick, fields)
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: EventCallback) -> None:
+        """Remove a subscriber."""
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def emit(self, kind: str, tick: int, **fields) -> None:
+        """
+        Emit an event to all subscribers.
+
+        Callers on hot paths should check ``bus.subscribers`` first to skip
+        building the fields when nobody listens.
+        """
+        for callback in self.subscribers:
+            callback(kind, tick, fields)
+
+
+def encode_jsonl(kind: str, tick: int, fields: Dict[str, Any]) -> str:
+    """Encode one event as a compact JSON line."""
+    record = {"e": kind, "t": tick}
+    record.update(fields)
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+def encode_binary(kind: str, tick: int, fields: Dict[str, Any]) -> bytes:
+    """Encode one event as a binary record."""
+    kind_id, names, layout = EVENT_SCHEMAS[kind]
+    if layout is None:
+        payload = json.dumps(fields, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    else:
+        payload = layout.pack(*(fields[name] for name in names))
+    return RECORD.pack(kind_id, tick, len(payload)) + payload
+
+
+class EventLogWriter:
+    """
+    Event bus subscriber that batches events and writes them on a background thread.
+
+    The game thread only appends to a deque; encoding and file I/O happen on
+    the writer thread, which wakes when a batch fills up or every
+    ``flush_interval`` seconds.
+    """
+
+    def __init__(self, path: str, batch_size: int = 512, flush_interval: float = 0.5):
+        """
+        Open the log and start the writer thread.
+
+        Args:
+            path: Output path (".bin" for binary records, JSONL otherwise)
+            batch_size: Pending events that trigger an early flush
+            flush_interval: Maximum seconds between flushes
+        """
+        self.path = path
+        self.binary = path.endswith(".bin")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        if self.binary:
+            self.file = open(path, "wb")
+            self.file.write(BIN_MAGIC)
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+
+        self._pending = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def __call__(self, kind: str, tick: int, fields: Dict[str, Any]) -> None:
+        """Queue one event (EventBus subscriber entry point)."""
+        self._pending.append((kind, tick, fields))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        """Writer thread loop."""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+        self._drain()
+
+    def _drain(self) -> None:
+        """Encode and write everything queued so far."""
+        pending = self._pending
+        if not pending:
+            return
+
+        batch = []
+        while pending:
+            batch.append(pending.popleft())
+
+        if self.binary:
+            self.file.write(b"".join(encode_binary(*event) for event in batch))
+        else:
+            self.file.write("".join(encode_jsonl(*event) for event in batch))
+        self.file.flush()
+
+    def close(self) -> None:
+        """Flush remaining events and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.file.close()
+
+
+def iter_events(path: str) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+    """
+    Stream events back from a log written by EventLogWriter.
+
+    Args:
+        path: JSONL or binary event log
+
+    Yields:
+        (kind, tick, fields) tuples in file order
+    """
+    if path.endswith(".bin"):
+        # Memory-mapped: records are decoded in place without reading the file whole
+        with open(path, "rb") as f:
+            if f.read(len(BIN_MAGIC)) != BIN_MAGIC:
+                raise ValueError(f"Not an event log: {path}")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offset = len(BIN_MAGIC)
+                end = len(data) - RECORD.size
+                while offset <= end:
+                    kind_id, tick, size = RECORD.unpack_from(data, offset)
+                    offset += RECORD.size
+                    if offset + size > len(data):
+                        return  # truncated tail (writer still running or killed)
+                    kind = KIND_BY_ID[kind_id]
+                    _, names, layout = EVENT_SCHEMAS[kind]
+                    if layout is None:
+                        fields = json.loads(data[offset:offset + size].decode("utf-8"))
+                    else:
+                        fields = dict(zip(names, layout.unpack_from(data, offset)))
+                    offset += size
+                    yield kind, tick, fields
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind = record.pop("e")
+                tick = record.pop("t")
+                yield kind, tick, record
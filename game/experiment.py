@@ -0,0 +1,298 @@
+"""Paired A/B config experiments with sequential early stopping.
+
+Both configs play the same seeds with the same bot (same spawn sequence when
+the spawn settings agree), so each pair's difference cancels most of the
+game-to-game luck. Pairs are played by worker processes and folded in in
+pair order, so the outcome doesn't depend on worker timing.
+
+Per-pair differences (B - A) of score, rotten rate (rotten / delivered) and
+session length (ticks) are tracked online. After every pair, each metric
+gets an always-valid confidence interval from a mixture sequential
+probability ratio test (normal mixture, variance plugged in from the data):
+it can be checked after every pair without inflating the error rate, unlike
+re-running a t-test. The run stops as soon as the score difference is
+significant at ``alpha``, or after ``max_pairs``.
+
+Usage:
+    python -m game.experiment config/game_config.json config/variant.json --workers 8
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from game.config import game_config
+from game.headless import play_game
+
+METRICS = ("score", "rotten_rate", "ticks")
+
+# Per-process configs (set by the pool initializer)
+_worker_configs: Tuple[Dict[str, Any], Dict[str, Any]] = ({}, {})
+
+
+class PairedStat:
+    """Running paired differences with an always-valid (mSPRT) interval."""
+
+    def __init__(self, alpha: float = 0.05, mixture_scale: float = 0.3):
+        """
+        Initialize statistic.
+
+        Args:
+            alpha: Error rate of the sequential test / interval
+            mixture_scale: Mixture standard deviation in units of the
+                difference's standard deviation (the effect size the test
+                is tuned for)
+        """
+        self.alpha = alpha
+        self.mixture_scale = mixture_scale
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.sum_a = 0.0
+        self.sum_b = 0.0
+        self._sq_a = 0.0
+        self._sq_b = 0.0
+
+    def add(self, a: float, b: float) -> None:
+        """Add one pair (A value, B value)."""
+        difference = b - a
+        self.n += 1
+        delta = difference - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (difference - self.mean)
+        self.sum_a += a
+        self.sum_b += b
+        self._sq_a += a * a
+        self._sq_b += b * b
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the differences."""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def interval(self) -> Tuple[float, float]:
+        """
+        Always-valid confidence interval for the mean difference.
+
+        Returns:
+            (low, high); infinite until there are two pairs
+        """
+        variance = self.variance
+        if self.n < 2:
+            return -math.inf, math.inf
+        if variance <= 0:
+            return self.mean, self.mean
+        grown = 1.0 + self.n * self.mixture_scale ** 2
+        half = math.sqrt(2.0 * variance * grown / (self.n ** 2 * self.mixture_scale ** 2)
+                         * math.log(math.sqrt(grown) / self.alpha))
+        return self.mean - half, self.mean + half
+
+    def significant(self) -> bool:
+        """True once the interval excludes zero (the test rejects "no difference")."""
+        low, high = self.interval()
+        return low > 0 or high < 0
+
+    def pairing_gain(self) -> float:
+        """
+        Variance of an unpaired comparison over the paired one.
+
+        Returns:
+            How many times fewer games the pairing needs (1 if unknown)
+        """
+        if self.n < 2 or self.variance <= 0:
+            return 1.0
+        var_a = (self._sq_a - self.sum_a ** 2 / self.n) / (self.n - 1)
+        var_b = (self._sq_b - self.sum_b ** 2 / self.n) / (self.n - 1)
+        return (var_a + var_b) / self.variance
+
+
+def pair_values(result: Dict[str, Any]) -> Dict[str, float]:
+    """Metric values of one game result (see METRICS)."""
+    delivered = result["delivered"]
+    return {
+        "score": float(result["score"]),
+        "rotten_rate": result["rotten"] / delivered if delivered else 0.0,
+        "ticks": float(result["ticks"]),
+    }
+
+
+class Experiment:
+    """Plays config A against config B pair by pair until a decision."""
+
+    def __init__(self, config_a: Dict[str, Any], config_b: Dict[str, Any],
+                 alpha: float = 0.05, min_pairs: int = 20, max_pairs: int = 2000,
+                 seed: int = 0, max_ticks: int = 5400, settle: bool = False,
+                 mixture_scale: float = 0.3):
+        """
+        Initialize experiment.
+
+        Args:
+            config_a, config_b: Game configs to compare (B - A is reported)
+            alpha: Error rate of the sequential test
+            min_pairs: Pairs played before stopping is allowed (variance warm-up)
+            max_pairs: Stop without a decision after this many pairs
+            seed: Seed of the first pair (pair i uses seed + i)
+            max_ticks: Ship out after this many ticks
+            settle: Use the quasi-static settle solver (faster, approximate)
+            mixture_scale: Effect size, in difference standard deviations,
+                the test is tuned for
+        """
+        self.configs = (config_a, config_b)
+        self.alpha = alpha
+        self.min_pairs = min_pairs
+        self.max_pairs = max_pairs
+        self.seed = seed
+        self.max_ticks = max_ticks
+        self.settle = settle
+        self.stats = {name: PairedStat(alpha, mixture_scale) for name in METRICS}
+        self.pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+    @property
+    def decided(self) -> bool:
+        """True once the score difference is significant (after min_pairs)."""
+        return self.stats["score"].n >= self.min_pairs and self.stats["score"].significant()
+
+    def add(self, result_a: Dict[str, Any], result_b: Dict[str, Any]) -> None:
+        """Fold in one pair of game results."""
+        self.pairs.append((result_a, result_b))
+        values_a = pair_values(result_a)
+        values_b = pair_values(result_b)
+        for name, stat in self.stats.items():
+            stat.add(values_a[name], values_b[name])
+
+    def run(self, workers: Optional[int] = None, report_every: int = 50) -> Dict[str, Any]:
+        """
+        Play pairs until the score difference is significant or max_pairs.
+
+        Args:
+            workers: Worker processes (CPU count if None); 1 plays in-process
+            report_every: Print progress every this many pairs (0 = quiet)
+
+        Returns:
+            Summary dict (see summary())
+        """
+        start = time.perf_counter()
+        if workers == 1:
+            for index in range(self.max_pairs):
+                self.add(*_play_pair(self.configs, self.seed + index, self.max_ticks, self.settle))
+                self._report(report_every)
+                if self.decided:
+                    break
+        else:
+            context = multiprocessing.get_context()
+            pool = context.Pool(workers, initializer=_init_worker, initargs=(self.configs,))
+            try:
+                jobs = ((self.seed + index, self.max_ticks, self.settle)
+                        for index in range(self.max_pairs))
+                # imap yields in pair order however the workers finish
+                for result_a, result_b in pool.imap(_worker_pair, jobs):
+                    self.add(result_a, result_b)
+                    self._report(report_every)
+                    if self.decided:
+                        break
+            finally:
+                pool.terminate()  # Drop pairs still in flight after a decision
+                pool.join()
+
+        summary = self.summary()
+        summary["seconds"] = time.perf_counter() - start
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Current results.
+
+        Returns:
+            Dict with pairs, decided, and per metric: mean_a, mean_b,
+            difference, low, high, significant, pairing_gain
+        """
+        summary = {"pairs": len(self.pairs), "decided": self.decided, "metrics": {}}
+        for name, stat in self.stats.items():
+            low, high = stat.interval()
+            n = max(stat.n, 1)
+            summary["metrics"][name] = {
+                "mean_a": stat.sum_a / n, "mean_b": stat.sum_b / n,
+                "difference": stat.mean, "low": low, "high": high,
+                "significant": stat.significant(), "pairing_gain": stat.pairing_gain(),
+            }
+        return summary
+
+    def _report(self, every: int) -> None:
+        """Print a progress line every ``every`` pairs."""
+        if every and len(self.pairs) % every == 0:
+            print(f"{len(self.pairs):>6} pairs  " + "  ".join(
+                f"{name} {stat.mean:+.3g} [{stat.interval()[0]:+.3g}, {stat.interval()[1]:+.3g}]"
+                for name, stat in self.stats.items()))
+
+
+def format_summary(summary: Dict[str, Any], max_pairs: int) -> str:
+    """Format a run summary for the terminal."""
+    verdict = "significant" if summary["decided"] else "no decision"
+    lines = [f"{summary['pairs']} pairs ({verdict}, max {max_pairs}) "
+             f"in {summary.get('seconds', 0.0):.1f}s"]
+    lines.append(f"{'metric':>12} {'A':>10} {'B':>10} {'B - A':>10}   always-valid CI"
+                 f"          pairing gain")
+    for name, metric in summary["metrics"].items():
+        flag = " *" if metric["significant"] else "  "
+        lines.append(f"{name:>12} {metric['mean_a']:>10.4g} {metric['mean_b']:>10.4g} "
+                     f"{metric['difference']:>+10.4g}   [{metric['low']:+.4g}, {metric['high']:+.4g}]{flag}"
+                     f"   x{metric['pairing_gain']:.1f}")
+    return "\n".join(lines)
+
+
+def _play_pair(configs: Tuple[Dict[str, Any], Dict[str, Any]], seed: int, max_ticks: int,
+               settle: bool) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Play one seed under both configs."""
+    results = []
+    for config in configs:
+        game_config.replace(config)
+        results.append(play_game(seed, max_ticks, settle=settle))
+    return results[0], results[1]
+
+
+def _init_worker(configs: Tuple[Dict[str, Any], Dict[str, Any]]) -> None:
+    """Pool initializer: keep both configs in the worker."""
+    global _worker_configs
+    _worker_configs = configs
+
+
+def _worker_pair(job: Tuple[int, int, bool]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Worker process: play one pair."""
+    seed, max_ticks, settle = job
+    return _play_pair(_worker_configs, seed, max_ticks, settle)
+
+
+def _load(path: str) -> Dict[str, Any]:
+    """Load a config JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compare two configs with paired bot games")
+    parser.add_argument("config_a", help="baseline config (A)")
+    parser.add_argument("config_b", help="variant config (B); differences are B - A")
+    parser.add_argument("--alpha", type=float, default=0.05, help="error rate (default 0.05)")
+    parser.add_argument("--min-pairs", type=int, default=20, help="pairs before stopping is allowed")
+    parser.add_argument("--max-pairs", type=int, default=2000, help="stop without a decision after this")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first pair")
+    parser.add_argument("--max-ticks", type=int, default=5400, help="ship out after this many ticks")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--settle", action="store_true",
+                        help="use the settle solver (much faster, approximate)")
+    parser.add_argument("--report-every", type=int, default=50, metavar="PAIRS",
+                        help="progress line interval (0 = quiet)")
+    args = parser.parse_args(argv)
+
+    experiment = Experiment(_load(args.config_a), _load(args.config_b), alpha=args.alpha,
+                            min_pairs=args.min_pairs, max_pairs=args.max_pairs, seed=args.seed,
+                            max_ticks=args.max_ticks, settle=args.settle)
+    summary = experiment.run(args.workers, args.report_every)
+    print(format_summary(summary, args.max_pairs))
+
+
+if __name__ == "__main__":
+    main()
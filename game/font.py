@@ -0,0 +1,395 @@
+"""Bitmap font support for Japanese text (BDF glyph atlas + rendered string cache).
+
+Pyxel's built-in font only covers ASCII, so fruit names like ぶどう or
+デコポン need a bitmap font. ``BDFFont`` indexes a BDF file once and parses
+only the glyphs that are asked for; ``GlyphAtlas`` packs those glyphs into a
+single image; ``TextRenderer`` renders each (string, color) pair once into
+its own image and afterwards draws it with one ``blt``.
+
+ASCII keeps using Pyxel's font (so HUD layouts and line spacing don't
+change); only characters it can't draw come from the BDF font, aligned on a
+shared baseline.
+"""
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import pyxel
+from game.config import game_config
+from game.stages import stage_table
+
+# Pyxel's built-in font: 4px advance, 6px line, 5px above the baseline
+BUILTIN_ADVANCE = 4
+BUILTIN_HEIGHT = 6
+BUILTIN_ASCENT = 5
+
+# Characters always loaded at startup (besides the fruit names)
+PRELOAD_CHARS = "".join(chr(code) for code in range(32, 127))
+
+_GLYPH_START = re.compile(rb"^STARTCHAR[^\n]*\nENCODING (-?\d+)", re.MULTILINE)
+
+
+class Glyph:
+    """One BDF glyph: metrics and bitmap rows."""
+
+    __slots__ = ("advance", "width", "height", "x_offset", "y_offset", "rows",
+                 "atlas_x", "atlas_y")
+
+    def __init__(self, advance: int, width: int, height: int, x_offset: int,
+                 y_offset: int, rows: List[int]):
+        """
+        Initialize glyph.
+
+        Args:
+            advance: Pen movement after the glyph (DWIDTH)
+            width, height: Bitmap size (BBX)
+            x_offset, y_offset: Bitmap offset from the pen position / baseline
+            rows: Bitmap rows, most significant bit = leftmost pixel
+        """
+        self.advance = advance
+        self.width = width
+        self.height = height
+        self.x_offset = x_offset
+        self.y_offset = y_offset
+        self.rows = rows
+        self.atlas_x = -1  # Position in the GlyphAtlas (-1 until packed)
+        self.atlas_y = -1
+
+
+class BDFFont:
+    """BDF font that loads glyphs on demand."""
+
+    def __init__(self, path: str):
+        """
+        Index a BDF file (glyph bitmaps are parsed when first used).
+
+        Args:
+            path: BDF file
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            data = f.read()
+
+        header_end = data.find(b"\nSTARTCHAR")
+        header = data[:header_end].decode("latin-1")
+        properties = {}
+        for line in header.splitlines():
+            key, _, value = line.partition(" ")
+            properties[key] = value.strip()
+
+        bbox = [int(v) for v in properties.get("FONTBOUNDINGBOX", "8 8 0 0").split()]
+        self.ascent = int(properties.get("FONT_ASCENT", bbox[1] + bbox[3]))
+        self.descent = int(properties.get("FONT_DESCENT", -bbox[3]))
+        self.default_char = int(properties.get("DEFAULT_CHAR", "-1"))
+
+        # Byte offset of each glyph record by code point
+        self._offsets: Dict[int, int] = {}
+        for match in _GLYPH_START.finditer(data):
+            self._offsets[int(match.group(1))] = match.start()
+        self._glyphs: Dict[int, Optional[Glyph]] = {}
+
+    @property
+    def line_height(self) -> int:
+        """Pixel height of a line of text."""
+        return self.ascent + self.descent
+
+    def has(self, char: str) -> bool:
+        """Check if the font has a glyph for a character."""
+        return ord(char) in self._offsets
+
+    def glyph(self, char: str) -> Optional[Glyph]:
+        """
+        Get a character's glyph, parsing it on first use.
+
+        Args:
+            char: Single character
+
+        Returns:
+            The glyph, the font's default glyph if it has none, or None
+        """
+        code = ord(char)
+        if code not in self._offsets:
+            code = self.default_char
+        if code in self._glyphs:
+            return self._glyphs[code]
+
+        offset = self._offsets.get(code)
+        glyph = self._parse(offset) if offset is not None else None
+        self._glyphs[code] = glyph
+        return glyph
+
+    @property
+    def loaded(self) -> int:
+        """Number of glyphs parsed so far."""
+        return len(self._glyphs)
+
+    def _parse(self, offset: int) -> Glyph:
+        """Parse the glyph record starting at a byte offset."""
+        advance = 0
+        bbx = (0, 0, 0, 0)
+        rows = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            in_bitmap = False
+            for raw in f:
+                line = raw.strip()
+                if line == b"ENDCHAR":
+                    break
+                if in_bitmap:
+                    rows.append(int(line, 16))
+                elif line.startswith(b"DWIDTH"):
+                    advance = int(line.split()[1])
+                elif line.startswith(b"BBX"):
+                    bbx = tuple(int(v) for v in line.split()[1:5])
+                elif line == b"BITMAP":
+                    in_bitmap = True
+
+        width, height, x_offset, y_offset = bbx
+        # Rows are padded to whole bytes: shift so bit (width - 1) is the leftmost pixel
+        pad = (-width) % 8
+        rows = [row >> pad for row in rows[:height]]
+        return Glyph(advance, width, height, x_offset, y_offset, rows)
+
+
+class GlyphAtlas:
+    """Packs the glyphs in use into one image (white on color 0)."""
+
+    def __init__(self, font: BDFFont, width: int = 256, height: int = 128):
+        """
+        Initialize atlas.
+
+        Args:
+            font: Font to take glyphs from
+            width, height: Atlas image size
+        """
+        self.font = font
+        self.width = width
+        self.height = height
+        self.image = pyxel.Image(width, height)
+        self.image.cls(0)
+        self.resets = 0  # Times the atlas filled up and was cleared
+        self._packed: List[Glyph] = []
+        self._shelf_x = 0
+        self._shelf_y = 0
+        self._shelf_height = 0
+
+    def glyph(self, char: str) -> Optional[Glyph]:
+        """
+        Get a glyph, packing it into the atlas on first use.
+
+        Args:
+            char: Single character
+
+        Returns:
+            Glyph with atlas_x/atlas_y set, or None if the font has none
+        """
+        glyph = self.font.glyph(char)
+        if glyph is None or glyph.atlas_x >= 0 or glyph.width == 0:
+            return glyph
+
+        if self._shelf_x + glyph.width > self.width:
+            self._shelf_x = 0
+            self._shelf_y += self._shelf_height + 1
+            self._shelf_height = 0
+        if self._shelf_y + glyph.height > self.height:
+            self.clear()  # Full: start over (rendered strings keep their own images)
+
+        x = self._shelf_x
+        y = self._shelf_y
+        image = self.image
+        for row_index, row in enumerate(glyph.rows):
+            for column in range(glyph.width):
+                if row & (1 << (glyph.width - 1 - column)):
+                    image.pset(x + column, y + row_index, 7)
+
+        glyph.atlas_x = x
+        glyph.atlas_y = y
+        self._packed.append(glyph)
+        self._shelf_x += glyph.width + 1
+        self._shelf_height = max(self._shelf_height, glyph.height)
+        return glyph
+
+    def preload(self, chars: Iterable[str]) -> None:
+        """Pack glyphs for characters ahead of time (those Pyxel can't draw)."""
+        for char in chars:
+            if not is_builtin(char):
+                self.glyph(char)
+
+    def clear(self) -> None:
+        """Empty the atlas; glyphs are packed again when next used."""
+        for glyph in self._packed:
+            glyph.atlas_x = -1
+            glyph.atlas_y = -1
+        self._packed = []
+        self.image.cls(0)
+        self._shelf_x = 0
+        self._shelf_y = 0
+        self._shelf_height = 0
+        self.resets += 1
+
+
+class TextRenderer:
+    """Draws strings with one blit each from a cache of rendered strings."""
+
+    def __init__(self, atlas: GlyphAtlas, max_strings: int = 256):
+        """
+        Initialize renderer.
+
+        Args:
+            atlas: Glyph atlas for characters Pyxel's font lacks
+            max_strings: Rendered strings kept (least recently drawn are dropped)
+        """
+        self.atlas = atlas
+        self.font = atlas.font
+        self.max_strings = max_strings
+        self._strings: "OrderedDict[Tuple[str, int], Tuple[pyxel.Image, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def draw(self, x: float, y: float, text: str, col: int) -> None:
+        """
+        Draw a string (same placement as pyxel.text: x, y is the top-left).
+
+        Args:
+            x, y: Screen position
+            text: String to draw
+            col: Text color
+        """
+        key = (text, col)
+        entry = self._strings.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._render(text, col)
+            self._strings[key] = entry
+            if len(self._strings) > self.max_strings:
+                self._strings.popitem(last=False)
+        else:
+            self.hits += 1
+            self._strings.move_to_end(key)
+
+        image, top = entry
+        if image is not None:
+            pyxel.blt(x, y + top, image, 0, 0, image.width, image.height, 0 if col else 1)
+
+    def width(self, text: str) -> int:
+        """Pixel width of a string."""
+        width = 0
+        for char in text:
+            if is_builtin(char):
+                width += BUILTIN_ADVANCE
+            else:
+                glyph = self.font.glyph(char)
+                width += glyph.advance if glyph else BUILTIN_ADVANCE
+        return width
+
+    def clear(self) -> None:
+        """Drop all rendered strings."""
+        self._strings.clear()
+
+    def _render(self, text: str, col: int) -> Tuple[Optional[pyxel.Image], int]:
+        """
+        Render a string into a new image.
+
+        Returns:
+            (image or None for an empty string, Y offset of the image top
+            relative to where pyxel.text would start the string)
+        """
+        width = self.width(text)
+        if width <= 0:
+            return None, 0
+
+        # Pure ASCII keeps Pyxel's metrics; otherwise share the BDF baseline
+        if all(is_builtin(char) for char in text):
+            ascent = BUILTIN_ASCENT
+            height = BUILTIN_HEIGHT
+        else:
+            ascent = max(self.font.ascent, BUILTIN_ASCENT)
+            height = ascent + max(self.font.descent, BUILTIN_HEIGHT - BUILTIN_ASCENT)
+
+        background = 0 if col else 1
+        image = pyxel.Image(width, height)
+        image.cls(background)
+        image.pal(7, col)
+        pen_x = 0
+        for char in text:
+            if is_builtin(char):
+                if char != " ":
+                    image.text(pen_x, ascent - BUILTIN_ASCENT, char, col)
+                pen_x += BUILTIN_ADVANCE
+                continue
+            glyph = self.atlas.glyph(char)
+            if glyph is None:
+                pen_x += BUILTIN_ADVANCE
+                continue
+            if glyph.width:
+                image.blt(pen_x + glyph.x_offset, ascent - glyph.y_offset - glyph.height,
+                          self.atlas.image, glyph.atlas_x, glyph.atlas_y,
+                          glyph.width, glyph.height, 0)
+            pen_x += glyph.advance
+        image.pal()
+
+        # Keep ASCII where pyxel.text would put it
+        return image, BUILTIN_ASCENT - ascent
+
+
+def is_builtin(char: str) -> bool:
+    """Check if Pyxel's built-in font can draw a character."""
+    return " " <= char <= "~"
+
+
+_renderer = None
+_renderer_path = None
+_failed_path = None
+
+
+def text_renderer() -> Optional[TextRenderer]:
+    """
+    Get the shared renderer for the font in ``ui.font`` (loaded on first use).
+
+    Returns:
+        The renderer, or None if the font can't be loaded (callers fall back
+        to pyxel.text)
+    """
+    global _renderer, _renderer_path, _failed_path
+
+    path = game_config.get("ui", "font", default="assets/fonts/umplus_j10r.bdf")
+    if path == _renderer_path:
+        return _renderer
+    if path == _failed_path:
+        return None
+
+    try:
+        font = BDFFont(path)
+    except (OSError, ValueError) as e:
+        print(f"Font not loaded ({e}), Japanese text will not be shown")
+        _failed_path = path
+        return None
+
+    atlas = GlyphAtlas(font)
+    atlas.preload(PRELOAD_CHARS + "".join(stage_table().display_names))
+    _renderer = TextRenderer(atlas)
+    _renderer_path = path
+    return _renderer
+
+
+def text(x: float, y: float, s: str, col: int) -> None:
+    """
+    Draw text with the shared renderer (pyxel.text if no font is loaded).
+
+    Args:
+        x, y: Top-left position
+        s: String to draw
+        col: Text color
+    """
+    renderer = text_renderer()
+    if renderer is None:
+        pyxel.text(x, y, s, col)
+    else:
+        renderer.draw(x, y, s, col)
+
+
+def text_width(s: str) -> int:
+    """Pixel width of a string as text() draws it."""
+    renderer = text_renderer()
+    if renderer is None:
+        return len(s) * BUILTIN_ADVANCE
+    return renderer.width(s)
@@ -0,0 +1,56 @@
+"""Offscreen frame caching for static or rarely changing screens."""
+from typing import Any, Callable
+import pyxel
+
+
+class FrameCache:
+    """
+    Renders content once into an offscreen image and blits it afterwards.
+
+    The content is re-rendered only when the key passed to ``draw`` differs
+    from the key it was last rendered with, or after ``invalidate``.
+    """
+
+    def __init__(self, width: int, height: int, render: Callable[[pyxel.Image], None],
+                 colkey: int = None):
+        """
+        Initialize cache.
+
+        Args:
+            width, height: Size of the cached image
+            render: Draws the content into the given image (same API as pyxel drawing)
+            colkey: Transparent color when blitting (None for opaque)
+        """
+        self.width = width
+        self.height = height
+        self.render = render
+        self.colkey = colkey
+        self.image = None  # Created on first draw (needs pyxel.init)
+        self._key = None
+        self._dirty = True
+
+    def invalidate(self) -> None:
+        """Force a re-render on the next draw."""
+        self._dirty = True
+
+    def draw(self, x: int, y: int, key: Any = None) -> None:
+        """
+        Blit the cached content, re-rendering it first if needed.
+
+        Args:
+            x, y: Screen position
+            key: Value describing the content; a change triggers a re-render
+        """
+        if self.image is None:
+            self.image = pyxel.Image(self.width, self.height)
+
+        if self._dirty or key != self._key:
+            self.image.cls(0 if self.colkey is None else self.colkey)
+            self.render(self.image)
+            self._key = key
+            self._dirty = False
+
+        if self.colkey is None:
+            pyxel.blt(x, y, self.image, 0, 0, self.width, self.height)
+        else:
+            pyxel.blt(x, y, self.image, 0, 0, self.width, self.height, self.colkey)
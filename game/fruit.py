@@ -2,6 +2,11 @@
 import random
 from typing import Optional
 from game.config import game_config
+from game.spawn_queue import SpawnQueue
+from game.stages import stage_table
+
+# Spawn sequence for callers that don't own one
+_default_queue = None
 
 
 class Fruit:
@@ -12,7 +17,8 @@ class Fruit:
         Initialize a fruit.
 
         Args:
-            stage: Fruit stage (0-5: ume, kaki, momo, budou, dekopon, mikan)
+            stage: Fruit stage (index into the stage table; default ladder is
+                ume, kaki, momo, budou, dekopon, mikan)
             x: X position
             y: Y position
             fresh: Freshness value (auto-generated if None)
@@ -23,12 +29,12 @@ class Fruit:
         self.vx = 0.0
         self.vy = 0.0
 
-        # Get fruit properties from config
-        fruit_data = game_config.get("fruits")[stage]
-        self.name = fruit_data["name"]
-        self.display_name = fruit_data["display_name"]
-        self.radius = fruit_data["radius"]
-        self.color = fruit_data["color"]
+        # Get fruit properties from the compiled stage table
+        table = stage_table()
+        self.name = table.names[stage]
+        self.display_name = table.display_names[stage]
+        self.radius = table.radii[stage]
+        self.color = table.colors[stage]
 
         # Freshness
         if fresh is None:
@@ -38,8 +44,16 @@ class Fruit:
 
         # State
         self.dropped = False  # True when dropped into play area
+        self.landed = False  # True once it has touched the floor or another fruit
         self.merge_cooldown = 0.0  # Prevents immediate re-merging
 
+        # Rest detection (see PhysicsEngine)
+        self.sleeping = False  # True while at rest; skipped by the physics step
+        self.sleep_timer = 0.0  # Seconds spent below the sleep speed
+        self.island = None  # Fruits that fell asleep together (shared list)
+        self.start_x = x  # Position at the start of the physics step
+        self.start_y = y
+
     def _generate_fresh(self) -> float:
         """Generate random freshness value based on config."""
         fresh_max = game_config.get("freshness", "fresh_max", default=100)
@@ -58,11 +72,10 @@ class Fruit:
         if not self.dropped:
             return
 
-        decay_base = game_config.get("freshness", "decay_base", default=2.0)
-        decay_mult = game_config.get("freshness", "decay_stage_mult", default=1.2)
-
-        # Higher stages decay faster
-        decay_rate = decay_base * (decay_mult ** self.stage)
+        # Higher stages decay faster (a shorter ladder after a config reset
+        # decays leftovers at its top rate until the board restarts)
+        decay_rates = stage_table().decay_rates
+        decay_rate = decay_rates[min(self.stage, len(decay_rates) - 1)]
         self.fresh = max(0, self.fresh - decay_rate * dt)
 
         # Update merge cooldown
@@ -85,7 +98,7 @@ class Fruit:
 
     def is_mikan(self) -> bool:
         """Check if this is a mikan (final stage)."""
-        return self.stage == 5
+        return self.stage == stage_table().final_stage
 
     def can_merge(self) -> bool:
         """Check if fruit can participate in merging."""
@@ -96,14 +109,25 @@ class FruitFactory:
     """Factory for creating fruits."""
 
     @staticmethod
-    def create_spawn_fruit(x: float = 120) -> Fruit:
+    def create_spawn_fruit(x: float = 120, queue: SpawnQueue = None) -> Fruit:
         """
         Create a new fruit for spawning.
 
-        Initial fruits are limited to first 3 stages.
+        Initial fruits are limited to board.spawn_stage_min..spawn_stage_max
+        (ume, kaki or momo by default).
+
+        Args:
+            x: X position
+            queue: Spawn sequence to take the fruit from (a shared unseeded
+                queue if None); a seeded queue gives a reproducible sequence
         """
-        stage = random.randint(0, 2)  # ume, kaki, or momo
-        return Fruit(stage, x, 50)
+        global _default_queue
+        if queue is None:
+            if _default_queue is None:
+                _default_queue = SpawnQueue()
+            queue = _default_queue
+        stage, fresh = queue.pop()
+        return Fruit(stage, x, game_config.get("board", "spawn_y", default=50), fresh)
 
     @staticmethod
     def create_merged_fruit(stage: int, x: float, y: float,
@@ -124,6 +148,7 @@ class FruitFactory:
 
         fruit = Fruit(stage, x, y, new_fresh)
         fruit.dropped = True
+        fruit.landed = True
 
         # Set cooldown to prevent immediate re-merge
         cooldown = game_config.get("physics", "merge_cooldown", default=0.5)
@@ -0,0 +1,259 @@
+"""Headless simulation runner (no window) for batches of bot games.
+
+Usage:
+    python -m game.headless --games 20 --max-ticks 5400 --profile profiles/run1
+    python -m game.headless --games 1000 --workers 8 --metrics 9100
+"""
+import argparse
+import math
+import multiprocessing
+import time
+from typing import Any, Dict, List, Optional
+
+from game.bots import GreedyBot
+from game.config import game_config
+from game.memstats import AllocationMonitor, GCPolicy, parse_thresholds
+from game.metrics import MetricsExporter, MetricsStore, SimMetrics
+from game.play_state import PlayState
+from game.profiler import SamplingProfiler
+from game.replay_archive import ReplayWriter
+
+
+def play_game(seed: int, max_ticks: int, think_ticks: int = 15,
+              monitor: Optional[AllocationMonitor] = None,
+              settle: bool = False, metrics: Optional[SimMetrics] = None,
+              archive: Optional[ReplayWriter] = None) -> Dict[str, Any]:
+    """
+    Play one game with GreedyBot as fast as possible.
+
+    Args:
+        seed: Spawn and bot seed
+        max_ticks: Ship out after this many ticks
+        think_ticks: Bot delay between drops
+        monitor: Measures every tick if given
+        settle: Jump to the next rest state after each drop (PlayState.settle)
+        metrics: Collects counters and histograms for this game if given
+        archive: Records the game (needs settle off: settled games can't be replayed)
+
+    Returns:
+        Result dict (score, ticks, reason, delivered, rotten)
+    """
+    width = game_config.get("board", "width", default=240)
+    height = game_config.get("board", "height", default=200)
+    drop_y = game_config.get("board", "drop_y", default=40)
+
+    state = PlayState(width, height, drop_y, seed=seed)
+    bot = GreedyBot(seed, think_ticks=think_ticks, ship_after=max_ticks)
+    cooldown_ticks = math.ceil(PlayState.DROP_COOLDOWN / PlayState.TICK_DT)
+    if metrics:
+        metrics.attach(state)
+    if archive:
+        archive.record(state)
+    while not state.game_over:
+        if bot.should_ship(state):
+            state.ship()
+            break
+        drop_x = bot.choose(state)
+        if settle and drop_x is not None:
+            before = state.tick
+            state.settle(drop_x, max_ticks=cooldown_ticks + think_ticks)
+            # The bot keeps thinking while the fruit falls
+            bot.skip(state.tick - before - cooldown_ticks)
+            if metrics:
+                metrics.add_ticks(state.tick - before)
+        elif monitor:
+            monitor.begin_frame()
+            state.step(drop_x)
+            monitor.end_frame()
+        else:
+            state.step(drop_x)
+        if archive:
+            archive.record(state)
+    if metrics:
+        metrics.detach(state)
+
+    tracker = state.score_tracker
+    return {
+        "seed": seed,
+        "score": tracker.get_score(),
+        "ticks": state.tick,
+        "reason": state.game_over_reason,
+        "delivered": tracker.delivered_count,
+        "rotten": tracker.rotten_count,
+    }
+
+
+def run(games: int, max_ticks: int, seed: int = 0,
+        profile: Optional[str] = None, profile_interval: float = 0.005,
+        mem_stats: bool = False, gc_policy: Optional[GCPolicy] = None,
+        settle: bool = False, workers: int = 1, metrics_address: Optional[str] = None,
+        metrics_file: Optional[str] = None,
+        archive_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Play a batch of games, optionally under the sampling profiler.
+
+    Args:
+        games: Number of games
+        max_ticks: Tick limit per game
+        seed: Seed of the first game (game i uses seed + i)
+        profile: Write PREFIX.folded / PREFIX.txt profiles if given
+        profile_interval: Seconds between profiler samples
+        mem_stats: Measure allocations and collections per tick
+        gc_policy: Collector settings applied for the whole batch
+        settle: Use the quasi-static settle solver after each drop
+        workers: Worker processes to spread the games over
+        metrics_address: Serve Prometheus metrics on HOST:PORT or PORT
+        metrics_file: Rewrite Prometheus metrics to this file every few seconds
+        archive_path: Append the games to this replay archive
+
+    Returns:
+        One result dict per game (in seed order)
+    """
+    if workers > 1 and (profile or mem_stats or archive_path):
+        raise ValueError("profile, mem_stats and archives need workers=1")
+    if settle and archive_path:
+        raise ValueError("settled games can't be archived (replays re-simulate tick by tick)")
+
+    store = exporter = None
+    if metrics_address or metrics_file:
+        store = MetricsStore(slots=workers, shared=workers > 1)
+        exporter = MetricsExporter(store, metrics_address, metrics_file)
+        exporter.start()
+
+    profiler = SamplingProfiler(profile_interval) if profile else None
+    monitor = AllocationMonitor() if mem_stats else None
+    if monitor:
+        monitor.start()
+    if gc_policy and workers == 1:
+        gc_policy.enter()
+    if profiler:
+        profiler.start()
+
+    start = time.perf_counter()
+    if workers > 1:
+        results = _run_parallel(games, max_ticks, seed, settle, workers, gc_policy, store)
+    else:
+        metrics = SimMetrics(store) if store else None
+        archive = None
+        if archive_path:
+            archive = ReplayWriter(archive_path, game_config.get(
+                "replay", "keyframe_interval", default=300))
+        try:
+            results = [play_game(seed + i, max_ticks, monitor=monitor, settle=settle,
+                                 metrics=metrics, archive=archive)
+                       for i in range(games)]
+        finally:
+            if archive:
+                archive.close()
+    elapsed = time.perf_counter() - start
+
+    if profiler:
+        profiler.stop()
+    if gc_policy and workers == 1:
+        gc_policy.exit()
+    if monitor:
+        monitor.stop()
+    if exporter:
+        exporter.stop()
+        store.close(unlink=True)
+
+    ticks = sum(r["ticks"] for r in results)
+    mean_score = sum(r["score"] for r in results) / max(len(results), 1)
+    print(f"{games} games, {ticks} ticks in {elapsed:.2f}s "
+          f"({ticks / elapsed:.0f} ticks/s, {games / elapsed:.1f} games/s), "
+          f"mean score {mean_score:.1f}")
+
+    if profiler:
+        folded_path, summary_path = profiler.write(profile)
+        print(profiler.summary(top=15))
+        print(f"profile written to {folded_path} and {summary_path}")
+    if monitor:
+        print(monitor.report())
+    return results
+
+
+def _run_parallel(games: int, max_ticks: int, seed: int, settle: bool, workers: int,
+                  gc_policy: Optional[GCPolicy],
+                  store: Optional[MetricsStore]) -> List[Dict[str, Any]]:
+    """
+    Play a batch of games in worker processes (worker k plays every k-th seed).
+
+    Returns:
+        One result dict per game (in seed order)
+    """
+    store_name = store.name if store else None
+    num_stages = store.layout.num_stages if store else None
+    jobs = [(slot, list(range(seed + slot, seed + games, workers)), max_ticks, settle,
+             gc_policy, store_name, workers, num_stages, game_config.config)
+            for slot in range(workers)]
+    context = multiprocessing.get_context()
+    with context.Pool(workers) as pool:
+        batches = pool.starmap(_worker_games, jobs)
+    return sorted((r for batch in batches for r in batch), key=lambda r: r["seed"])
+
+
+def _worker_games(slot: int, seeds: List[int], max_ticks: int, settle: bool,
+                  gc_policy: Optional[GCPolicy], store_name: Optional[str], slots: int,
+                  num_stages: Optional[int], config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Worker process: play the given seeds, writing metrics to its own store row."""
+    game_config.replace(config)
+    store = MetricsStore(slots, name=store_name, num_stages=num_stages) if store_name else None
+    metrics = SimMetrics(store, slot) if store else None
+    if gc_policy:
+        gc_policy.enter()
+    try:
+        return [play_game(game_seed, max_ticks, settle=settle, metrics=metrics)
+                for game_seed in seeds]
+    finally:
+        if gc_policy:
+            gc_policy.exit()
+        if store:
+            store.close()
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run bot games without a window")
+    parser.add_argument("--config", metavar="PATH", help="game config")
+    parser.add_argument("--games", type=int, default=10, help="number of games")
+    parser.add_argument("--max-ticks", type=int, default=5400,
+                        help="ship out after this many ticks (default: 3 minutes)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="sample stacks and write PREFIX.folded and PREFIX.txt")
+    parser.add_argument("--profile-interval", type=float, default=0.005, metavar="SECONDS",
+                        help="seconds between profiler samples")
+    parser.add_argument("--mem-stats", action="store_true",
+                        help="report allocations and collections per tick")
+    parser.add_argument("--gc-freeze", action="store_true",
+                        help="gc.freeze() long-lived objects before playing")
+    parser.add_argument("--gc-threshold", type=parse_thresholds, metavar="T0[,T1[,T2]]",
+                        help="collector thresholds while playing")
+    parser.add_argument("--settle", action="store_true",
+                        help="skip to the next rest state after each drop (approximate, much faster)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes to spread the games over")
+    parser.add_argument("--metrics", metavar="ADDRESS",
+                        help="serve Prometheus metrics on http://ADDRESS/metrics (HOST:PORT or PORT)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="rewrite Prometheus metrics to PATH every few seconds")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="append the games to a seekable replay archive")
+    args = parser.parse_args(argv)
+    if args.workers > 1 and (args.profile or args.mem_stats or args.archive):
+        parser.error("--profile, --mem-stats and --archive need --workers 1")
+    if args.settle and args.archive:
+        parser.error("--archive can't be combined with --settle")
+
+    if args.config:
+        game_config.load(args.config)
+    gc_policy = None
+    if args.gc_freeze or args.gc_threshold:
+        gc_policy = GCPolicy(freeze=args.gc_freeze, thresholds=args.gc_threshold)
+    run(args.games, args.max_ticks, args.seed, args.profile, args.profile_interval,
+        args.mem_stats, gc_policy, args.settle, args.workers, args.metrics, args.metrics_file,
+        args.archive)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""Deterministic lockstep versus mode over loopback sockets.
+
+Two peers play on mirrored boards fed by the same seeded spawn sequence.
+Every peer simulates *both* boards; only inputs travel over the wire:
+
+- HELLO (once, both ways): magic, protocol version, seed, input delay,
+  checksum interval and the config fingerprint. The host's seed and timing
+  settings win; a different config is refused.
+- INPUT (every tick): one uint16 for tick ``t + input_delay`` - the drop X,
+  NO_INPUT or SHIP. Inputs for the first ``input_delay`` ticks are
+  implicitly NO_INPUT, so a peer can run that far ahead before it has to
+  wait for the other side.
+- CHECKSUM (every ``checksum_interval`` ticks): CRC32 of both boards right
+  after that tick was simulated, to detect desyncs.
+
+Both sides follow the same schedule (INPUT for ``t + delay``, then the
+CHECKSUM for ``t`` if one is due), so the stream needs no framing at all:
+a match costs 2 bytes per tick plus 4 bytes per checksum.
+
+Addresses use the spectator stream format (see game.spectator.parse_address).
+
+Run a bot opponent with ``python -m game.lockstep ADDRESS``.
+"""
+import argparse
+import random
+import socket
+import struct
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from game.bots import GreedyBot
+from game.config import game_config
+from game.play_state import PlayState
+from game.spectator import parse_address
+
+PROTOCOL_MAGIC = b"MKLS"
+PROTOCOL_VERSION = 1
+
+# Input codes (anything else is a drop X position)
+NO_INPUT = 0xFFFF
+SHIP = 0xFFFE
+MAX_DROP_X = 0xFFFD
+
+HELLO = struct.Struct("<4sBIBH12s")  # magic, version, seed, input delay, checksum interval, config id
+INPUT = struct.Struct("<H")          # input code
+CHECKSUM = struct.Struct("<I")       # CRC32 of both boards
+CHECK_BOARD = struct.Struct("<IHHHB")  # tick, delivered, rotten, fruit count, game over
+CHECK_FRUIT = struct.Struct("<Bddd")   # stage, x, y, fresh
+
+
+def board_checksum(boards: List[PlayState]) -> int:
+    """
+    Checksum the simulated state of a list of boards.
+
+    Positions and freshness are hashed as exact doubles: lockstep peers run
+    the same code on the same inputs, so any difference is a desync.
+
+    Args:
+        boards: Boards in player order
+
+    Returns:
+        CRC32 value
+    """
+    crc = 0
+    for board in boards:
+        tracker = board.score_tracker
+        crc = zlib.crc32(CHECK_BOARD.pack(board.tick, tracker.delivered_count,
+                                          tracker.rotten_count, len(board.fruits),
+                                          board.game_over), crc)
+        for fruit in board.fruits:
+            crc = zlib.crc32(CHECK_FRUIT.pack(fruit.stage, fruit.x, fruit.y, fruit.fresh), crc)
+    return crc
+
+
+class LockstepLink:
+    """Socket connection to the other peer, including the handshake."""
+
+    RECV_SIZE = 4096
+
+    def __init__(self, address: str, host: bool, seed: Optional[int] = None,
+                 input_delay: int = 3, checksum_interval: int = 30):
+        """
+        Open the link.
+
+        The host listens and accepts one opponent (see poll); a guest
+        connects right away.
+
+        Args:
+            address: Link address (see game.spectator.parse_address)
+            host: True to wait for an opponent, False to join one
+            seed: Spawn sequence seed (host only; random if None)
+            input_delay: Ticks between entering an input and applying it (host only)
+            checksum_interval: Ticks between desync checks (host only)
+        """
+        self.host = host
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.input_delay = input_delay
+        self.checksum_interval = checksum_interval
+        self.config_id = game_config.fingerprint()
+
+        self.ready = False  # Handshake completed
+        self.error = ""     # Why the link is unusable ("" while fine)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.inbox = bytearray()
+        self._outbox = bytearray()
+
+        family, sock_addr = parse_address(address)
+        self.server = None
+        self.sock = None
+        if host:
+            self.server = socket.socket(family, socket.SOCK_STREAM)
+            if family == socket.AF_INET:
+                self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server.bind(sock_addr)
+            self.server.listen(1)
+            self.server.setblocking(False)
+        else:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.connect(sock_addr)
+            self._attach(sock)
+
+    @property
+    def connected(self) -> bool:
+        """Check if an opponent is connected."""
+        return self.sock is not None
+
+    def _attach(self, sock: socket.socket) -> None:
+        """Start talking to a connected opponent."""
+        sock.setblocking(False)
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self._outbox += HELLO.pack(PROTOCOL_MAGIC, PROTOCOL_VERSION, self.seed,
+                                   self.input_delay, self.checksum_interval,
+                                   self.config_id.encode("ascii"))
+
+    def poll(self) -> None:
+        """Accept the opponent, exchange pending bytes and finish the handshake."""
+        if self.error:
+            return
+
+        if self.sock is None:
+            try:
+                sock, _ = self.server.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            self._attach(sock)
+            self.server.close()
+            self.server = None
+
+        self.flush()
+        while not self.error:
+            try:
+                chunk = self.sock.recv(self.RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                chunk = b""
+            if not chunk:
+                self.error = "OPPONENT LEFT"
+                break
+            self.inbox += chunk
+            self.bytes_received += len(chunk)
+
+        if not self.ready and len(self.inbox) >= HELLO.size:
+            self._handshake()
+
+    def _handshake(self) -> None:
+        """Check the opponent's HELLO and adopt the host's settings."""
+        magic, version, seed, input_delay, checksum_interval, config_id = \
+            HELLO.unpack_from(self.inbox)
+        del self.inbox[:HELLO.size]
+
+        if magic != PROTOCOL_MAGIC or version != PROTOCOL_VERSION:
+            self.error = "PROTOCOL MISMATCH"
+        elif config_id.decode("ascii") != self.config_id:
+            self.error = "CONFIG MISMATCH"
+        else:
+            if not self.host:
+                self.seed = seed
+                self.input_delay = input_delay
+                self.checksum_interval = checksum_interval
+            self.ready = True
+
+    def send(self, data: bytes) -> None:
+        """Queue bytes for the opponent and send as much as possible."""
+        self._outbox += data
+        self.flush()
+
+    def flush(self) -> None:
+        """Send queued bytes without blocking."""
+        if not self._outbox or self.sock is None or self.error:
+            return
+        try:
+            sent = self.sock.send(self._outbox)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self.error = "OPPONENT LEFT"
+            return
+        self.bytes_sent += sent
+        del self._outbox[:sent]
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.flush()
+        for sock in (self.sock, self.server):
+            if sock is not None:
+                sock.close()
+        self.sock = None
+        self.server = None
+
+
+class LockstepMatch:
+    """Two mirrored boards advanced in lockstep from exchanged inputs."""
+
+    # Extra ticks simulated per update when behind the opponent
+    MAX_CATCH_UP = 2
+
+    def __init__(self, link: LockstepLink):
+        """
+        Initialize match (the boards are created once the handshake is done).
+
+        Args:
+            link: Connection to the opponent
+        """
+        self.link = link
+        self.local_player = 0 if link.host else 1
+        self.boards: List[PlayState] = []
+        self.tick = 0        # Next tick to simulate
+        self.stalls = 0      # Updates spent waiting for the opponent's input
+        self.desync_tick = -1  # First tick whose checksums differed (-1 = in sync)
+
+        self._pending = NO_INPUT     # Local input waiting for the next send
+        self._sent_until = 0         # Local inputs are known for ticks < this
+        self._local_inputs: Dict[int, int] = {}
+        self._remote_inputs: Dict[int, int] = {}
+        self._remote_next = 0        # Next remote input tick expected on the wire
+        self._remote_checksums: Dict[int, int] = {}
+        self._local_checksums: Dict[int, int] = {}
+
+    @property
+    def started(self) -> bool:
+        """Check if the boards exist (handshake done)."""
+        return bool(self.boards)
+
+    @property
+    def local(self) -> PlayState:
+        """This peer's board."""
+        return self.boards[self.local_player]
+
+    @property
+    def remote(self) -> PlayState:
+        """The opponent's board."""
+        return self.boards[1 - self.local_player]
+
+    @property
+    def finished(self) -> bool:
+        """Check if both boards are over."""
+        return self.started and all(board.game_over for board in self.boards)
+
+    @property
+    def bytes_per_tick(self) -> float:
+        """Average bytes sent per simulated tick."""
+        return self.link.bytes_sent / max(self.tick, 1)
+
+    def _start(self) -> None:
+        """Create both boards with the shared seed."""
+        width = game_config.get("board", "width", default=240)
+        height = game_config.get("board", "height", default=200)
+        drop_y = game_config.get("board", "drop_y", default=40)
+        self.boards = [PlayState(width, height, drop_y, seed=self.link.seed) for _ in range(2)]
+
+        delay = self.link.input_delay
+        self._sent_until = delay
+        self._remote_next = delay
+        for tick in range(delay):
+            self._local_inputs[tick] = NO_INPUT
+            self._remote_inputs[tick] = NO_INPUT
+
+    def queue_drop(self, x: float) -> None:
+        """Request a drop at X (sent with the next input)."""
+        self._pending = max(0, min(MAX_DROP_X, int(round(x))))
+
+    def queue_ship(self) -> None:
+        """Request to ship out (sent with the next input)."""
+        self._pending = SHIP
+
+    def update(self) -> int:
+        """
+        Exchange inputs and simulate every tick that both inputs are known for.
+
+        Inputs that arrived before the opponent left are still played out.
+
+        Returns:
+            Number of ticks simulated
+        """
+        link = self.link
+        link.poll()
+        if not link.ready:
+            return 0
+        if not self.started:
+            self._start()
+        self._read_inbox()
+
+        steps = 0
+        while steps <= self.MAX_CATCH_UP and not self.finished:
+            # Send the input for tick + delay (once per tick)
+            if self._sent_until <= self.tick + link.input_delay:
+                code = self._pending
+                self._pending = NO_INPUT
+                self._local_inputs[self._sent_until] = code
+                link.send(INPUT.pack(code))
+                self._sent_until += 1
+
+            if self.tick not in self._remote_inputs:
+                if steps == 0:
+                    self.stalls += 1
+                break
+
+            self._simulate()
+            steps += 1
+            self._read_inbox()
+
+            # Keep going only while behind the opponent (its inputs run ahead)
+            if self._remote_next <= self.tick + link.input_delay + 1:
+                break
+
+        link.flush()
+        return steps
+
+    def _simulate(self) -> None:
+        """Advance both boards by one tick."""
+        tick = self.tick
+        inputs = [0, 0]
+        inputs[self.local_player] = self._local_inputs.pop(tick)
+        inputs[1 - self.local_player] = self._remote_inputs.pop(tick)
+
+        for board, code in zip(self.boards, inputs):
+            if code == SHIP:
+                board.ship()
+            board.step(None if code >= SHIP else code)
+
+        if tick % self.link.checksum_interval == 0:
+            checksum = board_checksum(self.boards)
+            self.link.send(CHECKSUM.pack(checksum))
+            self._local_checksums[tick] = checksum
+            self._compare_checksums(tick)
+        self.tick += 1
+
+    def _read_inbox(self) -> None:
+        """Parse the opponent's inputs and checksums (fixed schedule, no framing)."""
+        inbox = self.link.inbox
+        delay = self.link.input_delay
+        interval = self.link.checksum_interval
+        offset = 0
+        while True:
+            # Each remote tick t carries INPUT(t + delay) then CHECKSUM(t) if due
+            tick = self._remote_next - delay
+            size = INPUT.size + (CHECKSUM.size if tick % interval == 0 else 0)
+            if len(inbox) - offset < size:
+                break
+            self._remote_inputs[self._remote_next] = INPUT.unpack_from(inbox, offset)[0]
+            if size > INPUT.size:
+                self._remote_checksums[tick] = CHECKSUM.unpack_from(inbox, offset + INPUT.size)[0]
+                self._compare_checksums(tick)
+            offset += size
+            self._remote_next += 1
+        if offset:
+            del inbox[:offset]
+
+    def _compare_checksums(self, tick: int) -> None:
+        """Compare checksums for a tick once both sides have one."""
+        if tick in self._local_checksums and tick in self._remote_checksums:
+            if (self._local_checksums.pop(tick) != self._remote_checksums.pop(tick)
+                    and self.desync_tick < 0):
+                self.desync_tick = tick
+
+    def close(self) -> None:
+        """Close the link."""
+        self.link.close()
+
+
+def run_bot(address: str, host: bool = False, seed: Optional[int] = None,
+            input_delay: int = 3, checksum_interval: int = 30,
+            ship_after: Optional[int] = None) -> LockstepMatch:
+    """
+    Play a match with GreedyBot at 30 ticks per second (no window).
+
+    Args:
+        address: Link address
+        host: True to wait for the opponent instead of joining
+        seed, input_delay, checksum_interval: See LockstepLink
+        ship_after: See GreedyBot
+
+    Returns:
+        The finished (or aborted) match
+    """
+    match = LockstepMatch(LockstepLink(address, host, seed, input_delay, checksum_interval))
+    bot = GreedyBot(seed, ship_after=ship_after)
+    next_time = time.perf_counter()
+    try:
+        while not match.finished:
+            if match.started and not match.local.game_over:
+                if bot.should_ship(match.local):
+                    match.queue_ship()
+                else:
+                    choice = bot.choose(match.local)
+                    if choice is not None:
+                        match.queue_drop(choice)
+            if match.update() == 0 and match.link.error:
+                break
+
+            next_time += PlayState.TICK_DT
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+    finally:
+        match.close()
+    return match
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Lockstep versus bot")
+    parser.add_argument("address", help="link address (HOST:PORT, PORT or unix:/path)")
+    parser.add_argument("--host", action="store_true", help="wait for the opponent")
+    parser.add_argument("--config", metavar="PATH", help="game config (must match the opponent)")
+    parser.add_argument("--seed", type=int, help="spawn sequence seed (host only)")
+    parser.add_argument("--input-delay", type=int, default=3, help="input delay in ticks (host only)")
+    parser.add_argument("--checksum-interval", type=int, default=30,
+                        help="ticks between desync checks (host only)")
+    parser.add_argument("--ship-after", type=int, metavar="TICKS",
+                        help="ship out after TICKS instead of playing until jammed")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        game_config.load(args.config)
+
+    match = run_bot(args.address, args.host, args.seed, args.input_delay,
+                    args.checksum_interval, args.ship_after)
+    if match.link.error and not match.finished:
+        print(f"aborted: {match.link.error}")
+    if match.started:
+        scores = [board.score_tracker.get_score() for board in match.boards]
+        sync = "in sync" if match.desync_tick < 0 else f"DESYNC at tick {match.desync_tick}"
+        print(f"ticks={match.tick} scores={scores} {sync} "
+              f"sent={match.link.bytes_sent}B ({match.bytes_per_tick:.2f} B/tick) "
+              f"stalls={match.stalls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Allocation and garbage collector instrumentation.
+
+``AllocationMonitor`` measures every frame (or headless tick):
+
+- net blocks: change in live allocated blocks (``sys.getallocatedblocks``);
+  steady growth means objects are piling up for the collector
+- transient KiB: how far traced memory peaked above the frame's starting
+  point (``tracemalloc``), i.e. the temporary lists/tuples/dicts a frame
+  builds and throws away. CPython has no allocation event counter, so this
+  peak is the churn measure.
+- collections and pause time per generation (``gc.callbacks``)
+
+It can also snapshot traced memory at scene changes and report what grew
+between them. ``GCPolicy`` freezes long-lived objects (``gc.freeze``) and
+adjusts collection thresholds while a game is being played.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from typing import List, Optional, Tuple
+
+
+class GCMonitor:
+    """Counts collections and pause time per generation via gc.callbacks."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self.collections = [0, 0, 0]
+        self.pause_total = [0.0, 0.0, 0.0]
+        self.pause_max = 0.0
+        self._started_at = 0.0
+        self._installed = False
+
+    def install(self) -> None:
+        """Start receiving collector callbacks."""
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        """Stop receiving collector callbacks."""
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def _callback(self, phase: str, info: dict) -> None:
+        """Time each collection."""
+        if phase == "start":
+            self._started_at = time.perf_counter()
+        else:
+            generation = info["generation"]
+            pause = time.perf_counter() - self._started_at
+            self.collections[generation] += 1
+            self.pause_total[generation] += pause
+            self.pause_max = max(self.pause_max, pause)
+
+
+class AllocationMonitor:
+    """Per-frame allocation and collection statistics, plus snapshot diffs."""
+
+    def __init__(self, trace: bool = True, trace_frames: int = 1):
+        """
+        Initialize monitor.
+
+        Args:
+            trace: Use tracemalloc (transient peaks and snapshots); costs
+                speed while enabled
+            trace_frames: Stack depth recorded per traced allocation
+        """
+        self.trace = trace
+        self.trace_frames = trace_frames
+        self.gc_monitor = GCMonitor()
+        self._started_tracing = False
+
+        # Totals over measured frames
+        self.frames = 0
+        self.net_blocks = 0
+        self.transient_total = 0
+        self.transient_max = 0
+        self.collections = [0, 0, 0]
+        self.frames_with_collection = 0
+        self.gc_time_max = 0.0  # Longest time spent collecting within one frame
+
+        self._blocks_start = 0
+        self._traced_start = 0
+        self._collections_start = [0, 0, 0]
+        self._gc_time_start = 0.0
+        self._snapshot = None
+        self._snapshot_label = ""
+        self.snapshot_reports: List[str] = []
+
+    def start(self) -> None:
+        """Begin monitoring."""
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._started_tracing = True
+        self.gc_monitor.install()
+
+    def stop(self) -> None:
+        """Stop monitoring (tracemalloc is stopped only if this monitor started it)."""
+        self.gc_monitor.uninstall()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self) -> None:
+        """Forget frame totals (e.g. after warm-up)."""
+        self.frames = 0
+        self.net_blocks = 0
+        self.transient_total = 0
+        self.transient_max = 0
+        self.collections = [0, 0, 0]
+        self.frames_with_collection = 0
+        self.gc_time_max = 0.0
+
+    def begin_frame(self) -> None:
+        """Mark the start of a frame."""
+        if self.trace:
+            tracemalloc.reset_peak()
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+        self._collections_start = list(self.gc_monitor.collections)
+        self._gc_time_start = sum(self.gc_monitor.pause_total)
+        self._blocks_start = sys.getallocatedblocks()
+
+    def end_frame(self) -> None:
+        """Mark the end of a frame and add it to the totals."""
+        self.net_blocks += sys.getallocatedblocks() - self._blocks_start
+        if self.trace:
+            transient = tracemalloc.get_traced_memory()[1] - self._traced_start
+            self.transient_total += transient
+            self.transient_max = max(self.transient_max, transient)
+
+        gc_monitor = self.gc_monitor
+        if gc_monitor.collections != self._collections_start:
+            for generation in range(3):
+                self.collections[generation] += (gc_monitor.collections[generation]
+                                                 - self._collections_start[generation])
+            self.frames_with_collection += 1
+            gc_time = sum(gc_monitor.pause_total) - self._gc_time_start
+            self.gc_time_max = max(self.gc_time_max, gc_time)
+        self.frames += 1
+
+    @property
+    def net_blocks_per_frame(self) -> float:
+        """Average change in live blocks per frame."""
+        return self.net_blocks / max(self.frames, 1)
+
+    @property
+    def transient_kib_per_frame(self) -> float:
+        """Average transient allocation peak per frame (KiB)."""
+        return self.transient_total / max(self.frames, 1) / 1024
+
+    def snapshot(self, label: str, top: int = 10) -> Optional[str]:
+        """
+        Snapshot traced memory and diff it against the previous snapshot.
+
+        Args:
+            label: Name of the point being recorded (e.g. scene name)
+            top: Number of source lines to report
+
+        Returns:
+            Diff report, or None for the first snapshot / without tracing
+        """
+        if not self.trace or not tracemalloc.is_tracing():
+            return None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        previous, previous_label = self._snapshot, self._snapshot_label
+        self._snapshot, self._snapshot_label = snapshot, label
+        if previous is None:
+            return None
+
+        lines = [f"memory {previous_label} -> {label}:"]
+        for stat in snapshot.compare_to(previous, "lineno")[:top]:
+            lines.append(f"  {stat}")
+        report = "\n".join(lines)
+        self.snapshot_reports.append(report)
+        return report
+
+    def report(self) -> str:
+        """Summary of the measured frames."""
+        frames = max(self.frames, 1)
+        lines = [
+            f"frames: {self.frames}",
+            f"net blocks/frame: {self.net_blocks_per_frame:+.2f}",
+        ]
+        if self.trace:
+            lines.append(f"transient KiB/frame: {self.transient_kib_per_frame:.2f} "
+                         f"(max {self.transient_max / 1024:.1f})")
+        lines.append("collections per 1000 frames: " + ", ".join(
+            f"gen{gen} {count * 1000 / frames:.1f}"
+            for gen, count in enumerate(self.collections)))
+        lines.append(f"frames with a collection: {self.frames_with_collection}, "
+                     f"longest in-frame GC {self.gc_time_max * 1000:.2f}ms, "
+                     f"longest pause overall {self.gc_monitor.pause_max * 1000:.2f}ms")
+        return "\n".join(lines)
+
+
+class GCPolicy:
+    """Collector settings applied while a game is being played."""
+
+    def __init__(self, freeze: bool = True, thresholds: Optional[Tuple[int, ...]] = None):
+        """
+        Initialize policy.
+
+        Args:
+            freeze: Move everything alive at game start (config, tables,
+                images, modules) to the permanent generation so full
+                collections don't rescan it
+            thresholds: gc.set_threshold values during play (unchanged if None)
+        """
+        self.freeze = freeze
+        self.thresholds = thresholds
+        self._saved_thresholds = None
+        self.active = False
+
+    def enter(self) -> None:
+        """Apply the policy (call when a game starts)."""
+        if self.active:
+            return
+        gc.collect()
+        if self.freeze:
+            gc.freeze()
+        if self.thresholds:
+            self._saved_thresholds = gc.get_threshold()
+            gc.set_threshold(*self.thresholds)
+        self.active = True
+
+    def exit(self) -> None:
+        """Restore the collector (call when the game ends)."""
+        if not self.active:
+            return
+        if self._saved_thresholds:
+            gc.set_threshold(*self._saved_thresholds)
+            self._saved_thresholds = None
+        if self.freeze:
+            gc.unfreeze()
+        self.active = False
+
+
+def parse_thresholds(text: str) -> Tuple[int, ...]:
+    """Parse collector thresholds from the command line ("700,10,10")."""
+    return tuple(int(value) for value in text.split(","))
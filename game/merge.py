@@ -16,6 +16,13 @@ class MergeManager:
         """
         self.physics = physics
 
+        # True once a fully asleep board with no cooldowns left has been checked
+        self._settled = False
+
+    def invalidate(self) -> None:
+        """Forget that the board was settled (call after replacing the fruits)."""
+        self._settled = False
+
     def check_and_merge(self, fruits: List[Fruit]) -> List[Tuple[Fruit, Fruit, Fruit]]:
         """
         Check for mergeable fruits and create merged fruits.
@@ -26,43 +33,42 @@ class MergeManager:
         Returns:
             List of (fruit_a, fruit_b, merged_fruit) tuples
         """
+        # A settled board cannot produce new merges until something changes
+        settled = True
+        for fruit in fruits:
+            if not fruit.sleeping or fruit.merge_cooldown > 0:
+                settled = False
+                break
+        if settled and self._settled:
+            return []
+        self._settled = settled
+
         merges = []
+        consumed = set()
 
-        i = 0
-        while i < len(fruits):
-            fruit_a = fruits[i]
+        # Only fruits in the same or adjacent grid cells can touch
+        self.physics.rebuild_index(fruits)
 
-            if not fruit_a.can_merge():
-                i += 1
+        for fruit_a, fruit_b in self.physics.index.candidate_pairs():
+            # Check if same stage and both free to merge
+            if fruit_a.stage != fruit_b.stage:
                 continue
-
-            # Look for matching fruit to merge
-            j = i + 1
-            merged = False
-
-            while j < len(fruits):
-                fruit_b = fruits[j]
-
-                if not fruit_b.can_merge():
-                    j += 1
-                    continue
-
-                # Check if same stage and colliding
-                if fruit_a.stage == fruit_b.stage:
-                    if self.physics.check_collision(fruit_a, fruit_b):
-                        # Create merged fruit
-                        merged_fruit = self._merge_fruits(fruit_a, fruit_b)
-                        merges.append((fruit_a, fruit_b, merged_fruit))
-                        merged = True
-                        break
-
-                j += 1
-
-            if merged:
-                # Don't increment i, check same position again
+            if fruit_a in consumed or fruit_b in consumed:
+                continue
+            if not fruit_a.can_merge() or not fruit_b.can_merge():
                 continue
 
-            i += 1
+            # Sleeping fruits rest just touching instead of slightly overlapping
+            slop = 0.0
+            if fruit_a.sleeping or fruit_b.sleeping:
+                slop = self.physics.CONTACT_SLOP
+
+            if self.physics.check_collision(fruit_a, fruit_b, slop):
+                # Create merged fruit; both parents are used up
+                merged_fruit = self._merge_fruits(fruit_a, fruit_b)
+                merges.append((fruit_a, fruit_b, merged_fruit))
+                consumed.add(fruit_a)
+                consumed.add(fruit_b)
 
         return merges
 
@@ -120,8 +126,17 @@ class MergeManager:
             to_remove.add(fruit_a)
             to_remove.add(fruit_b)
 
-        # Remove merged fruits
-        fruits[:] = [f for f in fruits if f not in to_remove]
+        # Remove merged fruits; anything resting on them must fall again
+        for fruit in to_remove:
+            self.physics.wake_neighbors(fruit)
+
+        # Compact in place (keeps the list and its order)
+        write = 0
+        for fruit in fruits:
+            if fruit not in to_remove:
+                fruits[write] = fruit
+                write += 1
+        del fruits[write:]
 
         # Add new fruits and collect mikan
         delivered_mikan = []
@@ -0,0 +1,387 @@
+"""Prometheus metrics for headless simulation runs.
+
+``SimMetrics`` collects counters and histograms for the boards it is
+attached to: ticks, games by end reason, drops, merges per stage,
+deliveries, rotten deliveries, and per-tick histograms of fruits on the
+board, contacts, and physics/merge time. Game events come from the board's
+EventBus; the per-tick values from one cheap call in ``PlayState.step()``.
+
+Values are accumulated in a plain list and copied every ``flush_ticks``
+ticks into the process's own row of a ``MetricsStore``. With worker
+processes the store lives in shared memory: each row has a single writer,
+so no locks are needed, and the exporter sums the rows when it renders
+(a row being copied may be read half old / half new, which is fine for
+monitoring).
+
+``MetricsExporter`` serves the totals in Prometheus text format on
+``http://HOST:PORT/metrics`` and/or rewrites a file (for node_exporter's
+textfile collector) every few seconds.
+"""
+import bisect
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+import numpy as np
+from game.spectator import parse_address
+from game.stages import stage_table
+
+PREFIX = "mikan"
+
+# End reasons (PlayState.game_over_reason) -> "reason" label
+REASON_LABELS = {"SHIPPED OUT": "ship", "JAMMED!": "jam"}
+REASONS = ("ship", "jam", "other")
+
+COUNTERS = (
+    ("ticks", "Simulated ticks"),
+    ("drops", "Fruits dropped"),
+    ("deliveries", "Mikan delivered"),
+    ("rotten_deliveries", "Rotten mikan delivered"),
+)
+
+# name -> (help, bucket upper bounds)
+HISTOGRAMS = {
+    "fruits_on_board": ("Fruits on the board per tick",
+                        (5, 10, 15, 20, 30, 40, 60, 80, 120)),
+    "contacts_per_tick": ("Touching fruit pairs per physics tick",
+                          (0, 1, 2, 4, 8, 16, 32, 64, 128)),
+    "physics_seconds": ("Physics (and decay) time per tick",
+                        (1e-5, 3e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2)),
+    "merge_seconds": ("Merge check and apply time per tick",
+                      (1e-6, 3e-6, 1e-5, 3e-5, 1e-4, 3e-4, 1e-3)),
+}
+
+
+class MetricsLayout:
+    """Offsets of every value in a metrics row."""
+
+    def __init__(self, num_stages: int):
+        """
+        Lay out the row.
+
+        Args:
+            num_stages: Stages with a merge counter each
+        """
+        self.offsets: Dict[str, int] = {}
+        size = 0
+        for name, _ in COUNTERS:
+            self.offsets[name] = size
+            size += 1
+        self.offsets["games"] = size
+        size += len(REASONS)
+        self.offsets["merges"] = size
+        size += num_stages
+        # Histograms: one count per bucket (+Inf last), then the sum
+        # (the count is the total of the buckets)
+        for name, (_, buckets) in HISTOGRAMS.items():
+            self.offsets[name] = size
+            size += len(buckets) + 2
+        self.num_stages = num_stages
+        self.size = size
+
+
+class MetricsStore:
+    """Per-process rows of metric values (summed on export)."""
+
+    def __init__(self, slots: int = 1, shared: bool = False,
+                 name: Optional[str] = None, num_stages: Optional[int] = None):
+        """
+        Create a store, or attach to a shared one by name.
+
+        Args:
+            slots: Rows (one per writing process)
+            shared: Put the rows in shared memory (for worker processes)
+            name: Attach to the existing shared store with this name
+            num_stages: Merge counters per row (current stage table if None)
+        """
+        self.layout = MetricsLayout(num_stages if num_stages is not None
+                                    else stage_table().num_stages)
+        self.slots = slots
+        self._shm = None
+        shape = (slots, self.layout.size)
+        if shared or name:
+            size = slots * self.layout.size * 8
+            self._shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+            self.rows = np.ndarray(shape, dtype=np.float64, buffer=self._shm.buf)
+            if name is None:
+                self.rows[:] = 0.0
+        else:
+            self.rows = np.zeros(shape, dtype=np.float64)
+
+    @property
+    def name(self) -> Optional[str]:
+        """Shared memory name to attach workers with (None if not shared)."""
+        return self._shm.name if self._shm else None
+
+    def totals(self) -> np.ndarray:
+        """Sum of all rows."""
+        return self.rows.sum(axis=0)
+
+    def close(self, unlink: bool = False) -> None:
+        """
+        Release the shared memory.
+
+        Args:
+            unlink: Also destroy it (the creating process, when done)
+        """
+        if self._shm:
+            self.rows = None
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+            self._shm = None
+
+
+class SimMetrics:
+    """Collects metrics for PlayStates and writes them to one store row."""
+
+    def __init__(self, store: MetricsStore, slot: int = 0, flush_ticks: int = 300):
+        """
+        Initialize collector.
+
+        Args:
+            store: Store to flush into
+            slot: Row owned by this collector (one writer per row)
+            flush_ticks: Ticks between copies into the store
+        """
+        self.store = store
+        self.slot = slot
+        self.flush_ticks = flush_ticks
+        layout = store.layout
+        self.values: List[float] = [0.0] * layout.size
+        self._unflushed = 0
+
+        offsets = layout.offsets
+        self._ticks = offsets["ticks"]
+        self._drops = offsets["drops"]
+        self._deliveries = offsets["deliveries"]
+        self._rotten = offsets["rotten_deliveries"]
+        self._games = offsets["games"]
+        self._merges = offsets["merges"]
+        self._num_stages = layout.num_stages
+        # (first bucket, bucket bounds, sum) per histogram, unpacked for observe_tick()
+        histograms = {name: (offsets[name], buckets, offsets[name] + len(buckets) + 1)
+                      for name, (_, buckets) in HISTOGRAMS.items()}
+        self._fruits_at, self._fruits_bounds, self._fruits_sum = histograms["fruits_on_board"]
+        self._contacts_at, self._contacts_bounds, self._contacts_sum = histograms["contacts_per_tick"]
+        self._physics_at, self._physics_bounds, self._physics_sum = histograms["physics_seconds"]
+        self._merge_at, self._merge_bounds, self._merge_sum = histograms["merge_seconds"]
+
+    def attach(self, state) -> None:
+        """Start collecting from a PlayState."""
+        state.metrics = self
+        state.events.subscribe(self)
+
+    def detach(self, state) -> None:
+        """Stop collecting from a PlayState and flush."""
+        state.metrics = None
+        state.events.unsubscribe(self)
+        self.flush()
+
+    def __call__(self, kind: str, tick: int, fields: Dict[str, Any]) -> None:
+        """Count a game event (EventBus subscriber)."""
+        values = self.values
+        if kind == "merge":
+            stage = fields["stage"]
+            if 0 <= stage < self._num_stages:
+                values[self._merges + stage] += 1
+        elif kind == "drop":
+            values[self._drops] += 1
+        elif kind == "deliver":
+            values[self._deliveries] += 1
+            if fields["rotten"]:
+                values[self._rotten] += 1
+        elif kind == "end":
+            reason = REASON_LABELS.get(fields["reason"], "other")
+            values[self._games + REASONS.index(reason)] += 1
+            self.flush()
+
+    def observe_tick(self, physics_seconds: float, merge_seconds: float,
+                     fruits: int, contacts: int) -> None:
+        """
+        Record one simulated tick (called by PlayState.step()).
+
+        Args:
+            physics_seconds: Time spent in physics
+            merge_seconds: Time spent checking and applying merges
+            fruits: Fruits on the board
+            contacts: Touching pairs found by the physics pass
+        """
+        values = self.values
+        bucket = bisect.bisect_left
+        values[self._ticks] += 1
+        values[self._fruits_at + bucket(self._fruits_bounds, fruits)] += 1
+        values[self._fruits_sum] += fruits
+        values[self._contacts_at + bucket(self._contacts_bounds, contacts)] += 1
+        values[self._contacts_sum] += contacts
+        values[self._physics_at + bucket(self._physics_bounds, physics_seconds)] += 1
+        values[self._physics_sum] += physics_seconds
+        values[self._merge_at + bucket(self._merge_bounds, merge_seconds)] += 1
+        values[self._merge_sum] += merge_seconds
+
+        self._unflushed += 1
+        if self._unflushed >= self.flush_ticks:
+            self.flush()
+
+    def add_ticks(self, ticks: int) -> None:
+        """Count ticks skipped over without step() (PlayState.settle())."""
+        self.values[self._ticks] += ticks
+
+    def flush(self) -> None:
+        """Copy the values into this collector's store row."""
+        self.store.rows[self.slot] = self.values
+        self._unflushed = 0
+
+
+def render(store: MetricsStore, uptime: float) -> str:
+    """
+    Format the store totals in Prometheus text format.
+
+    Args:
+        store: Metrics store
+        uptime: Seconds since collection started (for the rate gauges)
+
+    Returns:
+        Exposition text
+    """
+    totals = store.totals()
+    offsets = store.layout.offsets
+    lines = []
+
+    def header(name: str, help_text: str, kind: str) -> str:
+        full = f"{PREFIX}_{name}"
+        lines.append(f"# HELP {full} {help_text}.")
+        lines.append(f"# TYPE {full} {kind}")
+        return full
+
+    for name, help_text in COUNTERS:
+        full = header(f"{name}_total", help_text, "counter")
+        lines.append(f"{full} {totals[offsets[name]]:.0f}")
+
+    full = header("games_total", "Games finished by end reason", "counter")
+    for index, reason in enumerate(REASONS):
+        lines.append(f'{full}{{reason="{reason}"}} {totals[offsets["games"] + index]:.0f}')
+
+    full = header("merges_total", "Merges by resulting stage", "counter")
+    names = stage_table().names
+    for stage in range(store.layout.num_stages):
+        label = names[stage] if stage < len(names) else str(stage)
+        lines.append(f'{full}{{stage="{label}"}} {totals[offsets["merges"] + stage]:.0f}')
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        full = header(name, help_text, "histogram")
+        offset = offsets[name]
+        cumulative = 0.0
+        for index, bound in enumerate(buckets + (float("inf"),)):
+            cumulative += totals[offset + index]
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f'{full}_bucket{{le="{le}"}} {cumulative:.0f}')
+        lines.append(f"{full}_sum {totals[offset + len(buckets) + 1]:.9g}")
+        lines.append(f"{full}_count {cumulative:.0f}")
+
+    # Convenience gauges for runs not scraped by Prometheus (use rate() when they are)
+    ticks = totals[offsets["ticks"]]
+    games = totals[offsets["games"]:offsets["games"] + len(REASONS)]
+    full = header("uptime_seconds", "Seconds since collection started", "gauge")
+    lines.append(f"{full} {uptime:.3f}")
+    full = header("ticks_per_second", "Mean ticks per second since start", "gauge")
+    lines.append(f"{full} {ticks / uptime if uptime > 0 else 0.0:.1f}")
+    full = header("games_per_second", "Mean games per second since start", "gauge")
+    lines.append(f"{full} {games.sum() / uptime if uptime > 0 else 0.0:.3f}")
+    full = header("jam_ratio", "Jammed games per shipped game", "gauge")
+    jams, ships = games[REASONS.index("jam")], games[REASONS.index("ship")]
+    lines.append(f"{full} {jams / ships if ships else 0.0:.4f}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Publishes a store over HTTP and/or to a periodically rewritten file."""
+
+    def __init__(self, store: MetricsStore, address: Optional[str] = None,
+                 path: Optional[str] = None, interval: float = 5.0):
+        """
+        Initialize exporter (call start()).
+
+        Args:
+            store: Metrics store
+            address: Serve /metrics on "HOST:PORT" or "PORT" (localhost)
+            path: Rewrite this file every interval seconds
+            interval: Seconds between file rewrites
+        """
+        self.store = store
+        self.address = None
+        if address:
+            family, self.address = parse_address(address)
+            if family != socket.AF_INET:
+                raise ValueError(f"metrics need a TCP address (HOST:PORT or PORT): {address}")
+        self.path = path
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._server = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def render(self) -> str:
+        """Current exposition text."""
+        return render(self.store, time.perf_counter() - self.started)
+
+    def start(self) -> None:
+        """Start serving / writing in background threads."""
+        self.started = time.perf_counter()
+        if self.address:
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/metrics", "/"):
+                        self.send_error(404)
+                        return
+                    body = exporter.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # No per-scrape logging
+
+            self._server = ThreadingHTTPServer(self.address, Handler)
+            self._server.daemon_threads = True
+            self._spawn(self._server.serve_forever, "metrics-http")
+        if self.path:
+            self._spawn(self._write_loop, "metrics-file")
+
+    def stop(self) -> None:
+        """Stop the background threads (the file gets a final rewrite)."""
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self.path:
+            self.write()
+
+    def write(self) -> None:
+        """Rewrite the metrics file atomically."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, self.path)
+
+    def _write_loop(self) -> None:
+        """Rewrite the file until stopped."""
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def _spawn(self, target, name: str) -> None:
+        """Start a daemon thread."""
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
@@ -1,12 +1,25 @@
 """Custom 2D circle physics engine."""
 import math
-from typing import List
+from typing import List, Optional, Tuple
 from game.fruit import Fruit
 from game.config import game_config
+from game.spatial import SpatialGrid
+from game.stages import stage_table
 
 
 class PhysicsEngine:
-    """Handles physics simulation for circular fruits."""
+    """
+    Handles physics simulation for circular fruits.
+
+    Fruits that move slower than ``physics.sleep_speed`` for ``physics.sleep_time``
+    seconds fall asleep together with every fruit they touch (an island).
+    Sleeping fruits are skipped by integration, wall clamping and the
+    collision pass. An island wakes as a whole when an awake fruit overlaps
+    one of its members or when a member (or a neighbour) is removed by a merge.
+    """
+
+    # Extra gap at which resting fruits still count as touching
+    CONTACT_SLOP = 1.0
 
     def __init__(self, width: int, height: int):
         """
@@ -19,20 +32,34 @@ class PhysicsEngine:
         self.width = width
         self.height = height
 
+        # Spatial index (cells fit the largest fruit so contacts are always adjacent)
+        self.index = SpatialGrid(stage_table().max_radius * 2)
+        self._index_revision = game_config.revision
+
+        # Touching pairs found by the last update (for metrics)
+        self.last_contacts = 0
+
     def update(self, fruits: List[Fruit], dt: float) -> None:
         """
-        Update physics for all fruits.
+        Update physics for all awake fruits.
 
         Args:
             fruits: List of fruits to update
             dt: Delta time in seconds
         """
+        awake = [f for f in fruits if f.dropped and not f.sleeping]
+        if not awake:
+            self.last_contacts = 0
+            return  # Settled board: nothing moves
+
         gravity = game_config.get("physics", "gravity", default=300.0)
         friction = game_config.get("physics", "friction", default=0.98)
 
-        for fruit in fruits:
-            if not fruit.dropped:
-                continue
+        for fruit in awake:
+            # Position before the step (resting fruits keep a residual velocity
+            # that the collision pass cancels, so rest is measured by displacement)
+            fruit.start_x = fruit.x
+            fruit.start_y = fruit.y
 
             # Apply gravity
             fruit.vy += gravity * dt
@@ -46,8 +73,12 @@ class PhysicsEngine:
             fruit.y += fruit.vy * dt
 
         # Resolve collisions
-        self._resolve_wall_collisions(fruits)
-        self._resolve_fruit_collisions(fruits)
+        self._resolve_wall_collisions(awake)
+        self._build_index(fruits)
+        contacts = self._resolve_fruit_collisions(fruits)
+        self.last_contacts = len(contacts)
+
+        self._update_sleep(awake, contacts, dt)
 
     def _resolve_wall_collisions(self, fruits: List[Fruit]) -> None:
         """Resolve collisions with walls and floor."""
@@ -71,59 +102,177 @@ class PhysicsEngine:
             if fruit.y + fruit.radius > self.height:
                 fruit.y = self.height - fruit.radius
                 fruit.vy = -abs(fruit.vy) * bounce
+                fruit.landed = True
 
                 # Stop if moving slowly
                 if abs(fruit.vy) < 10:
                     fruit.vy = 0
 
-    def _resolve_fruit_collisions(self, fruits: List[Fruit]) -> None:
-        """Resolve collisions between fruits."""
-        for i in range(len(fruits)):
-            for j in range(i + 1, len(fruits)):
-                fruit_a = fruits[i]
-                fruit_b = fruits[j]
-
-                if not fruit_a.dropped or not fruit_b.dropped:
-                    continue
-
-                # Check collision
-                dx = fruit_b.x - fruit_a.x
-                dy = fruit_b.y - fruit_a.y
-                dist = math.sqrt(dx * dx + dy * dy)
-                min_dist = fruit_a.radius + fruit_b.radius
-
-                if dist < min_dist and dist > 0:
-                    # Separate fruits
-                    overlap = min_dist - dist
-                    nx = dx / dist
-                    ny = dy / dist
-
-                    # Move apart proportionally
-                    fruit_a.x -= nx * overlap * 0.5
-                    fruit_a.y -= ny * overlap * 0.5
-                    fruit_b.x += nx * overlap * 0.5
-                    fruit_b.y += ny * overlap * 0.5
-
-                    # Bounce (elastic collision)
-                    relative_vx = fruit_b.vx - fruit_a.vx
-                    relative_vy = fruit_b.vy - fruit_a.vy
-                    dot_product = relative_vx * nx + relative_vy * ny
-
-                    if dot_product < 0:  # Moving towards each other
-                        bounce = game_config.get("physics", "bounce", default=0.3)
-
-                        fruit_a.vx += nx * dot_product * bounce
-                        fruit_a.vy += ny * dot_product * bounce
-                        fruit_b.vx -= nx * dot_product * bounce
-                        fruit_b.vy -= ny * dot_product * bounce
-
-    def check_collision(self, fruit_a: Fruit, fruit_b: Fruit) -> bool:
+    def _resolve_fruit_collisions(self, fruits: List[Fruit]) -> List[Tuple[Fruit, Fruit]]:
+        """
+        Resolve collisions between fruits (candidates from the spatial index).
+
+        Returns:
+            Touching pairs involving at least one awake fruit
+        """
+        bounce = game_config.get("physics", "bounce", default=0.3)
+        slop = self.CONTACT_SLOP
+        contacts = []
+
+        for fruit_a, fruit_b in self.index.candidate_pairs():
+            if fruit_a.sleeping and fruit_b.sleeping:
+                continue
+
+            # Check collision
+            dx = fruit_b.x - fruit_a.x
+            dy = fruit_b.y - fruit_a.y
+            dist = math.sqrt(dx * dx + dy * dy)
+            min_dist = fruit_a.radius + fruit_b.radius
+
+            if dist >= min_dist + slop:
+                continue
+            contacts.append((fruit_a, fruit_b))
+            fruit_a.landed = True
+            fruit_b.landed = True
+
+            if dist < min_dist and dist > 0:
+                # New contact with a resting island wakes it
+                if fruit_a.sleeping:
+                    self.wake(fruit_a)
+                if fruit_b.sleeping:
+                    self.wake(fruit_b)
+
+                # Separate fruits
+                overlap = min_dist - dist
+                nx = dx / dist
+                ny = dy / dist
+
+                # Move apart proportionally
+                fruit_a.x -= nx * overlap * 0.5
+                fruit_a.y -= ny * overlap * 0.5
+                fruit_b.x += nx * overlap * 0.5
+                fruit_b.y += ny * overlap * 0.5
+
+                # Bounce (elastic collision)
+                relative_vx = fruit_b.vx - fruit_a.vx
+                relative_vy = fruit_b.vy - fruit_a.vy
+                dot_product = relative_vx * nx + relative_vy * ny
+
+                if dot_product < 0:  # Moving towards each other
+                    fruit_a.vx += nx * dot_product * bounce
+                    fruit_a.vy += ny * dot_product * bounce
+                    fruit_b.vx -= nx * dot_product * bounce
+                    fruit_b.vy -= ny * dot_product * bounce
+
+        return contacts
+
+    def _update_sleep(self, awake: List[Fruit],
+                      contacts: List[Tuple[Fruit, Fruit]], dt: float) -> None:
+        """
+        Advance rest timers and put settled islands to sleep.
+
+        Args:
+            awake: Fruits simulated this step (start_x/start_y set before moving)
+            contacts: Touching pairs from the collision pass
+            dt: Delta time in seconds
+        """
+        sleep_speed = game_config.get("physics", "sleep_speed", default=12.0)
+        sleep_time = game_config.get("physics", "sleep_time", default=0.5)
+        limit = (sleep_speed * dt) ** 2
+
+        for fruit in awake:
+            dx = fruit.x - fruit.start_x
+            dy = fruit.y - fruit.start_y
+            if dx * dx + dy * dy < limit:
+                fruit.sleep_timer += dt
+            else:
+                fruit.sleep_timer = 0.0
+
+        # Islands of touching fruits (union-find)
+        parent = {}
+
+        def find(fruit):
+            root = parent.setdefault(fruit, fruit)
+            while root is not parent[root]:
+                root = parent[root]
+            while fruit is not root:
+                parent[fruit], fruit = root, parent[fruit]
+            return root
+
+        for fruit in awake:
+            parent[fruit] = fruit
+        for fruit_a, fruit_b in contacts:
+            root_a = find(fruit_a)
+            root_b = find(fruit_b)
+            if root_a is not root_b:
+                parent[root_a] = root_b
+
+        islands = {}
+        for fruit in parent:
+            islands.setdefault(find(fruit), []).append(fruit)
+
+        for members in islands.values():
+            if not all(f.sleeping or f.sleep_timer >= sleep_time for f in members):
+                continue
+
+            # Touching sleeping islands join this one so they wake together
+            island = []
+            seen = set()
+            for fruit in members:
+                for member in (fruit.island if fruit.sleeping and fruit.island else (fruit,)):
+                    if member not in seen:
+                        seen.add(member)
+                        island.append(member)
+
+            for fruit in island:
+                fruit.sleeping = True
+                fruit.vx = 0.0
+                fruit.vy = 0.0
+                fruit.island = island
+
+    def wake(self, fruit: Fruit) -> None:
+        """
+        Wake a fruit and everything in its island.
+
+        Args:
+            fruit: Fruit to wake
+        """
+        for member in fruit.island or (fruit,):
+            member.sleeping = False
+            member.sleep_timer = 0.0
+            member.island = None
+
+    def wake_neighbors(self, fruit: Fruit) -> None:
+        """
+        Wake a fruit's island and any sleeping fruit touching it.
+
+        Used when a fruit leaves the board (merge) so nothing stays asleep
+        resting on it.
+
+        Args:
+            fruit: Fruit being removed or disturbed
+        """
+        if fruit.sleeping:
+            self.wake(fruit)
+
+        reach = fruit.radius + self.index.max_radius + self.CONTACT_SLOP
+        for other in self.index.query_rect(fruit.x - reach, fruit.y - reach,
+                                           fruit.x + reach, fruit.y + reach):
+            if other.sleeping:
+                dx = other.x - fruit.x
+                dy = other.y - fruit.y
+                touch = other.radius + fruit.radius + self.CONTACT_SLOP
+                if dx * dx + dy * dy < touch * touch:
+                    self.wake(other)
+
+    def check_collision(self, fruit_a: Fruit, fruit_b: Fruit, slop: float = 0.0) -> bool:
         """
         Check if two fruits are colliding.
 
         Args:
             fruit_a: First fruit
             fruit_b: Second fruit
+            slop: Extra gap still counted as a collision
 
         Returns:
             True if colliding
@@ -131,6 +280,58 @@ class PhysicsEngine:
         dx = fruit_b.x - fruit_a.x
         dy = fruit_b.y - fruit_a.y
         dist = math.sqrt(dx * dx + dy * dy)
-        min_dist = fruit_a.radius + fruit_b.radius
+        min_dist = fruit_a.radius + fruit_b.radius + slop
 
         return dist < min_dist
+
+    def rebuild_index(self, fruits: List[Fruit]) -> None:
+        """
+        Refresh the spatial index after the fruit list changed (e.g. merges).
+
+        Args:
+            fruits: Current fruit list
+        """
+        self._build_index(fruits)
+
+    def _build_index(self, fruits: List[Fruit]) -> None:
+        """Rebuild the spatial index, resizing its cells when the config changed."""
+        if self._index_revision != game_config.revision:
+            # Radii may have changed: fruits already on the board keep theirs
+            largest = max((f.radius for f in fruits), default=0)
+            self.index.cell_size = max(stage_table().max_radius, largest) * 2
+            self._index_revision = game_config.revision
+        self.index.build(fruits)
+
+    def cast_circle_down(self, x: float, radius: float,
+                         start_y: float) -> Tuple[float, Optional[Fruit]]:
+        """
+        Find where a circle dropped straight down from start_y first touches.
+
+        Args:
+            x: Circle center X
+            radius: Circle radius
+            start_y: Center Y where the fall starts
+
+        Returns:
+            (center_y, fruit) at first contact; fruit is None when it lands on the floor
+        """
+        return self.index.cast_circle_down(x, radius, start_y, self.height)
+
+    def overlap_point(self, x: float, y: float) -> List[Fruit]:
+        """
+        Get fruits containing a point.
+
+        Args:
+            x, y: Point in play area coordinates
+        """
+        return self.index.overlap_point(x, y)
+
+    def k_nearest(self, x: float, y: float, k: int) -> List[Fruit]:
+        """
+        Get the k fruits nearest to a point, closest first.
+
+        Args:
+            x, y: Point in play area coordinates
+            k: Number of fruits
+        """
+        return self.index.k_nearest(x, y, k)
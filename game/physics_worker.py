@@ -0,0 +1,429 @@
+"""Board simulation in a worker process with shared-memory double buffering.
+
+On arena-sized boards the physics and merge passes take most of a frame, and
+with the GIL they block drawing. ``RemoteBoard`` runs the board's PlayState
+in a separate process instead and stands in for it in PlayScene.
+
+- Commands (step with aim/drop, end, reset, config changes) go to the worker
+  over a Pipe as small tuples.
+- After each command the worker writes the board into the back buffer of a
+  ``multiprocessing.shared_memory`` block and flips the ``latest`` index.
+- The game process reads the latest completed buffer through NumPy views
+  (no copying or unpickling) while the worker computes the next tick.
+
+At most one step is in flight and a step is only sent once the previous one
+is published, so the worker never writes the buffer being drawn. When the
+worker can't keep up, frames skip the step (the simulation slows down
+instead of the window freezing); a drop made meanwhile is held until the
+next step goes out.
+"""
+import math
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game.config import game_config
+from game.fruit import Fruit
+from game.scoring import ScoreTracker
+from game.stages import stage_table
+
+# Upcoming spawns published per tick
+PREVIEW_SLOTS = 4
+
+# Control block: completed command count, index of the latest buffer
+CONTROL = np.dtype([("completed", "<i8"), ("latest", "<i8")])
+
+# Board status written with each buffer
+HEADER = np.dtype([
+    ("tick", "<i8"),
+    ("count", "<i4"),
+    ("overflow", "u1"),        # More fruits than the buffer capacity (extra ones not shown)
+    ("game_over", "u1"),
+    ("reason", "u1"),          # Index into REASONS
+    ("next_stage", "i1"),      # -1 = no waiting fruit
+    ("delivered", "<i4"),
+    ("rotten", "<i4"),
+    ("danger_line_y", "<i4"),
+    ("fresh_sum", "<f8"),
+    ("above_line_time", "<f8"),
+    ("next_x", "<f8"),
+    ("next_fresh", "<f8"),
+    ("landing_y", "<f8"),      # NaN = none
+    ("preview_stage", "i1", (PREVIEW_SLOTS,)),
+    ("preview_fresh", "<f8", (PREVIEW_SLOTS,)),
+])
+
+REASONS = ("", "JAMMED!", "SHIPPED OUT", "GAME OVER")
+
+# Seconds to wait for the worker on blocking commands (reset, end, close)
+WAIT_TIMEOUT = 10.0
+
+
+def default_capacity(width: int, height: int) -> int:
+    """Fruit slots per buffer: the board packed with the smallest fruit, plus slack."""
+    smallest = min(stage_table().radii)
+    return int(width * height / (math.pi * smallest * smallest) * 1.25) + 64
+
+
+class _BoardBuffers:
+    """NumPy views of the shared control block and the two board buffers."""
+
+    def __init__(self, buffer, capacity: int):
+        """
+        Map the views.
+
+        Args:
+            buffer: Shared memory buffer (at least size(capacity) bytes)
+            capacity: Fruit slots per board buffer
+        """
+        self.capacity = capacity
+        self.control = np.ndarray(1, dtype=CONTROL, buffer=buffer)[0]
+        offset = _align(CONTROL.itemsize)
+        self.headers = []
+        self.x, self.y, self.fresh, self.stage = [], [], [], []
+        for _ in range(2):
+            self.headers.append(np.ndarray(1, dtype=HEADER, buffer=buffer, offset=offset)[0])
+            offset = _align(offset + HEADER.itemsize)
+            for arrays, dtype in ((self.x, np.float64), (self.y, np.float64),
+                                  (self.fresh, np.float64), (self.stage, np.uint8)):
+                arrays.append(np.ndarray(capacity, dtype=dtype, buffer=buffer, offset=offset))
+                offset = _align(offset + capacity * np.dtype(dtype).itemsize)
+
+    @staticmethod
+    def size(capacity: int) -> int:
+        """Bytes needed for a given capacity."""
+        per_buffer = _align(HEADER.itemsize) + 3 * _align(capacity * 8) + _align(capacity)
+        return _align(CONTROL.itemsize) + 2 * per_buffer
+
+    def release(self) -> None:
+        """Drop the views (required before the shared memory can be closed)."""
+        self.control = None
+        self.headers = []
+        self.x, self.y, self.fresh, self.stage = [], [], [], []
+
+
+def _align(offset: int) -> int:
+    """Round up to a multiple of 8 bytes."""
+    return (offset + 7) & ~7
+
+
+def _publish(buffers: _BoardBuffers, state) -> None:
+    """Write the board into the back buffer, then make it the latest."""
+    back = 1 - int(buffers.control["latest"])
+    header = buffers.headers[back]
+    fruits = state.fruits
+    count = min(len(fruits), buffers.capacity)
+
+    x, y, fresh, stage = buffers.x[back], buffers.y[back], buffers.fresh[back], buffers.stage[back]
+    for i, fruit in enumerate(fruits[:count]):
+        x[i] = fruit.x
+        y[i] = fruit.y
+        fresh[i] = fruit.fresh
+        stage[i] = fruit.stage
+
+    tracker = state.score_tracker
+    header["tick"] = state.tick
+    header["count"] = count
+    header["overflow"] = len(fruits) > count
+    header["game_over"] = state.game_over
+    header["reason"] = (REASONS.index(state.game_over_reason)
+                        if state.game_over_reason in REASONS else len(REASONS) - 1)
+    header["delivered"] = tracker.delivered_count
+    header["rotten"] = tracker.rotten_count
+    header["danger_line_y"] = state.danger_line_y
+    header["fresh_sum"] = tracker.fresh_sum
+    header["above_line_time"] = state.above_line_time
+
+    next_fruit = state.next_fruit
+    if next_fruit is not None and not next_fruit.dropped:
+        header["next_stage"] = next_fruit.stage
+        header["next_x"] = next_fruit.x
+        header["next_fresh"] = next_fruit.fresh
+        landing_y = state.landing_y()
+        header["landing_y"] = math.nan if landing_y is None else landing_y
+    else:
+        header["next_stage"] = -1
+        header["landing_y"] = math.nan
+
+    preview = state.preview(PREVIEW_SLOTS) if not state.game_over else []
+    for slot in range(PREVIEW_SLOTS):
+        if slot < len(preview):
+            header["preview_stage"][slot], header["preview_fresh"][slot] = preview[slot]
+        else:
+            header["preview_stage"][slot] = -1
+
+    buffers.control["latest"] = back
+    buffers.control["completed"] += 1
+
+
+def _worker_main(conn, shm_name: str, capacity: int, config: Dict[str, Any],
+                 board: Tuple[int, int, float], seed: Optional[int],
+                 event_log: Optional[str]) -> None:
+    """
+    Worker process loop: run commands against a PlayState and publish results.
+
+    Args:
+        conn: Command pipe end
+        shm_name: Shared memory block created by RemoteBoard
+        capacity: Fruit slots per buffer
+        config: Config dict to play with
+        board: (width, height, drop_y)
+        seed: Spawn sequence seed
+        event_log: Write gameplay events here if given
+    """
+    from game.events import EventLogWriter
+    from game.play_state import PlayState
+
+    game_config.replace(config)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffers = _BoardBuffers(shm.buf, capacity)
+    width, height, drop_y = board
+    state = PlayState(width, height, drop_y, seed=seed)
+    writer = None
+    if event_log:
+        writer = EventLogWriter(event_log)
+        state.events.subscribe(writer)
+
+    try:
+        while True:
+            try:
+                command = conn.recv()
+            except EOFError:
+                break
+            op = command[0]
+            if op == "step":
+                _, aim_x, drop_x = command
+                state.aim(aim_x)
+                state.step(drop_x)
+            elif op == "end":
+                state.end(command[1])
+            elif op == "reset":
+                state.reset(command[1])
+            elif op == "config":
+                game_config.replace(command[1])
+                continue  # takes effect on the next step, nothing to publish
+            elif op == "close":
+                break
+            _publish(buffers, state)
+    finally:
+        if writer:
+            writer.close()
+        buffers.release()
+        shm.close()
+        conn.close()
+
+
+class RemoteBoard:
+    """
+    Board simulated in a worker process, with the PlayState interface PlayScene uses.
+
+    Status attributes reflect the latest completed tick as of the last
+    step()/reset()/end() call.
+    """
+
+    def __init__(self, width: int, height: int, drop_y: float = 40,
+                 seed: Optional[int] = None, event_log: Optional[str] = None,
+                 capacity: Optional[int] = None):
+        """
+        Start the worker.
+
+        Args:
+            width: Board width
+            height: Board height
+            drop_y: Y position where dropped fruits start
+            seed: Spawn sequence seed (random each game if None)
+            event_log: Gameplay event log path (written by the worker)
+            capacity: Fruit slots per buffer (sized for the board if None)
+        """
+        self.width = width
+        self.height = height
+        self.drop_y = drop_y
+        self.capacity = capacity or default_capacity(width, height)
+
+        self._shm = shared_memory.SharedMemory(create=True,
+                                               size=_BoardBuffers.size(self.capacity))
+        self._buffers = _BoardBuffers(self._shm.buf, self.capacity)
+        self._buffers.control["completed"] = 0
+        self._buffers.control["latest"] = 0
+
+        # Spawned rather than forked: the game process owns a window
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self._shm.name, self.capacity, game_config.config,
+                  (width, height, drop_y), seed, event_log),
+            name="physics-worker", daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._config_revision = game_config.revision
+
+        self._sent = 0  # Commands that publish a buffer
+        self._front = 0  # Buffer the status and fruit_arrays() come from
+        self._aim_x = width / 2
+        self._pending_drop: Optional[float] = None
+        self.skipped_steps = 0  # Frames that found the worker still busy
+
+        # Status of the latest completed tick
+        self.score_tracker = ScoreTracker()
+        self.tick = 0
+        self.game_over = False
+        self.game_over_reason = ""
+        self.above_line_time = 0.0
+        self.danger_line_y = 0
+        self.next_fruit: Optional[Fruit] = None
+        self._next_key = None
+        self._landing_y: Optional[float] = None
+        self._preview: List[Tuple[int, float]] = []
+
+    @property
+    def busy(self) -> bool:
+        """True while a command is still being processed."""
+        return int(self._buffers.control["completed"]) != self._sent
+
+    def _send(self, command: tuple) -> None:
+        """Send a command that publishes a buffer (config changes go first)."""
+        if self._config_revision != game_config.revision:
+            self._config_revision = game_config.revision
+            self._conn.send(("config", game_config.config))
+        self._conn.send(command)
+        self._sent += 1
+
+    def _wait(self) -> None:
+        """Block until every sent command is published."""
+        deadline = time.perf_counter() + WAIT_TIMEOUT
+        while self.busy:
+            if not self._process.is_alive():
+                raise RuntimeError("physics worker exited")
+            if time.perf_counter() > deadline:
+                raise RuntimeError("physics worker is not responding")
+            time.sleep(0.0005)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Adopt the latest completed buffer."""
+        self._front = int(self._buffers.control["latest"])
+        header = self._buffers.headers[self._front]
+
+        self.tick = int(header["tick"])
+        self.game_over = bool(header["game_over"])
+        self.game_over_reason = REASONS[int(header["reason"])]
+        self.above_line_time = float(header["above_line_time"])
+        self.danger_line_y = int(header["danger_line_y"])
+
+        tracker = self.score_tracker
+        scores = (int(header["delivered"]), int(header["rotten"]), float(header["fresh_sum"]))
+        if scores != (tracker.delivered_count, tracker.rotten_count, tracker.fresh_sum):
+            tracker.delivered_count, tracker.rotten_count, tracker.fresh_sum = scores
+            tracker.version += 1
+
+        stage = int(header["next_stage"])
+        if stage < 0:
+            self.next_fruit = None
+            self._next_key = None
+        else:
+            key = (stage, float(header["next_fresh"]))
+            if key != self._next_key:
+                self._next_key = key
+                self.next_fruit = Fruit(stage, float(header["next_x"]), self.drop_y, key[1])
+            self.aim(self._aim_x)
+        landing_y = float(header["landing_y"])
+        self._landing_y = None if math.isnan(landing_y) else landing_y
+        self._preview = [(int(s), float(f)) for s, f in
+                         zip(header["preview_stage"], header["preview_fresh"]) if s >= 0]
+
+    def fruit_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Board fruits of the latest completed tick as zero-copy views.
+
+        The views stay valid until the next step()/reset()/end() call.
+
+        Returns:
+            (x, y, stage, fresh) arrays
+        """
+        buffers = self._buffers
+        front = self._front
+        count = int(buffers.headers[front]["count"])
+        return (buffers.x[front][:count], buffers.y[front][:count],
+                buffers.stage[front][:count], buffers.fresh[front][:count])
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """Start a new game (blocks until the worker has reset)."""
+        self._wait()
+        self._pending_drop = None
+        self.score_tracker.reset()
+        self._send(("reset", seed))
+        self._wait()
+
+    def aim(self, x: float) -> None:
+        """Move the waiting fruit (shown immediately, sent with the next step)."""
+        self._aim_x = x
+        fruit = self.next_fruit
+        if fruit is not None:
+            fruit.x = max(fruit.radius, min(self.width - fruit.radius, x))
+
+    def step(self, drop_x: Optional[float] = None) -> bool:
+        """
+        Request the next tick unless the previous one is still being computed.
+
+        Args:
+            drop_x: Drop the waiting fruit at this X (held if the step is skipped)
+
+        Returns:
+            True if a step was sent
+        """
+        if drop_x is not None:
+            self._pending_drop = drop_x
+        if self.busy:
+            self.skipped_steps += 1
+            return False
+        self._refresh()
+        if self.game_over:
+            return False
+        self._send(("step", self._aim_x, self._pending_drop))
+        self._pending_drop = None
+        return True
+
+    def ship(self) -> None:
+        """Ship out and end the game."""
+        self.end("SHIPPED OUT")
+
+    def end(self, reason: str) -> None:
+        """End the game (blocks until the final tick is published)."""
+        self._wait()
+        if not self.game_over:
+            self._send(("end", reason))
+            self._wait()
+
+    def grace_remaining(self) -> float:
+        """Seconds left before a jam ends the game."""
+        grace_ms = game_config.get("game_over", "grace_ms", default=3000)
+        return grace_ms / 1000.0 - self.above_line_time
+
+    def landing_y(self) -> Optional[float]:
+        """Landing Y of the waiting fruit at the worker's last aim."""
+        return self._landing_y
+
+    def preview(self, count: int = 3) -> List[Tuple[int, float]]:
+        """Upcoming spawns after the waiting fruit (at most PREVIEW_SLOTS)."""
+        return self._preview[:count]
+
+    def close(self) -> None:
+        """Stop the worker and free the shared memory."""
+        if self._process is None:
+            return
+        try:
+            self._conn.send(("close",))
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=WAIT_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        self._conn.close()
+        self._buffers.release()
+        self._shm.close()
+        self._shm.unlink()
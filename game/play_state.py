@@ -0,0 +1,424 @@
+"""Play state: game logic for one board, independent of Pyxel."""
+import copy
+import math
+import time
+from typing import List, Optional, Tuple
+from game.fruit import Fruit, FruitFactory
+from game.physics import PhysicsEngine
+from game.merge import MergeManager
+from game.scoring import ScoreTracker
+from game.config import game_config
+from game.events import EventBus
+from game.settle import SettleSolver
+from game.spawn_queue import SpawnQueue
+
+
+class PlayState:
+    """Spawn, drop, physics, merge, scoring and jam detection for one board."""
+
+    # Fixed simulation tick (the game runs at 30 FPS)
+    TICK_DT = 1.0 / 30.0
+
+    # Seconds between drops
+    DROP_COOLDOWN = 0.5
+
+    # Merge/relax rounds settle() runs before giving up on reaching rest
+    SETTLE_ROUNDS = 32
+
+    def __init__(self, width: int, height: int, drop_y: float = 40,
+                 seed: Optional[int] = None):
+        """
+        Initialize play state.
+
+        Args:
+            width: Play area width
+            height: Play area height
+            drop_y: Y position (play area coordinates) where dropped fruits start
+            seed: Spawn sequence seed (random each game if None)
+        """
+        self.width = width
+        self.height = height
+        self.drop_y = drop_y
+        self.seed = seed
+        self.spawn_queue = SpawnQueue(seed)
+
+        # Game state
+        self.fruits: List[Fruit] = []
+        self.next_fruit: Fruit = None
+        self.drop_cooldown = 0.0
+        self.game_over = False
+        self.game_over_reason = ""
+        self.tick = 0
+        self.session = 0
+
+        # Gameplay events (drop, merge, deliver, rot, danger, end)
+        self.events = EventBus()
+
+        # Game systems
+        self.physics = PhysicsEngine(width, height)
+        self.merge_manager = MergeManager(self.physics)
+        self.score_tracker = ScoreTracker()
+        self.settler: Optional[SettleSolver] = None  # Created on first settle()
+        self.metrics = None  # SimMetrics collecting per-tick timings (see game/metrics.py)
+
+        # Game over detection
+        self.above_line_time = 0.0
+        self.danger_line_y = 0
+
+        # What happened during the last tick (for observers)
+        self.last_dropped: Optional[Fruit] = None
+        self.last_merges: List[Tuple[Fruit, Fruit, Fruit]] = []
+        self.last_delivered: List[Fruit] = []
+
+        self.reset()
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Reset board to initial state.
+
+        Args:
+            seed: Spawn sequence seed for this game (keeps the constructor's
+                seed if None; boards with the same seed get the same fruits)
+        """
+        if seed is not None:
+            self.seed = seed
+        self.spawn_queue.reset(self.seed)
+        self.fruits.clear()
+        self.next_fruit = FruitFactory.create_spawn_fruit(self.width // 2, self.spawn_queue)
+        self.drop_cooldown = 0.0
+        self.game_over = False
+        self.game_over_reason = ""
+        self.tick = 0
+        self.score_tracker.reset()
+        self.above_line_time = 0.0
+        self.last_dropped = None
+        self.last_merges = []
+        self.last_delivered = []
+        self.physics.rebuild_index(self.fruits)
+
+        # Calculate danger line
+        line_y_ratio = game_config.get("game_over", "line_y", default=0.2)
+        self.danger_line_y = int(self.height * line_y_ratio)
+
+        self.session += 1
+        if self.events.subscribers:
+            self.events.emit("session_start", 0, session=self.session,
+                             config_id=game_config.fingerprint(),
+                             config=copy.deepcopy(game_config.config))
+
+    def aim(self, x: float) -> None:
+        """
+        Move the waiting fruit, clamped to the play area.
+
+        Args:
+            x: Desired X position
+        """
+        if self.next_fruit and not self.next_fruit.dropped:
+            radius = self.next_fruit.radius
+            self.next_fruit.x = max(radius, min(self.width - radius, x))
+
+    def can_drop(self) -> bool:
+        """Check if the waiting fruit can be dropped now."""
+        return (self.next_fruit is not None and not self.game_over
+                and self.drop_cooldown <= 0)
+
+    def drop(self, x: Optional[float] = None) -> bool:
+        """
+        Drop the waiting fruit.
+
+        Args:
+            x: Drop X position (current aim if None)
+
+        Returns:
+            True if a fruit was dropped
+        """
+        if not self.can_drop():
+            return False
+
+        if x is not None:
+            self.aim(x)
+
+        # Mark as dropped
+        fruit = self.next_fruit
+        fruit.dropped = True
+        fruit.y = self.drop_y
+        self.fruits.append(fruit)
+        self.last_dropped = fruit
+        if self.events.subscribers:
+            self.events.emit("drop", self.tick, stage=fruit.stage, x=fruit.x, fresh=fruit.fresh)
+
+        # Create next fruit
+        self.next_fruit = FruitFactory.create_spawn_fruit(self.width // 2, self.spawn_queue)
+        self.drop_cooldown = self.DROP_COOLDOWN
+        return True
+
+    def step(self, drop_x: Optional[float] = None) -> None:
+        """
+        Advance the board by one fixed tick.
+
+        Args:
+            drop_x: If given, drop the waiting fruit at this X before simulating
+        """
+        if self.game_over:
+            return
+
+        dt = self.TICK_DT
+        self.last_dropped = None
+
+        # Update drop cooldown
+        if self.drop_cooldown > 0:
+            self.drop_cooldown -= dt
+
+        if drop_x is not None:
+            self.drop(drop_x)
+
+        metrics = self.metrics
+        if metrics:
+            physics_start = time.perf_counter()
+
+        # Update physics
+        self.physics.update(self.fruits, dt)
+
+        # Update freshness decay
+        events = self.events if self.events.subscribers else None
+        self._decay(dt, events)
+
+        # Check and apply merges
+        if metrics:
+            merge_start = time.perf_counter()
+        self.last_merges = self.merge_manager.check_and_merge(self.fruits)
+        self._apply_merges(events)
+        if metrics:
+            metrics.observe_tick(merge_start - physics_start, time.perf_counter() - merge_start,
+                                 len(self.fruits), self.physics.last_contacts)
+
+        # Check game over condition
+        self._check_game_over(dt)
+        self.tick += 1
+
+    def settle(self, drop_x: Optional[float] = None,
+               max_ticks: Optional[int] = None) -> bool:
+        """
+        Drop the waiting fruit and jump straight to the board's next rest state.
+
+        Uses the quasi-static SettleSolver instead of stepping physics; merges
+        fire as fruits come to touch, and the game time the falls and merge
+        cooldowns would have taken is charged to decay, cooldowns and the jam
+        timer (the board is put to sleep at once, without waiting out
+        physics.sleep_time).
+        Meant for bot and batch runs; rest positions are close to, but not the
+        same as, those of full simulation.
+
+        In full simulation the next drop can come while this one is still
+        falling. Callers that drop on a fixed cadence pass it as max_ticks:
+        time beyond it overlaps with what happens next instead of being
+        charged twice, and merges still waiting on a cooldown are left to
+        later ticks.
+
+        Args:
+            drop_x: Drop X position (current aim if None)
+            max_ticks: Charge at most this many ticks (no limit if None)
+
+        Returns:
+            True if a fruit was dropped
+        """
+        if not self.can_drop():
+            return False
+        if self.settler is None:
+            self.settler = SettleSolver(self.physics)
+        solver = self.settler
+        dt = self.TICK_DT
+        events = self.events if self.events.subscribers else None
+        budget = max_ticks if max_ticks is not None else float("inf")
+
+        self.physics.rebuild_index(self.fruits)
+        self.drop(drop_x)
+        fallen = solver.land(self.last_dropped)
+        self.last_dropped.landed = True
+        active = solver.island(self.fruits, self.last_dropped)
+
+        expired = False  # A merge cooldown ran out since the last merge check
+        for _ in range(self.SETTLE_ROUNDS):
+            travelled, touching = solver.relax(self.fruits, active)
+            ticks = min(solver.fall_ticks(fallen + travelled, dt), budget)
+            elapsed = ticks * dt
+            if any(0 < fruit.merge_cooldown <= elapsed for fruit in self.fruits):
+                expired = True
+            self._advance(ticks, events)
+            budget -= ticks
+            fallen = 0.0
+            if self.game_over:
+                return True
+
+            # New merges need a fresh contact or a cooldown that ran out
+            if touching or expired:
+                expired = False
+                self.last_merges = self.merge_manager.check_and_merge(self.fruits)
+                if self.last_merges:
+                    removed = []
+                    for fruit_a, fruit_b, _ in self.last_merges:
+                        removed.append(fruit_a)
+                        removed.append(fruit_b)
+                    resting = solver.resting_on(self.fruits, removed)
+                    self._apply_merges(events)
+                    active = [merged for _, _, merged in self.last_merges
+                              if not merged.is_mikan()] + resting
+                    continue
+
+            # Touching pairs still on merge cooldown merge once it runs out
+            wait = solver.merge_wait(self.fruits)
+            ticks = max(1, math.ceil(wait / dt - 1e-9))
+            if wait <= 0 or ticks > budget:
+                break
+            self._advance(ticks, events)
+            budget -= ticks
+            active = []
+            expired = True
+            if self.game_over:
+                return True
+
+        solver.sleep(self.fruits)
+        self.last_merges = []
+        self.last_delivered = []
+        return True
+
+    def _advance(self, ticks: int, events: Optional[EventBus]) -> None:
+        """
+        Charge game time spent away from the tick loop (see settle()).
+
+        Args:
+            ticks: Elapsed ticks
+            events: Event bus if anyone listens
+        """
+        if ticks <= 0:
+            return
+        elapsed = ticks * self.TICK_DT
+        if self.drop_cooldown > 0:
+            self.drop_cooldown -= elapsed
+        self._decay(elapsed, events)
+        self.tick += ticks - 1
+        self._check_game_over(elapsed)
+        self.tick += 1
+
+    def _decay(self, dt: float, events: Optional[EventBus]) -> None:
+        """
+        Age every board fruit.
+
+        Args:
+            dt: Elapsed seconds
+            events: Event bus if anyone listens (emits "rot")
+        """
+        if events:
+            rotten_threshold = game_config.get("rot", "rotten_threshold", default=30)
+            for fruit in self.fruits:
+                before = fruit.fresh
+                fruit.update_decay(dt)
+                if before > rotten_threshold >= fruit.fresh:
+                    events.emit("rot", self.tick, stage=fruit.stage, fresh=fruit.fresh)
+        else:
+            for fruit in self.fruits:
+                fruit.update_decay(dt)
+
+    def _apply_merges(self, events: Optional[EventBus]) -> None:
+        """
+        Apply self.last_merges and deliver the mikan they produce.
+
+        Args:
+            events: Event bus if anyone listens (emits "merge" and "deliver")
+        """
+        self.last_delivered = self.merge_manager.apply_merges(self.fruits, self.last_merges)
+        if self.last_merges:
+            self.physics.rebuild_index(self.fruits)
+            if events:
+                for fruit_a, fruit_b, merged in self.last_merges:
+                    events.emit("merge", self.tick, stage=merged.stage,
+                                fresh_a=fruit_a.fresh, fresh_b=fruit_b.fresh,
+                                fresh=merged.fresh, x=merged.x, y=merged.y)
+
+        for mikan in self.last_delivered:
+            rotten_before = self.score_tracker.rotten_count
+            self.score_tracker.deliver_mikan(mikan.fresh)
+            if events:
+                events.emit("deliver", self.tick, fresh=mikan.fresh,
+                            rotten=self.score_tracker.rotten_count > rotten_before)
+
+    def ship(self) -> None:
+        """Ship out and end the game (allowed at any time)."""
+        self.end("SHIPPED OUT")
+
+    def end(self, reason: str) -> None:
+        """
+        End the game.
+
+        Args:
+            reason: Reason for game over
+        """
+        if self.game_over:
+            return
+
+        self.game_over = True
+        self.game_over_reason = reason
+
+        if self.events.subscribers:
+            tracker = self.score_tracker
+            self.events.emit("end", self.tick, reason=reason, score=tracker.get_score(),
+                             delivered=tracker.delivered_count, rotten=tracker.rotten_count)
+
+    def preview(self, count: int = 3) -> List[Tuple[int, float]]:
+        """
+        Upcoming spawns after the waiting fruit.
+
+        Args:
+            count: Number of spawns to look ahead
+
+        Returns:
+            List of (stage, fresh) pairs, soonest first
+        """
+        return self.spawn_queue.peek(count)
+
+    def landing_y(self) -> Optional[float]:
+        """
+        Predict where the waiting fruit would first touch if dropped now.
+
+        Returns:
+            Center Y at first contact, or None if there is no waiting fruit
+        """
+        fruit = self.next_fruit
+        if fruit is None or fruit.dropped:
+            return None
+        landing_y, _ = self.physics.cast_circle_down(fruit.x, fruit.radius, self.drop_y)
+        return landing_y
+
+    def grace_remaining(self) -> float:
+        """Seconds left before a jam ends the game."""
+        grace_ms = game_config.get("game_over", "grace_ms", default=3000)
+        return grace_ms / 1000.0 - self.above_line_time
+
+    def _check_game_over(self, dt: float) -> None:
+        """
+        Check if game over condition is met.
+
+        Args:
+            dt: Delta time
+        """
+        # Check if any fruit is above danger line (fruits still falling from the
+        # drop point don't count until they first touch something)
+        grace_ms = game_config.get("game_over", "grace_ms", default=3000)
+        grace_seconds = grace_ms / 1000.0
+
+        any_above = False
+        for fruit in self.fruits:
+            if fruit.landed and fruit.y - fruit.radius < self.danger_line_y:
+                any_above = True
+                break
+
+        if any_above:
+            if self.above_line_time == 0.0 and self.events.subscribers:
+                self.events.emit("danger_enter", self.tick)
+            self.above_line_time += dt
+            if self.above_line_time >= grace_seconds:
+                self.end("JAMMED!")
+        else:
+            if self.above_line_time > 0.0 and self.events.subscribers:
+                self.events.emit("danger_exit", self.tick)
+            self.above_line_time = 0.0
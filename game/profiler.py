@@ -0,0 +1,200 @@
+"""Low-overhead sampling profiler for headless simulation runs.
+
+A background thread samples the target thread's Python stack at a fixed
+interval. Samples are grouped by game subsystem (the innermost frame that
+belongs to a known module decides) and written as:
+
+- ``PREFIX.folded``: collapsed stacks (``subsystem;outer;...;inner count``),
+  ready for flamegraph.pl / speedscope / inferno
+- ``PREFIX.txt``: per-subsystem shares and a per-function summary (self and
+  inclusive samples)
+
+Only code objects are stored per sample; names are formatted once at the end.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Module file name -> subsystem (innermost matching frame wins)
+SUBSYSTEMS = {
+    "physics.py": "physics",
+    "spatial.py": "physics",
+    "merge.py": "merge",
+    "scoring.py": "scoring",
+    "spawn_queue.py": "spawn",
+    "config.py": "config",
+    "stages.py": "config",
+    "events.py": "events",
+    "play_state.py": "play_state",
+}
+
+# (module file name, function) -> subsystem, for modules shared by several
+# subsystems (e.g. Fruit() is spawn work under create_spawn_fruit but merge
+# work under create_merged_fruit, so plain fruit.py frames defer to callers)
+SUBSYSTEM_FUNCTIONS = {
+    ("fruit.py", "create_spawn_fruit"): "spawn",
+    ("fruit.py", "update_decay"): "decay",
+}
+
+# Frames above this depth (outermost first) are dropped from collapsed stacks
+MAX_DEPTH = 64
+
+
+def _code_label(code) -> str:
+    """Readable name for a code object (module:function)."""
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread."""
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        """
+        Initialize profiler.
+
+        Args:
+            interval: Seconds between samples
+            thread_id: Thread to sample (the thread calling start() if None)
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()  # tuple of code objects (outermost first) -> count
+        self.sample_count = 0
+        self.sampling_time = 0.0  # Seconds spent inside the sampler (overhead estimate)
+        self.elapsed = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._started_at = 0.0
+        self._subsystem_cache: Dict[object, str] = {}
+
+    def start(self) -> None:
+        """Start sampling."""
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed += time.perf_counter() - self._started_at
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        """Sampler loop."""
+        target = self.thread_id
+        interval = self.interval
+        samples = self.samples
+        clock = time.perf_counter
+
+        while not self._stop.wait(interval):
+            begin = clock()
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            samples[tuple(stack[-MAX_DEPTH:])] += 1
+            self.sample_count += 1
+            self.sampling_time += clock() - begin
+
+    def _subsystem(self, stack: Tuple) -> str:
+        """Subsystem of a sample (innermost frame in a known game module)."""
+        cache = self._subsystem_cache
+        for code in reversed(stack):
+            subsystem = cache.get(code)
+            if subsystem is None:
+                subsystem = ""
+                directory, name = os.path.split(code.co_filename)
+                if os.path.basename(directory) == "game":
+                    subsystem = SUBSYSTEM_FUNCTIONS.get((name, code.co_name),
+                                                        SUBSYSTEMS.get(name, ""))
+                cache[code] = subsystem
+            if subsystem:
+                return subsystem
+        return "other"
+
+    def collapsed(self) -> List[str]:
+        """Collapsed stack lines (subsystem as the root frame)."""
+        merged: Counter = Counter()
+        for stack, count in self.samples.items():
+            frames = ";".join(_code_label(code) for code in stack)
+            merged[f"{self._subsystem(stack)};{frames}"] += count
+        return [f"{stack} {count}" for stack, count in merged.most_common()]
+
+    def summary(self, top: int = 30) -> str:
+        """
+        Human-readable report.
+
+        Args:
+            top: Number of functions to list
+
+        Returns:
+            Report text
+        """
+        total = max(sum(self.samples.values()), 1)
+        by_subsystem: Counter = Counter()
+        self_counts: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.samples.items():
+            by_subsystem[self._subsystem(stack)] += count
+            if stack:
+                self_counts[stack[-1]] += count
+            for code in set(stack):
+                inclusive[code] += count
+
+        overhead = self.sampling_time / self.elapsed * 100 if self.elapsed else 0.0
+        lines = [
+            f"samples: {self.sample_count} over {self.elapsed:.1f}s "
+            f"(interval {self.interval * 1000:.1f}ms, sampler time {overhead:.2f}%)",
+            "",
+            "subsystem          samples      %",
+        ]
+        for subsystem, count in by_subsystem.most_common():
+            lines.append(f"{subsystem:<16} {count:>9} {count / total * 100:>6.1f}")
+
+        lines += ["", "   self%   total%  function"]
+        for code, count in self_counts.most_common(top):
+            lines.append(f"{count / total * 100:>8.1f} {inclusive[code] / total * 100:>8.1f}  "
+                         f"{_code_label(code)} ({os.path.basename(code.co_filename)}:"
+                         f"{code.co_firstlineno})")
+        return "\n".join(lines)
+
+    def write(self, prefix: str) -> Tuple[str, str]:
+        """
+        Write PREFIX.folded and PREFIX.txt.
+
+        Returns:
+            (collapsed path, summary path)
+        """
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        folded_path = prefix + ".folded"
+        with open(folded_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+
+        summary_path = prefix + ".txt"
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(self.summary() + "\n")
+        return folded_path, summary_path
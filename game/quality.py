@@ -0,0 +1,121 @@
+"""Frame-budget governor for rendering quality.
+
+The play scene reports how long each update and draw took. When the
+smoothed frame cost stays above the budget, rendering steps down one level;
+after a long stretch with plenty of headroom it steps back up:
+
+0. full quality
+1. no fruit outlines (``circb``)
+2. no freshness sparkles either
+3. level of detail: fruits that are offscreen are skipped and fruits that
+   are only a few pixels wide are drawn as plain squares
+
+Only drawing reads the level; the simulation runs the same at every level.
+"""
+from typing import Optional
+
+
+class QualityGovernor:
+    """Picks a rendering quality level from measured frame costs."""
+
+    FULL = 0
+    NO_OUTLINES = 1
+    NO_SPARKLES = 2
+    LOD = 3
+
+    def __init__(self, budget: float = 1.0 / 30.0, degrade_at: float = 0.9,
+                 restore_at: float = 0.6, smoothing: float = 0.1,
+                 settle_frames: int = 30, restore_frames: int = 90,
+                 forced_level: Optional[int] = None):
+        """
+        Initialize governor.
+
+        Args:
+            budget: Seconds available per frame (1 / FPS)
+            degrade_at: Step down when the smoothed cost exceeds this share of the budget
+            restore_at: Step up after the cost stays below this share of the budget
+            smoothing: Weight of the newest frame in the moving average
+            settle_frames: Frames to wait after a change before stepping down again
+            restore_frames: Frames of headroom needed before stepping up (doubles
+                each time a step up has to be taken back, up to 8x)
+            forced_level: Fixed level instead of adapting (None = adaptive)
+        """
+        self.budget = budget
+        self.degrade_at = degrade_at
+        self.restore_at = restore_at
+        self.smoothing = smoothing
+        self.settle_frames = settle_frames
+        self.restore_frames = restore_frames
+        self.forced_level = forced_level
+
+        self.level = self.FULL if forced_level is None else forced_level
+        self.frame_cost = 0.0  # Smoothed update + draw seconds
+        self.changes = 0
+        self._update_cost = 0.0
+        self._since_change = 0
+        self._headroom_frames = 0
+        self._restore_wait = restore_frames
+        self._restored_recently = False
+
+    @property
+    def outlines(self) -> bool:
+        """Draw fruit outlines."""
+        return self.level < self.NO_OUTLINES
+
+    @property
+    def sparkles(self) -> bool:
+        """Draw freshness sparkles on board fruits."""
+        return self.level < self.NO_SPARKLES
+
+    @property
+    def lod(self) -> bool:
+        """Cull offscreen fruits and draw tiny ones coarsely."""
+        return self.level >= self.LOD
+
+    def record_update(self, seconds: float) -> None:
+        """Report this frame's update cost."""
+        self._update_cost = seconds
+
+    def end_frame(self, draw_seconds: float) -> None:
+        """
+        Report this frame's draw cost and adjust the level.
+
+        Args:
+            draw_seconds: Time spent drawing this frame
+        """
+        cost = self._update_cost + draw_seconds
+        self._update_cost = 0.0
+        if self.frame_cost == 0.0:
+            self.frame_cost = cost
+        else:
+            self.frame_cost += (cost - self.frame_cost) * self.smoothing
+        if self.forced_level is not None:
+            return
+
+        self._since_change += 1
+        if self.frame_cost > self.budget * self.degrade_at:
+            self._headroom_frames = 0
+            if self.level < self.LOD and self._since_change >= self.settle_frames:
+                if self._restored_recently:
+                    # The step up didn't fit: wait longer before trying again
+                    self._restore_wait = min(self._restore_wait * 2, self.restore_frames * 8)
+                self._change(self.level + 1)
+        elif self.frame_cost < self.budget * self.restore_at:
+            self._headroom_frames += 1
+            if self.level > self.FULL and self._headroom_frames >= self._restore_wait:
+                self._change(self.level - 1)
+                self._restored_recently = True
+                return
+        else:
+            self._headroom_frames = 0
+
+        if self._since_change > self.settle_frames * 2:
+            self._restored_recently = False
+
+    def _change(self, level: int) -> None:
+        """Switch level and restart the settle/headroom counters."""
+        self.level = level
+        self.changes += 1
+        self._since_change = 0
+        self._headroom_frames = 0
+        self._restored_recently = False
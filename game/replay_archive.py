@@ -0,0 +1,511 @@
+"""Seekable replay archive: many sessions' inputs plus periodic keyframes.
+
+An archive is one append-only file of records::
+
+    header  b"MKRP", version
+    record  kind, session, tick, payload length, payload
+    ...
+    footer  index of every record (kind, session, tick, offset, length),
+            then index offset, record count, b"MKRX"
+
+Record kinds:
+
+- CONFIG: a game config, stored once per fingerprint
+- SESSION: seed, config fingerprint and board size of a recorded game
+- KEYFRAME: full board (rewind checkpoint) and spawn queue position, every
+  ``keyframe_interval`` ticks and wherever a session starts
+- INPUTS: the drops (tick, x) and external ends (ship out) since the
+  previous keyframe; written when the next keyframe is
+- END: final tick, reason and score
+
+Games are deterministic for a seed, config and input sequence, so seeking to
+a tick restores the last keyframe at or before it and re-simulates the ticks
+in between (at most ``keyframe_interval - 1``). The reader maps the file
+with ``mmap`` and only touches the records it needs.
+
+Appending reopens the file, drops the footer and writes it again on close.
+If a writer dies before that, the index is rebuilt by scanning the records
+(a torn last record is discarded).
+
+Usage:
+    python -m game.replay_archive replays.mkr                 # list sessions
+    python -m game.replay_archive replays.mkr --seek 3 21600  # board at minute 12
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game.config import game_config
+from game.play_state import PlayState
+from game.rewind import encode_keyframe, restore_keyframe
+
+MAGIC = b"MKRP"
+INDEX_MAGIC = b"MKRX"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<BIII")  # kind, session, tick, payload length
+TRAILER = struct.Struct("<QI4s")  # index offset, record count, magic
+KEYFRAME = struct.Struct("<III")  # checkpoint length, spawn meta length, queued spawns
+
+INDEX = np.dtype([("kind", "u1"), ("session", "<u4"), ("tick", "<u4"),
+                  ("offset", "<u8"), ("length", "<u4")])
+INPUT = np.dtype([("tick", "<u4"), ("op", "u1"), ("x", "<f8")])
+
+KIND_CONFIG = 1
+KIND_SESSION = 2
+KIND_KEYFRAME = 3
+KIND_INPUTS = 4
+KIND_END = 5
+
+OP_DROP = 0
+OP_END = 1  # Game ended from outside the tick loop (ship out) at this tick
+
+# Ends the tick loop reproduces by itself (PlayState jam detection)
+JAM_REASON = "JAMMED!"
+FINGERPRINT_LENGTH = 12
+
+
+def _load_index(data) -> Tuple[List[tuple], int]:
+    """
+    Read the record index of an archive (from the footer, or by scanning).
+
+    Args:
+        data: Archive bytes (mmap)
+
+    Returns:
+        (list of (kind, session, tick, offset, length), end of the records)
+    """
+    size = len(data)
+    if size >= FILE_HEADER.size + TRAILER.size:
+        index_offset, count, magic = TRAILER.unpack_from(data, size - TRAILER.size)
+        if magic == INDEX_MAGIC and index_offset + count * INDEX.itemsize == size - TRAILER.size:
+            entries = np.frombuffer(data, dtype=INDEX, count=count, offset=index_offset)
+            return entries.tolist(), index_offset
+
+    # No footer (writer didn't close): walk the records
+    entries = []
+    offset = FILE_HEADER.size
+    while offset + RECORD.size <= size:
+        kind, session, tick, length = RECORD.unpack_from(data, offset)
+        if not KIND_CONFIG <= kind <= KIND_END or offset + RECORD.size + length > size:
+            break
+        entries.append((kind, session, tick, offset + RECORD.size, length))
+        offset += RECORD.size + length
+    return entries, offset
+
+
+def _check_header(data, path: str) -> None:
+    """Raise ValueError unless the data starts with an archive header."""
+    if len(data) < FILE_HEADER.size:
+        raise ValueError(f"{path}: not a replay archive")
+    magic, version = FILE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a replay archive (or unsupported version)")
+
+
+class ReplayWriter:
+    """Records games into an archive (appends to an existing one)."""
+
+    def __init__(self, path: str, keyframe_interval: int = 300):
+        """
+        Open an archive for appending (created if missing).
+
+        Args:
+            path: Archive file
+            keyframe_interval: Ticks between keyframes (seeks re-simulate at
+                most this many ticks)
+
+        Raises:
+            ValueError: If the file exists but is not an archive
+        """
+        self.path = path
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.entries: List[tuple] = []
+        self._configs = set()  # Fingerprints already stored
+        self.next_session = 1
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, "r+b")
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                _check_header(data, path)
+                self.entries, end = _load_index(data)
+                for kind, session, _, offset, _ in self.entries:
+                    if kind == KIND_CONFIG:
+                        self._configs.add(bytes(data[offset:offset + FINGERPRINT_LENGTH]).decode("ascii"))
+                    self.next_session = max(self.next_session, session + 1)
+            # New records replace the footer
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(path, "w+b")
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+        # Session being recorded
+        self._state = None
+        self._session = None
+        self._state_session = None  # PlayState.session it belongs to
+        self._revision = -1  # Config revision it was recorded under
+        self._ended = False
+        self._last_tick = -1
+        self._keyframe_tick = 0
+        self._inputs: List[Tuple[int, int, float]] = []
+
+    def record(self, state) -> None:
+        """
+        Record the board at a tick boundary: call after reset, after every
+        step and after the board jumps (rewind restore/branch).
+
+        A new game, a different board, a tick that doesn't follow the last
+        one, or a config change (beta panel) starts a new archive session
+        from the current board.
+
+        Args:
+            state: PlayState
+        """
+        if state is not self._state:
+            if self._state is not None:
+                self._state.events.unsubscribe(self)
+            state.events.subscribe(self)
+            self._state = state
+            self._state_session = None
+
+        tick = state.tick
+        if (state.session != self._state_session or game_config.revision != self._revision
+                or tick not in (self._last_tick, self._last_tick + 1)):
+            self._begin(state)
+        elif not self._ended and tick - self._keyframe_tick >= self.keyframe_interval:
+            self._flush_inputs()
+            self._write_keyframe(state)
+        self._last_tick = tick
+
+    def __call__(self, kind: str, tick: int, fields: Dict[str, Any]) -> None:
+        """Capture inputs from the recorded board's events (EventBus subscriber)."""
+        if self._session is None or self._ended:
+            return
+        if kind == "drop":
+            self._inputs.append((tick, OP_DROP, fields["x"]))
+        elif kind == "end":
+            if fields["reason"] == JAM_REASON:
+                tick += 1  # Jams end inside step(), before the tick counter moves on
+            else:
+                self._inputs.append((tick, OP_END, 0.0))
+            self._finish(tick, fields["reason"], fields["score"])
+
+    def close(self) -> None:
+        """Finish the current session and write the footer index."""
+        if self._file is None:
+            return
+        if self._state is not None:
+            self._state.events.unsubscribe(self)
+        if self._session is not None and not self._ended:
+            self._finish(self._last_tick, "", None)
+
+        index = np.array(self.entries, dtype=INDEX)
+        index_offset = self._file.tell()
+        self._file.write(index.tobytes())
+        self._file.write(TRAILER.pack(index_offset, len(index), INDEX_MAGIC))
+        self._file.close()
+        self._file = None
+
+    def _begin(self, state) -> None:
+        """Start a new archive session from the current board."""
+        if self._session is not None and not self._ended:
+            self._finish(self._last_tick, "", None)
+
+        config_id = game_config.fingerprint()
+        if config_id not in self._configs:
+            payload = config_id.encode("ascii") + json.dumps(
+                game_config.config, ensure_ascii=False).encode("utf-8")
+            self._write(KIND_CONFIG, 0, 0, payload)
+            self._configs.add(config_id)
+
+        self._session = self.next_session
+        self.next_session += 1
+        self._state_session = state.session
+        self._revision = game_config.revision
+        self._ended = False
+        self._inputs = []
+        info = {"seed": state.seed, "config_id": config_id, "width": state.width,
+                "height": state.height, "drop_y": state.drop_y}
+        self._write(KIND_SESSION, self._session, state.tick, json.dumps(info).encode("utf-8"))
+        self._write_keyframe(state)
+
+    def _write_keyframe(self, state) -> None:
+        """Write a keyframe of the board."""
+        checkpoint, spawn_state = encode_keyframe(state)
+        rng_state, stages, fresh, params, taken = spawn_state
+        meta = json.dumps({"rng": rng_state, "params": params, "taken": taken}).encode("utf-8")
+        payload = b"".join((KEYFRAME.pack(len(checkpoint), len(meta), len(stages)),
+                            checkpoint, meta, stages.astype(np.int8).tobytes(),
+                            fresh.astype(np.float64).tobytes()))
+        self._write(KIND_KEYFRAME, self._session, state.tick, payload)
+        self._keyframe_tick = state.tick
+
+    def _flush_inputs(self) -> None:
+        """Write the inputs since the last keyframe (filed under its tick)."""
+        if self._inputs:
+            inputs = np.array(self._inputs, dtype=INPUT)
+            self._write(KIND_INPUTS, self._session, self._keyframe_tick, inputs.tobytes())
+            self._inputs = []
+
+    def _finish(self, tick: int, reason: str, score: Optional[int]) -> None:
+        """End the current session."""
+        self._flush_inputs()
+        info = {"tick": tick, "reason": reason, "score": score}
+        self._write(KIND_END, self._session, max(tick, 0), json.dumps(info).encode("utf-8"))
+        self._ended = True
+
+    def _write(self, kind: int, session: int, tick: int, payload: bytes) -> None:
+        """Append a record and index it."""
+        offset = self._file.tell() + RECORD.size
+        self._file.write(RECORD.pack(kind, session, tick, len(payload)))
+        self._file.write(payload)
+        self.entries.append((kind, session, tick, offset, len(payload)))
+
+
+class ReplayArchive:
+    """Memory-mapped reader that restores any recorded tick."""
+
+    def __init__(self, path: str):
+        """
+        Open an archive.
+
+        Args:
+            path: Archive file
+
+        Raises:
+            ValueError: If the file is not an archive
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self._map, path)
+        entries, _ = _load_index(self._map)
+
+        self._configs: Dict[str, Tuple[int, int]] = {}
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+        self._keyframes: Dict[int, Tuple[List[int], List[Tuple[int, int]]]] = {}
+        self._inputs: Dict[int, Dict[int, List[Tuple[int, int]]]] = {}
+        for kind, session, tick, offset, length in entries:
+            if kind == KIND_CONFIG:
+                fingerprint = bytes(self._map[offset:offset + FINGERPRINT_LENGTH]).decode("ascii")
+                self._configs[fingerprint] = (offset, length)
+            elif kind == KIND_SESSION:
+                info = json.loads(self._map[offset:offset + length])
+                info.update(session=session, first_tick=tick, last_tick=tick,
+                            reason=None, score=None)
+                self._sessions[session] = info
+                self._keyframes[session] = ([], [])
+                self._inputs[session] = {}
+            elif session in self._sessions:
+                info = self._sessions[session]
+                if kind == KIND_KEYFRAME:
+                    ticks, places = self._keyframes[session]
+                    ticks.append(tick)
+                    places.append((offset, length))
+                    info["last_tick"] = max(info["last_tick"], tick)
+                elif kind == KIND_INPUTS:
+                    self._inputs[session].setdefault(tick, []).append((offset, length))
+                    last_input = int(np.frombuffer(self._map, dtype=INPUT, count=length // INPUT.itemsize,
+                                                   offset=offset)["tick"][-1])
+                    info["last_tick"] = max(info["last_tick"], last_input)
+                elif kind == KIND_END:
+                    end = json.loads(self._map[offset:offset + length])
+                    info.update(last_tick=max(info["last_tick"], end["tick"]),
+                                reason=end["reason"], score=end["score"])
+
+    @property
+    def sessions(self) -> List[int]:
+        """Recorded session numbers."""
+        return list(self._sessions)
+
+    def info(self, session: int) -> Dict[str, Any]:
+        """
+        Describe a session.
+
+        Returns:
+            Dict with seed, config_id, width, height, drop_y, first_tick,
+            last_tick, reason ("" if the recording stopped mid-game, None if
+            it has no end record) and score
+        """
+        return dict(self._sessions[session])
+
+    def config(self, config_id: str) -> Dict[str, Any]:
+        """Get a config stored in the archive by fingerprint."""
+        offset, length = self._configs[config_id]
+        return json.loads(self._map[offset + FINGERPRINT_LENGTH:offset + length])
+
+    def seek(self, session: int, tick: int) -> PlayState:
+        """
+        Rebuild a session's board at a tick.
+
+        Switches game_config to the session's config (if it differs), then
+        restores the last keyframe at or before the tick and re-simulates the
+        recorded inputs up to it.
+
+        Args:
+            session: Session number
+            tick: Tick to reach (clamped to the recorded range)
+
+        Returns:
+            PlayState at that tick
+        """
+        info = self._sessions[session]
+        tick = max(info["first_tick"], min(info["last_tick"], tick))
+        if game_config.fingerprint() != info["config_id"]:
+            game_config.replace(self.config(info["config_id"]))
+
+        ticks, places = self._keyframes[session]
+        position = bisect.bisect_right(ticks, tick) - 1
+        keyframe_tick = ticks[position]
+        state = PlayState(info["width"], info["height"], info["drop_y"], seed=info["seed"])
+        self._restore(state, *places[position])
+
+        inputs = self._read_inputs(session, [keyframe_tick])
+        while not state.game_over:
+            op, x = inputs.get(state.tick, (None, None))
+            if op == OP_END:  # Happens before the tick is stepped
+                state.end(info["reason"] or "SHIPPED OUT")
+            elif state.tick < tick:
+                state.step(x if op == OP_DROP else None)
+            else:
+                break
+        return state
+
+    def inputs(self, session: int) -> Dict[int, Tuple[int, float]]:
+        """
+        Every recorded input of a session.
+
+        Returns:
+            Dict of tick -> (op, x)
+        """
+        return self._read_inputs(session, list(self._inputs[session]))
+
+    def start(self, state: PlayState, session: int) -> None:
+        """
+        Put a board at a session's first tick (the board must have the
+        session's size; switch game_config to its config first).
+
+        Args:
+            state: Board to overwrite
+            session: Session number
+        """
+        state.reset(seed=self._sessions[session]["seed"])
+        _, places = self._keyframes[session]
+        self._restore(state, *places[0])
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def _read_inputs(self, session: int, keyframe_ticks: List[int]) -> Dict[int, Tuple[int, float]]:
+        """Read the input records written after the given keyframes."""
+        inputs = {}
+        for keyframe_tick in keyframe_ticks:
+            for offset, length in self._inputs[session].get(keyframe_tick, []):
+                records = np.frombuffer(self._map, dtype=INPUT, count=length // INPUT.itemsize,
+                                        offset=offset)
+                for input_tick, op, x in records.tolist():
+                    inputs[input_tick] = (op, x)
+        return inputs
+
+    def _restore(self, state: PlayState, offset: int, length: int) -> None:
+        """Restore a keyframe record into a board."""
+        data = self._map
+        checkpoint_length, meta_length, queued = KEYFRAME.unpack_from(data, offset)
+        position = offset + KEYFRAME.size
+        checkpoint = data[position:position + checkpoint_length]
+        position += checkpoint_length
+        meta = json.loads(data[position:position + meta_length])
+        position += meta_length
+        stages = np.frombuffer(data, dtype=np.int8, count=queued, offset=position)
+        position += queued
+        fresh = np.frombuffer(data, dtype=np.float64, count=queued, offset=position)
+
+        params = tuple(meta["params"]) if meta["params"] is not None else None
+        restore_keyframe(state, checkpoint, (meta["rng"], stages, fresh, params, meta["taken"]))
+
+
+class ReplayPlayer:
+    """Plays a recorded session back on a live board (same interface as GreedyBot)."""
+
+    def __init__(self, archive: ReplayArchive, session: int):
+        """
+        Prepare playback (switches game_config to the session's config).
+
+        Args:
+            archive: Open archive
+            session: Session number
+        """
+        self.archive = archive
+        self.session = session
+        info = archive.info(session)
+        if game_config.fingerprint() != info["config_id"]:
+            game_config.replace(archive.config(info["config_id"]))
+        self.inputs = archive.inputs(session)
+
+    def start(self, state: PlayState) -> None:
+        """Put the board at the session's first tick (called when a game starts)."""
+        self.archive.start(state, self.session)
+
+    def should_ship(self, state: PlayState) -> bool:
+        """Check if the recording ended the game from outside at this tick."""
+        return self.inputs.get(state.tick, (None, None))[0] == OP_END
+
+    def choose(self, state: PlayState) -> Optional[float]:
+        """
+        Get the recorded drop for this tick.
+
+        Returns:
+            Drop X, or None if nothing was dropped
+        """
+        op, x = self.inputs.get(state.tick, (None, None))
+        return x if op == OP_DROP else None
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="List or seek recorded sessions in a replay archive")
+    parser.add_argument("archive", help="replay archive (.mkr)")
+    parser.add_argument("--seek", nargs=2, type=int, metavar=("SESSION", "TICK"),
+                        help="rebuild the board of SESSION at TICK and describe it")
+    args = parser.parse_args(argv)
+
+    archive = ReplayArchive(args.archive)
+    try:
+        if args.seek:
+            session, tick = args.seek
+            start = time.perf_counter()
+            state = archive.seek(session, tick)
+            elapsed = time.perf_counter() - start
+            print(f"session {session} tick {state.tick} ({state.tick * PlayState.TICK_DT:.1f}s) "
+                  f"restored in {elapsed * 1000:.1f} ms")
+            print(f"  fruits {len(state.fruits)}, score {state.score_tracker.get_score()}, "
+                  f"danger {state.above_line_time:.2f}s"
+                  + (f", ended: {state.game_over_reason}" if state.game_over else ""))
+            for fruit in sorted(state.fruits, key=lambda f: f.y):
+                print(f"  stage {fruit.stage} at ({fruit.x:.1f}, {fruit.y:.1f}) fresh {fruit.fresh:.1f}")
+            return
+
+        print(f"{len(archive.sessions)} sessions")
+        for session in archive.sessions:
+            info = archive.info(session)
+            print(f"  {session:>5}  seed {info['seed']}  config {info['config_id']}  "
+                  f"ticks {info['first_tick']}-{info['last_tick']}  "
+                  f"{info['reason'] or 'unfinished'}  score {info['score']}")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""Vectorized re-scoring of archived delivery histories.
+
+A game's score depends only on the freshness of each delivered mikan (in
+delivery order) and four config values: ``rot.rot_rate``,
+``rot.rotten_threshold``, ``score.fresh_to_score`` and ``score.count_bonus``.
+``Rescorer`` applies ``ScoreTracker``'s formula to every stored history and
+every combination of candidate values with NumPy, giving the same integer
+``ScoreTracker.get_score`` returns for that game under that config.
+
+The result matches bit for bit because every step does the same float
+operations in the same order:
+
+- fresh_sum is accumulated delivery by delivery (not with a pairwise sum)
+- (1 - rot_rate) ** rotten_count is computed with Python's pow per distinct count
+- delivered_count * count_bonus is exact for integer bonuses, like Python ints
+
+Histories come from JSONL event logs (freshness round-trips exactly) or
+from ``.bin`` logs, which store freshness as float32; scores rebuilt from
+``.bin`` logs match ScoreTracker fed those rounded values.
+
+Usage:
+    python -m game.rescore "logs/*.jsonl" --rot-rate 0.05,0.08,0.1 --count-bonus 30,40
+"""
+import argparse
+import csv
+import glob
+import itertools
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from game.config import game_config
+from game.events import iter_events
+
+# Score config keys in grid order: (name, category, key, default as in ScoreTracker)
+SCORE_PARAMS = (
+    ("rotten_threshold", "rot", "rotten_threshold", 30),
+    ("rot_rate", "rot", "rot_rate", 0.08),
+    ("fresh_to_score", "score", "fresh_to_score", 1.0),
+    ("count_bonus", "score", "count_bonus", 40),
+)
+
+
+def current_score_params() -> Dict[str, Any]:
+    """Score settings of the loaded config (grid defaults)."""
+    return {name: game_config.get(category, key, default=default)
+            for name, category, key, default in SCORE_PARAMS}
+
+
+class DeliveryHistories:
+    """
+    Delivered freshness sequences of many games in one flat array.
+
+    Game ``i`` delivered ``fresh[offsets[i]:offsets[i + 1]]``, in order.
+    """
+
+    def __init__(self, fresh: np.ndarray, offsets: np.ndarray,
+                 recorded_scores: Optional[np.ndarray] = None):
+        """
+        Initialize from flat arrays.
+
+        Args:
+            fresh: All delivered freshness values (float64)
+            offsets: Start of each game in ``fresh`` plus a final end offset
+            recorded_scores: Score logged at the end of each game (-1 if unknown)
+        """
+        self.fresh = np.ascontiguousarray(fresh, dtype=np.float64)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        if recorded_scores is None:
+            recorded_scores = np.full(len(self), -1, dtype=np.int64)
+        self.recorded_scores = np.asarray(recorded_scores, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Deliveries per game."""
+        return np.diff(self.offsets)
+
+    @classmethod
+    def from_lists(cls, histories: Iterable[Sequence[float]]) -> "DeliveryHistories":
+        """
+        Build from per-game sequences (e.g. ScoreTracker.delivered_fresh_values).
+
+        Args:
+            histories: One freshness sequence per game
+
+        Returns:
+            DeliveryHistories
+        """
+        values: List[float] = []
+        offsets = [0]
+        for history in histories:
+            values.extend(history)
+            offsets.append(len(values))
+        return cls(np.array(values, dtype=np.float64), np.array(offsets, dtype=np.int64))
+
+    @classmethod
+    def from_event_logs(cls, paths: Iterable[str]) -> "DeliveryHistories":
+        """
+        Collect one history per session from event logs (see game.events).
+
+        Sessions with no events after session_start (never played) are skipped.
+
+        Args:
+            paths: JSONL or binary event logs
+
+        Returns:
+            DeliveryHistories with the logged end scores
+        """
+        values: List[float] = []
+        offsets = [0]
+        scores: List[int] = []
+        for path in paths:
+            in_session = False
+            played = False
+            score = -1
+            for kind, _tick, fields in iter_events(path):
+                if kind == "session_start":
+                    if in_session and played:
+                        offsets.append(len(values))
+                        scores.append(score)
+                    elif in_session:
+                        del values[offsets[-1]:]
+                    in_session, played, score = True, False, -1
+                    continue
+                if not in_session:
+                    continue  # events before any session_start (truncated head)
+                played = True
+                if kind == "deliver":
+                    values.append(fields["fresh"])
+                elif kind == "end":
+                    score = fields["score"]
+            if in_session and played:
+                offsets.append(len(values))
+                scores.append(score)
+            else:
+                del values[offsets[-1]:]
+
+        return cls(np.array(values, dtype=np.float64), np.array(offsets, dtype=np.int64),
+                   np.array(scores, dtype=np.int64))
+
+    def save(self, path: str) -> None:
+        """Write the histories to a .npz archive."""
+        np.savez(path, fresh=self.fresh, offsets=self.offsets,
+                 recorded_scores=self.recorded_scores)
+
+    @classmethod
+    def load(cls, path: str) -> "DeliveryHistories":
+        """Read histories written by save()."""
+        with np.load(path) as data:
+            return cls(data["fresh"], data["offsets"], data["recorded_scores"])
+
+
+class Rescorer:
+    """Scores every history under candidate score configs."""
+
+    def __init__(self, histories: DeliveryHistories):
+        """
+        Precompute the config-independent parts (fresh_sum, delivered_count).
+
+        Args:
+            histories: Games to score
+        """
+        self.histories = histories
+        self.counts = histories.lengths
+        self.fresh_sum = self._sequential_sums(histories.fresh, histories.offsets)
+        self._rotten_cache: Dict[float, np.ndarray] = {}
+
+    @staticmethod
+    def _sequential_sums(fresh: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """
+        Per-game sums added in delivery order, like ``fresh_sum += fresh``.
+
+        Games are visited longest first so the games still accumulating at
+        step k are always a prefix; each step is one vectorized add.
+        """
+        lengths = np.diff(offsets)
+        order = np.argsort(-lengths, kind="stable")
+        starts = offsets[:-1][order]
+        remaining = lengths[order]
+
+        sums = np.zeros(len(lengths), dtype=np.float64)
+        longest = int(remaining[0]) if len(remaining) else 0
+        # Number of games with more than k deliveries, for every k
+        active_counts = np.searchsorted(-remaining, -np.arange(longest), side="left")
+        for k in range(longest):
+            active = active_counts[k]
+            sums[:active] += fresh[starts[:active] + k]
+
+        result = np.empty_like(sums)
+        result[order] = sums
+        return result
+
+    def rotten_counts(self, rotten_threshold: float) -> np.ndarray:
+        """Rotten deliveries per game (fresh <= rotten_threshold)."""
+        counts = self._rotten_cache.get(rotten_threshold)
+        if counts is None:
+            rotten = np.concatenate(([0], np.cumsum(self.histories.fresh <= rotten_threshold)))
+            offsets = self.histories.offsets
+            counts = rotten[offsets[1:]] - rotten[offsets[:-1]]
+            self._rotten_cache[rotten_threshold] = counts
+        return counts
+
+    def _effective_fresh(self, rotten: np.ndarray, rot_rate: float) -> np.ndarray:
+        """fresh_sum x (1 - rot_rate)^rotten_count, fresh_sum where nothing rotted."""
+        top = int(rotten.max()) if len(rotten) else 0
+        multipliers = np.array([(1 - rot_rate) ** k for k in range(top + 1)], dtype=np.float64)
+        return np.where(rotten == 0, self.fresh_sum, self.fresh_sum * multipliers[rotten])
+
+    def _bonus_term(self, count_bonus: float) -> np.ndarray:
+        """delivered_count x count_bonus (integer product for integer bonuses)."""
+        if isinstance(count_bonus, (int, np.integer)):
+            return (self.counts * int(count_bonus)).astype(np.float64)
+        return self.counts * float(count_bonus)
+
+    def scores(self, rotten_threshold: float = 30, rot_rate: float = 0.08,
+               fresh_to_score: float = 1.0, count_bonus: float = 40) -> np.ndarray:
+        """
+        Score every game under one config.
+
+        Returns:
+            int64 array, one score per game
+        """
+        effective = self._effective_fresh(self.rotten_counts(rotten_threshold), rot_rate)
+        score = effective * float(fresh_to_score) + self._bonus_term(count_bonus)
+        return np.trunc(score).astype(np.int64)
+
+    def grid(self, rotten_thresholds: Sequence[float], rot_rates: Sequence[float],
+             fresh_to_scores: Sequence[float], count_bonuses: Sequence[float]) -> np.ndarray:
+        """
+        Score every game under every combination of candidate values.
+
+        Args:
+            rotten_thresholds: Candidate rot.rotten_threshold values
+            rot_rates: Candidate rot.rot_rate values
+            fresh_to_scores: Candidate score.fresh_to_score values
+            count_bonuses: Candidate score.count_bonus values
+
+        Returns:
+            int64 array shaped (thresholds, rot_rates, fresh_to_scores,
+            count_bonuses, games)
+        """
+        games = len(self.histories)
+        result = np.empty((len(rotten_thresholds), len(rot_rates), len(fresh_to_scores),
+                           len(count_bonuses), games), dtype=np.int64)
+        scales = np.array([float(value) for value in fresh_to_scores])[:, None, None]
+        bonus = np.array([self._bonus_term(value) for value in count_bonuses]).reshape(
+            len(count_bonuses), games)
+
+        for t, threshold in enumerate(rotten_thresholds):
+            rotten = self.rotten_counts(threshold)
+            for r, rot_rate in enumerate(rot_rates):
+                effective = self._effective_fresh(rotten, rot_rate)
+                # (fresh_to_scores, count_bonuses, games) in one broadcast
+                score = effective[None, None, :] * scales + bonus[None, :, :]
+                np.trunc(score, out=score)
+                result[t, r] = score
+        return result
+
+    def summarize(self, rotten_thresholds: Sequence[float], rot_rates: Sequence[float],
+                  fresh_to_scores: Sequence[float],
+                  count_bonuses: Sequence[float]) -> List[Dict[str, Any]]:
+        """
+        Score statistics per candidate config.
+
+        Returns:
+            One row per combination (config values, mean, p10, p50, p90, min, max)
+        """
+        scores = self.grid(rotten_thresholds, rot_rates, fresh_to_scores, count_bonuses)
+        rows = []
+        axes = (rotten_thresholds, rot_rates, fresh_to_scores, count_bonuses)
+        for index in itertools.product(*(range(len(values)) for values in axes)):
+            values = scores[index]
+            row = {name: axes[i][index[i]] for i, (name, _, _, _) in enumerate(SCORE_PARAMS)}
+            if len(values):
+                p10, p50, p90 = np.percentile(values, (10, 50, 90))
+                row.update(mean=float(values.mean()), p10=float(p10), p50=float(p50),
+                           p90=float(p90), min=int(values.min()), max=int(values.max()))
+            rows.append(row)
+        return rows
+
+
+def _concatenate(parts: List[DeliveryHistories]) -> DeliveryHistories:
+    """Join several history archives into one."""
+    fresh = np.concatenate([part.fresh for part in parts])
+    starts = np.cumsum([0] + [len(part.fresh) for part in parts[:-1]])
+    offsets = np.concatenate([[0]] + [part.offsets[1:] + start
+                                      for part, start in zip(parts, starts)])
+    scores = np.concatenate([part.recorded_scores for part in parts])
+    return DeliveryHistories(fresh, offsets, scores)
+
+
+def _parse_values(text: str) -> List[Any]:
+    """Parse a comma separated list of numbers, keeping integers as int."""
+    values = []
+    for item in text.split(","):
+        item = item.strip()
+        try:
+            values.append(int(item))
+        except ValueError:
+            values.append(float(item))
+    return values
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Re-score archived games under other score configs")
+    parser.add_argument("sources", nargs="+",
+                        help="event logs, glob patterns, or .npz histories from --save")
+    parser.add_argument("--config", metavar="PATH", help="config supplying grid defaults")
+    for name, category, key, _ in SCORE_PARAMS:
+        parser.add_argument("--" + name.replace("_", "-"), type=_parse_values, metavar="V[,V...]",
+                            help=f"candidate {category}.{key} values (default: current config)")
+    parser.add_argument("--csv", metavar="PATH", help="write one row per config")
+    parser.add_argument("--save", metavar="PATH", help="save the collected histories as .npz")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        game_config.load(args.config)
+
+    paths: List[str] = []
+    for pattern in args.sources:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    if all(path.endswith(".npz") for path in paths):
+        parts = [DeliveryHistories.load(path) for path in paths]
+        histories = _concatenate(parts)
+    else:
+        histories = DeliveryHistories.from_event_logs(paths)
+    if args.save:
+        histories.save(args.save)
+
+    current = current_score_params()
+    axes = [getattr(args, name) or [current[name]] for name, _, _, _ in SCORE_PARAMS]
+    rescorer = Rescorer(histories)
+    rows = rescorer.summarize(*axes)
+
+    baseline = rescorer.scores(**current)
+    recorded = histories.recorded_scores >= 0
+    mismatched = int(np.count_nonzero(baseline[recorded] != histories.recorded_scores[recorded]))
+    print(f"{len(histories)} games, {len(histories.fresh)} deliveries, {len(rows)} configs; "
+          f"current config mean {baseline.mean() if len(baseline) else 0:.1f}"
+          f" ({mismatched} of {int(recorded.sum())} logged scores differ)")
+
+    names = [name for name, _, _, _ in SCORE_PARAMS]
+    print("  ".join(f"{name:>16}" for name in names) + "      mean       p50")
+    for row in rows:
+        if "mean" in row:
+            print("  ".join(f"{row[name]!s:>16}" for name in names)
+                  + f"  {row['mean']:>8.1f}  {row['p50']:>8.1f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else names)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""Rewind ring buffer of play state checkpoints.
+
+Every tick is recorded. A keyframe (full board plus spawn sequence position)
+starts a segment every ``keyframe_interval`` ticks; the ticks in between are
+stored as deltas against the previous tick. Fruit rows are packed into a
+fixed record layout, XORed with the same fruit's row from the previous tick
+(unchanged bytes become zero), byte-transposed so equal byte positions sit
+together and compressed with zlib. Values are stored exactly, so a restored
+board simulates on exactly as the original did. A minute of a busy board
+takes about 1 MiB.
+
+Whole segments are evicted oldest first once ``max_bytes`` is exceeded, so
+memory stays bounded however long the game runs. Restoring a tick decodes
+its keyframe plus at most ``keyframe_interval - 1`` deltas.
+"""
+import bisect
+import struct
+import sys
+import zlib
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game.fruit import Fruit
+
+# One fruit (the waiting fruit is the last row, flagged FLAG_NEXT)
+ROW = np.dtype([
+    ("stage", "u1"),
+    ("flags", "u1"),
+    ("island", "<i2"),  # Sleeping island number within the checkpoint (-1 = none)
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("vx", "<f8"),
+    ("vy", "<f8"),
+    ("fresh", "<f8"),
+    ("merge_cooldown", "<f8"),
+    ("sleep_timer", "<f8"),
+])
+FLAG_DROPPED = 0x01
+FLAG_SLEEPING = 0x02
+FLAG_NEXT = 0x04
+FLAG_LANDED = 0x08
+
+# tick, drop cooldown, above line time, game over, delivered, rotten,
+# fresh sum, spawns taken, fruit rows, new deliveries, reason length
+HEADER = struct.Struct("<Idd?IIdIHHB")
+
+# Bookkeeping per stored blob beyond its bytes (list slot, tick bookkeeping)
+ENTRY_OVERHEAD = 16
+
+
+class _Segment:
+    """A keyframe and the deltas of the ticks that follow it."""
+
+    __slots__ = ("tick", "keyframe", "spawn_state", "deltas", "nbytes")
+
+    def __init__(self, tick: int, keyframe: bytes, spawn_state: tuple):
+        self.tick = tick
+        self.keyframe = keyframe
+        self.spawn_state = spawn_state
+        self.deltas: List[bytes] = []
+        _, stages, fresh, _, _ = spawn_state
+        self.nbytes = (sys.getsizeof(keyframe) + stages.nbytes + fresh.nbytes
+                       + 2 * ENTRY_OVERHEAD)
+
+
+class RewindBuffer:
+    """Bounded history of one board for scrubbing back and forth."""
+
+    def __init__(self, keyframe_interval: int = 30, max_bytes: int = 4 * 1024 * 1024):
+        """
+        Initialize buffer.
+
+        Args:
+            keyframe_interval: Ticks per segment (restore decodes at most this
+                many checkpoints)
+            max_bytes: Memory budget; oldest segments are dropped beyond it
+        """
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.max_bytes = max_bytes
+        self.segments: deque = deque()
+        self.nbytes = 0
+
+        # Previous recorded tick (delta reference)
+        self._prev_rows: Optional[np.ndarray] = None
+        self._prev_index: Dict[int, int] = {}
+        self._prev_delivered = 0
+        self._prev_session = None
+
+    def clear(self) -> None:
+        """Forget all history."""
+        self.segments.clear()
+        self.nbytes = 0
+        self._prev_rows = None
+        self._prev_index = {}
+        self._prev_delivered = 0
+        self._prev_session = None
+
+    @property
+    def first_tick(self) -> Optional[int]:
+        """Oldest tick that can be restored (None if empty)."""
+        return self.segments[0].tick if self.segments else None
+
+    @property
+    def last_tick(self) -> Optional[int]:
+        """Newest recorded tick (None if empty)."""
+        if not self.segments:
+            return None
+        segment = self.segments[-1]
+        return segment.tick + len(segment.deltas)
+
+    def record(self, state) -> None:
+        """
+        Record the board after a tick (call once per step; repeated calls
+        for the same tick are ignored).
+
+        A new game, or a tick that doesn't follow the last one, starts a
+        fresh history.
+
+        Args:
+            state: PlayState
+        """
+        last_tick = self.last_tick
+        if last_tick is not None and state.session == self._prev_session:
+            if state.tick == last_tick:
+                return
+            if state.tick != last_tick + 1:
+                self.clear()
+        elif last_tick is not None:
+            self.clear()
+
+        rows, index = self._pack_rows(state)
+        segment = self.segments[-1] if self.segments else None
+        if segment is None or len(segment.deltas) + 1 >= self.keyframe_interval:
+            blob = self._encode(state, rows, None, index, 0)
+            segment = _Segment(state.tick, blob, state.spawn_queue.get_state())
+            self.segments.append(segment)
+            self.nbytes += segment.nbytes
+        else:
+            blob = self._encode(state, rows, self._prev_rows, index, self._prev_delivered)
+            segment.deltas.append(blob)
+            size = sys.getsizeof(blob) + ENTRY_OVERHEAD
+            segment.nbytes += size
+            self.nbytes += size
+
+        self._prev_rows = rows
+        self._prev_index = index
+        self._prev_delivered = state.score_tracker.delivered_count
+        self._prev_session = state.session
+
+        while self.nbytes > self.max_bytes and len(self.segments) > 1:
+            self.nbytes -= self.segments.popleft().nbytes
+
+    def restore(self, state, tick: int) -> bool:
+        """
+        Put the board back to a recorded tick.
+
+        The recorded history is kept, so restore can move both backwards and
+        forwards; call branch() before simulating from the restored tick.
+
+        Args:
+            state: PlayState to overwrite
+            tick: Tick to restore (clamped to the recorded range)
+
+        Returns:
+            True if a checkpoint was restored
+        """
+        if not self.segments:
+            return False
+        tick = max(self.first_tick, min(self.last_tick, tick))
+        segment = self._segment_at(tick)
+        rows, header, delivered = self._decode_range(segment, tick)
+        self._apply(state, segment, rows, header, delivered)
+        return True
+
+    def branch(self, state) -> None:
+        """
+        Drop history after the state's tick so recording continues from it
+        (call after restore() when play resumes).
+
+        Args:
+            state: PlayState as restored
+        """
+        if not self.segments or state.tick > self.last_tick:
+            return
+        while self.segments and self.segments[-1].tick > state.tick:
+            self.nbytes -= self.segments.pop().nbytes
+        if not self.segments:
+            self.clear()
+            return
+
+        segment = self.segments[-1]
+        keep = state.tick - segment.tick
+        for blob in segment.deltas[keep:]:
+            size = sys.getsizeof(blob) + ENTRY_OVERHEAD
+            segment.nbytes -= size
+            self.nbytes -= size
+        del segment.deltas[keep:]
+
+        # Restored fruits are new objects in row order
+        self._prev_rows, _, _ = self._decode_range(segment, state.tick)
+        self._prev_index, _ = self._row_index(state)
+        self._prev_delivered = state.score_tracker.delivered_count
+        self._prev_session = state.session
+
+    def _segment_at(self, tick: int) -> _Segment:
+        """Segment containing a recorded tick."""
+        ticks = [segment.tick for segment in self.segments]
+        return self.segments[bisect.bisect_right(ticks, tick) - 1]
+
+    @staticmethod
+    def _row_index(state) -> tuple:
+        """Row order of a state's fruits (board fruits, then the waiting fruit)."""
+        fruits = list(state.fruits)
+        if state.next_fruit is not None and not state.next_fruit.dropped:
+            fruits.append(state.next_fruit)
+        return {id(fruit): row for row, fruit in enumerate(fruits)}, fruits
+
+    def _pack_rows(self, state) -> tuple:
+        """Pack the board into ROW records."""
+        index, fruits = self._row_index(state)
+        islands: Dict[int, int] = {}
+        records = []
+        for fruit in fruits:
+            flags = FLAG_DROPPED if fruit.dropped else 0
+            if fruit.landed:
+                flags |= FLAG_LANDED
+            island = -1
+            if fruit.sleeping:
+                flags |= FLAG_SLEEPING
+                if fruit.island is not None:
+                    island = islands.setdefault(id(fruit.island), len(islands))
+            records.append((fruit.stage, flags, island, fruit.x, fruit.y, fruit.vx, fruit.vy,
+                            fruit.fresh, fruit.merge_cooldown, fruit.sleep_timer))
+        rows = np.array(records, dtype=ROW)
+        if fruits and fruits[-1] is state.next_fruit:
+            rows["flags"][-1] |= FLAG_NEXT
+        return rows, index
+
+    def _encode(self, state, rows: np.ndarray, prev_rows: Optional[np.ndarray],
+                index: Dict[int, int], prev_delivered: int) -> bytes:
+        """
+        Encode one checkpoint.
+
+        Args:
+            state: PlayState (scalars)
+            rows: Packed fruits
+            prev_rows: Previous tick's rows (None for a keyframe)
+            index: Row of each fruit object in ``rows``
+            prev_delivered: Deliveries already recorded up to the previous tick
+                (0 for a keyframe, which stores every delivered value)
+
+        Returns:
+            Compressed checkpoint
+        """
+        tracker = state.score_tracker
+        reason = state.game_over_reason.encode("utf-8")
+        new_values = tracker.delivered_fresh_values[prev_delivered:]
+        header = HEADER.pack(state.tick, state.drop_cooldown, state.above_line_time,
+                             state.game_over, tracker.delivered_count, tracker.rotten_count,
+                             tracker.fresh_sum, state.spawn_queue.taken, len(rows),
+                             len(new_values), len(reason))
+
+        # Row of each fruit in the previous tick (-1 = not there)
+        source = np.full(len(rows), -1, dtype=np.int16)
+        reference = np.zeros(len(rows), dtype=ROW)
+        if prev_rows is not None:
+            prev_index = self._prev_index
+            for fruit_id, row in index.items():
+                source[row] = prev_index.get(fruit_id, -1)
+            present = source >= 0
+            reference[present] = prev_rows[source[present]]
+
+        xor = rows.view(np.uint8) ^ reference.view(np.uint8)
+        planes = xor.reshape(len(rows), ROW.itemsize).T
+        values = np.asarray(new_values, dtype=np.float64)
+        data = b"".join((header, reason, source.tobytes(), planes.tobytes(), values.tobytes()))
+        return zlib.compress(data, 1)
+
+    @staticmethod
+    def _decode(blob: bytes, prev_rows: Optional[np.ndarray]) -> tuple:
+        """
+        Decode one checkpoint.
+
+        Returns:
+            (rows, header fields, reason, new delivered values)
+        """
+        data = zlib.decompress(blob)
+        header = HEADER.unpack_from(data)
+        offset = HEADER.size
+        count, new_deliveries, reason_length = header[8], header[9], header[10]
+        reason = data[offset:offset + reason_length].decode("utf-8")
+        offset += reason_length
+
+        source = np.frombuffer(data, dtype=np.int16, count=count, offset=offset)
+        offset += source.nbytes
+        size = count * ROW.itemsize
+        planes = np.frombuffer(data, dtype=np.uint8, count=size, offset=offset)
+        offset += size
+        values = np.frombuffer(data, dtype=np.float64, count=new_deliveries, offset=offset)
+
+        rows = planes.reshape(ROW.itemsize, count).T.copy().view(ROW).reshape(count)
+        if prev_rows is not None:
+            present = source >= 0
+            reference = prev_rows[source[present]]
+            rows_bytes = rows.view(np.uint8).reshape(count, ROW.itemsize)
+            rows_bytes[present] ^= reference.view(np.uint8).reshape(-1, ROW.itemsize)
+        return rows, header, reason, values
+
+    def _decode_range(self, segment: _Segment, tick: int) -> tuple:
+        """
+        Decode a segment's keyframe and deltas up to a tick.
+
+        Returns:
+            (rows, (header fields, reason), delivered values)
+        """
+        rows, header, reason, values = self._decode(segment.keyframe, None)
+        delivered = [values]
+        for blob in segment.deltas[:tick - segment.tick]:
+            rows, header, reason, values = self._decode(blob, rows)
+            if len(values):
+                delivered.append(values)
+        return rows, (header, reason), np.concatenate(delivered)
+
+    @staticmethod
+    def _apply(state, segment: _Segment, rows: np.ndarray, header_reason: tuple,
+               delivered: np.ndarray) -> None:
+        """Overwrite a PlayState with decoded checkpoint data."""
+        header, reason = header_reason
+        (tick, drop_cooldown, above_line_time, game_over, delivered_count, rotten_count,
+         fresh_sum, taken, _, _, _) = header
+
+        fruits = []
+        next_fruit = None
+        islands: Dict[int, list] = {}
+        for record in rows.tolist():
+            stage, flags, island, x, y, vx, vy, fresh, merge_cooldown, sleep_timer = record
+            fruit = Fruit(stage, x, y, fresh)
+            fruit.vx = vx
+            fruit.vy = vy
+            fruit.dropped = bool(flags & FLAG_DROPPED)
+            fruit.landed = bool(flags & FLAG_LANDED)
+            fruit.merge_cooldown = merge_cooldown
+            fruit.sleep_timer = sleep_timer
+            if flags & FLAG_SLEEPING:
+                fruit.sleeping = True
+                if island >= 0:
+                    fruit.island = islands.setdefault(island, [])
+                    fruit.island.append(fruit)
+            if flags & FLAG_NEXT:
+                next_fruit = fruit
+            else:
+                fruits.append(fruit)
+
+        state.fruits[:] = fruits
+        state.next_fruit = next_fruit
+        state.tick = tick
+        state.drop_cooldown = drop_cooldown
+        state.above_line_time = above_line_time
+        state.game_over = game_over
+        state.game_over_reason = reason
+        state.last_dropped = None
+        state.last_merges = []
+        state.last_delivered = []
+
+        tracker = state.score_tracker
+        tracker.version += 1
+        tracker.delivered_count = delivered_count
+        tracker.rotten_count = rotten_count
+        tracker.fresh_sum = fresh_sum
+        tracker.delivered_fresh_values[:] = delivered.tolist()
+
+        # Spawn sequence: keyframe position, then replay the pops since
+        queue = state.spawn_queue
+        queue.set_state(segment.spawn_state)
+        for _ in range(taken - queue.taken):
+            queue.pop()
+
+        state.physics.rebuild_index(state.fruits)
+        state.merge_manager.invalidate()
+
+
+def encode_keyframe(state) -> Tuple[bytes, tuple]:
+    """
+    Encode a standalone keyframe of a board (for archives).
+
+    Args:
+        state: PlayState at a tick boundary
+
+    Returns:
+        (checkpoint bytes, spawn queue state from SpawnQueue.get_state)
+    """
+    buffer = RewindBuffer(keyframe_interval=1)
+    rows, index = buffer._pack_rows(state)
+    return buffer._encode(state, rows, None, index, 0), state.spawn_queue.get_state()
+
+
+def restore_keyframe(state, checkpoint: bytes, spawn_state: tuple) -> None:
+    """
+    Overwrite a board with a keyframe from encode_keyframe.
+
+    Args:
+        state: PlayState to overwrite
+        checkpoint: Checkpoint bytes
+        spawn_state: Spawn queue state stored with it
+    """
+    rows, header, reason, values = RewindBuffer._decode(checkpoint, None)
+    segment = _Segment(header[0], checkpoint, spawn_state)
+    RewindBuffer._apply(state, segment, rows, (header, reason), values)
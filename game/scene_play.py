@@ -1,11 +1,17 @@
 """Main play scene with game logic."""
-import pyxel
 import time
-from typing import List
-from game.fruit import Fruit, FruitFactory
-from game.physics import PhysicsEngine
-from game.merge import MergeManager
-from game.scoring import ScoreTracker
+from collections import deque
+
+import pyxel
+from game import font
+from game.camera import Camera
+from game.physics_worker import RemoteBoard
+from game.frame_cache import FrameCache
+from game.play_state import PlayState
+from game.quality import QualityGovernor
+from game.replay_archive import ReplayWriter
+from game.rewind import RewindBuffer
+from game.stages import stage_table
 from game.ui_beta import BetaPanel, HUD
 from game.config import game_config
 
@@ -13,59 +19,124 @@ from game.config import game_config
 class PlayScene:
     """Main gameplay scene."""
 
-    # Play area dimensions
-    PLAY_WIDTH = 240
-    PLAY_HEIGHT = 200
+    # Play area viewport on screen (the board itself is sized by config "board")
+    VIEW_WIDTH = 240
+    VIEW_HEIGHT = 200
     PLAY_X = 0
     PLAY_Y = 40
 
-    def __init__(self, app):
+    # Upcoming spawns shown in the HUD
+    PREVIEW_COUNT = 3
+
+    # Camera controls
+    SCROLL_SPEED = 6
+    ZOOM_STEP = 1.25
+
+    # Fruits smaller than this on screen (pixels) are drawn as squares at the LOD level
+    LOD_RADIUS = 3
+
+    # Rewind scrubbing: ticks per key repeat (x10 with Shift), hold/repeat frames
+    SCRUB_STEP = 1
+    SCRUB_HOLD = 8
+    SCRUB_REPEAT = 1
+
+    # Fast-forward: ticks per frame picked with keys 1-4
+    TIME_SCALES = (1, 2, 4, 16)
+    SPEED_KEYS = (pyxel.KEY_1, pyxel.KEY_2, pyxel.KEY_3, pyxel.KEY_4)
+    # Share of the frame budget the ticks may use (the rest is left for drawing)
+    FAST_FORWARD_SHARE = 0.85
+    # Frames averaged for the achieved speed display
+    SPEED_WINDOW = 30
+
+    def __init__(self, app, publisher=None, physics_worker: bool = False,
+                 event_log: str = None, archive: ReplayWriter = None, autoplay=None):
         """
         Initialize play scene.
 
         Args:
             app: Main application instance
+            publisher: Optional StatePublisher streaming ticks to spectators
+            physics_worker: Simulate the board in a worker process (RemoteBoard);
+                rewind and spectator streaming need the local PlayState
+            event_log: Event log path for the worker (local boards are
+                subscribed by the app)
+            archive: Records every game into a replay archive (local board only)
+            autoplay: Plays instead of the mouse (GreedyBot or ReplayPlayer:
+                start / should_ship / choose); local board only
         """
         self.app = app
+        self.publisher = publisher
+        self.archive = None if physics_worker else archive
+        self.autoplay = None if physics_worker else autoplay
+
+        # Board size (arena configs can be much larger than the viewport)
+        self.play_width = game_config.get("board", "width", default=240)
+        self.play_height = game_config.get("board", "height", default=200)
+        drop_y = game_config.get("board", "drop_y", default=40)
+
+        # Game state (logic lives in PlayState; the scene handles input and drawing)
+        self.remote = physics_worker
+        self.rewind = None
+        if physics_worker:
+            self.state = RemoteBoard(self.play_width, self.play_height, drop_y,
+                                     event_log=event_log)
+        else:
+            self.state = PlayState(self.play_width, self.play_height, drop_y)
 
-        # Game state
-        self.fruits: List[Fruit] = []
-        self.next_fruit: Fruit = None
-        self.drop_cooldown = 0.0
+            # Rewind history (tool setting, not part of the gameplay config defaults)
+            self.rewind = RewindBuffer(
+                keyframe_interval=game_config.get("rewind", "keyframe_interval", default=30),
+                max_bytes=game_config.get("rewind", "max_kib", default=4096) * 1024)
         self.paused = False
-        self.game_over = False
-        self.game_over_reason = ""
+        self.rewinding = False
 
-        # Game systems
-        self.physics = PhysicsEngine(self.PLAY_WIDTH, self.PLAY_HEIGHT)
-        self.merge_manager = MergeManager(self.physics)
-        self.score_tracker = ScoreTracker()
-        self.beta_panel = BetaPanel()
+        # Fast-forward (the worker board computes one tick at a time, so it stays at 1x)
+        self.time_scale = 1
+        self._speed_samples = deque(maxlen=self.SPEED_WINDOW)  # (frame, start time, ticks run)
+        self._frame_start = 0.0
+        self._extra_seconds = 0.0  # Time spent on ticks after the first this frame
+        self._draw_seconds = 0.0
+
+        # View
+        self.camera = Camera(self.PLAY_X, self.PLAY_Y, self.VIEW_WIDTH, self.VIEW_HEIGHT,
+                             self.play_width, self.play_height)
+
+        # Rendering quality follows the measured update + draw cost
+        self.governor = QualityGovernor()
+        self._outlines, self._sparkles, self._lod = True, True, False  # Set per frame
 
-        # Game over detection
-        self.above_line_time = 0.0
-        self.danger_line_y = 0
+        # UI
+        self.beta_panel = BetaPanel()
+        self.pause_overlay = FrameCache(140, 40, self._render_pause_overlay)
 
         # Initialize
         self.reset()
 
     def reset(self) -> None:
         """Reset game to initial state."""
-        self.fruits.clear()
-        self.next_fruit = FruitFactory.create_spawn_fruit(self.PLAY_WIDTH // 2)
-        self.drop_cooldown = 0.0
+        self.state.reset()
+        if self.autoplay:
+            self.autoplay.start(self.state)
         self.paused = False
-        self.game_over = False
-        self.game_over_reason = ""
-        self.score_tracker.reset()
-        self.above_line_time = 0.0
-
-        # Calculate danger line
-        line_y_ratio = game_config.get("game_over", "line_y", default=0.2)
-        self.danger_line_y = int(self.PLAY_HEIGHT * line_y_ratio)
+        self.rewinding = False
+        self._speed_samples.clear()
+        if self.rewind:
+            self.rewind.clear()
+            self.rewind.record(self.state)
+        if self.archive:
+            self.archive.record(self.state)
 
     def update(self) -> None:
-        """Update play scene."""
+        """Update play scene (timed for the quality governor)."""
+        start = time.perf_counter()
+        self._frame_start = start
+        self._extra_seconds = 0.0
+        self._update_scene()
+        # Extra fast-forward ticks only fill leftover budget: quality follows a 1x frame
+        self.governor.record_update(time.perf_counter() - start - self._extra_seconds)
+
+    def _update_scene(self) -> None:
+        """Handle input and advance the game."""
         # Beta panel controls
         if pyxel.btnp(pyxel.KEY_F1):
             self.beta_panel.toggle()
@@ -74,99 +145,158 @@ class PlayScene:
             game_config.save()
 
         if pyxel.btnp(pyxel.KEY_F9):
+            num_stages = stage_table().num_stages
             game_config.reset_to_defaults()
+            if stage_table().num_stages != num_stages:
+                self.reset()  # Board fruits may be stages the new ladder doesn't have
+
+        # Rewind works with the beta panel open (scrub back, tweak, resume)
+        if self.rewind and pyxel.btnp(pyxel.KEY_R):
+            self._toggle_rewind()
+        if self.rewinding:
+            self._update_scrub()
 
         # Update beta panel
         if self.beta_panel.visible:
             self.beta_panel.update()
             return  # Don't update game when panel is open
 
+        if self.rewinding:
+            self._update_camera()
+            return
+
         # Pause toggle
         if pyxel.btnp(pyxel.KEY_ESCAPE):
             self.paused = not self.paused
 
-        if self.paused or self.game_over:
-            # Check for ship out during pause or game over
-            if pyxel.btnp(pyxel.KEY_S):
-                self._end_game("SHIPPED OUT")
-            return
-
-        # Ship out at any time
+        # Ship out at any time (also during pause)
         if pyxel.btnp(pyxel.KEY_S):
             self._end_game("SHIPPED OUT")
             return
 
-        # Update drop cooldown
-        dt = 1.0 / 30.0  # Assume 30 FPS
-        if self.drop_cooldown > 0:
-            self.drop_cooldown -= dt
-
-        # Update next fruit position
-        if self.next_fruit and not self.next_fruit.dropped:
-            # Mouse control
-            mouse_x = pyxel.mouse_x
-            self.next_fruit.x = max(self.next_fruit.radius,
-                                   min(self.PLAY_WIDTH - self.next_fruit.radius, mouse_x))
-
-            # Drop on click
-            if pyxel.btnp(pyxel.MOUSE_BUTTON_LEFT) and self.drop_cooldown <= 0:
-                self._drop_fruit()
-
-        # Update physics
-        self.physics.update(self.fruits, dt)
-
-        # Update freshness decay
-        for fruit in self.fruits:
-            fruit.update_decay(dt)
+        self._update_camera()
 
-        # Check and apply merges
-        merges = self.merge_manager.check_and_merge(self.fruits)
-        delivered_mikan = self.merge_manager.apply_merges(self.fruits, merges)
+        if not self.remote:
+            for key, scale in zip(self.SPEED_KEYS, self.TIME_SCALES):
+                if pyxel.btnp(key):
+                    self.time_scale = scale
+                    self._speed_samples.clear()
 
-        # Deliver mikan
-        for mikan in delivered_mikan:
-            self.score_tracker.deliver_mikan(mikan.fresh)
-
-        # Check game over condition
-        self._check_game_over(dt)
-
-    def _drop_fruit(self) -> None:
-        """Drop the current fruit."""
-        if not self.next_fruit:
+        if self.paused or self.state.game_over:
             return
 
-        # Mark as dropped
-        self.next_fruit.dropped = True
-        self.next_fruit.y = self.PLAY_Y  # Start from top of play area
-        self.fruits.append(self.next_fruit)
+        drop_x = None
+        if self.autoplay is None:
+            # Update next fruit position (mouse control)
+            aim_x = self.camera.to_world_x(pyxel.mouse_x)
+            self.state.aim(aim_x)
+
+            # Drop on click
+            if pyxel.btnp(pyxel.MOUSE_BUTTON_LEFT):
+                drop_x = aim_x
 
-        # Create next fruit
-        self.next_fruit = FruitFactory.create_spawn_fruit(self.PLAY_WIDTH // 2)
-        self.drop_cooldown = 0.5  # Half second cooldown
+        self._advance(drop_x)
 
-    def _check_game_over(self, dt: float) -> None:
+    def _advance(self, drop_x) -> None:
         """
-        Check if game over condition is met.
+        Run this frame's ticks: time_scale of them, or fewer if they would
+        eat into the time the next draw needs.
 
         Args:
-            dt: Delta time
+            drop_x: Mouse drop (applied on the first tick)
         """
-        # Check if any fruit is above danger line
-        grace_ms = game_config.get("game_over", "grace_ms", default=3000)
-        grace_seconds = grace_ms / 1000.0
-
-        any_above = False
-        for fruit in self.fruits:
-            if fruit.y - fruit.radius < self.danger_line_y:
-                any_above = True
+        deadline = (self._frame_start + self.governor.budget * self.FAST_FORWARD_SHARE
+                    - self._draw_seconds)
+        ticks = 0
+        first_done = None
+        while ticks < self.time_scale:
+            if self.autoplay:
+                if self.autoplay.should_ship(self.state):
+                    self._end_game("SHIPPED OUT")
+                    break
+                drop_x = self.autoplay.choose(self.state)
+
+            self._step(drop_x)
+            drop_x = None
+            ticks += 1
+            if self.state.game_over:
+                self._end_game(self.state.game_over_reason)
                 break
 
-        if any_above:
-            self.above_line_time += dt
-            if self.above_line_time >= grace_seconds:
-                self._end_game("JAMMED!")
-        else:
-            self.above_line_time = 0.0
+            now = time.perf_counter()
+            if first_done is None:
+                first_done = now
+            elif now > deadline:
+                break  # Can't keep up: show what we have
+
+        if first_done is not None:
+            self._extra_seconds = time.perf_counter() - first_done
+
+        # Frames that didn't advance (pause, rewind, panel) restart the average
+        samples = self._speed_samples
+        if samples and samples[-1][0] != pyxel.frame_count - 1:
+            samples.clear()
+        samples.append((pyxel.frame_count, self._frame_start, ticks))
+
+    def _step(self, drop_x) -> None:
+        """Advance one tick and record it."""
+        self.state.step(drop_x)
+        if self.rewind:
+            self.rewind.record(self.state)
+        if self.archive:
+            self.archive.record(self.state)
+
+        if self.publisher:
+            self.publisher.publish(self.state)
+
+    def achieved_speed(self) -> float:
+        """
+        Game speed over the last frames.
+
+        Returns:
+            Simulated seconds per real second (1.0 = normal speed)
+        """
+        samples = self._speed_samples
+        if len(samples) < 2:
+            return float(self.time_scale)
+        elapsed = samples[-1][1] - samples[0][1]
+        ticks = sum(count for _, _, count in samples) - samples[-1][2]
+        return ticks * PlayState.TICK_DT / elapsed if elapsed > 0 else float(self.time_scale)
+
+    def _toggle_rewind(self) -> None:
+        """Enter rewind (freezes the game) or resume play from the shown tick."""
+        if self.rewinding:
+            # Later history is replaced by whatever happens next
+            self.rewind.branch(self.state)
+            self.rewinding = False
+            if self.archive:
+                self.archive.record(self.state)  # Continues as a new archived session
+        elif self.rewind.last_tick is not None and not self.state.game_over:
+            self.rewinding = True
+
+    def _update_scrub(self) -> None:
+        """Z / X step backwards / forwards through recorded ticks (hold to repeat)."""
+        step = self.SCRUB_STEP * (10 if pyxel.btn(pyxel.KEY_SHIFT) else 1)
+        direction = (pyxel.btnp(pyxel.KEY_X, hold=self.SCRUB_HOLD, repeat=self.SCRUB_REPEAT)
+                     - pyxel.btnp(pyxel.KEY_Z, hold=self.SCRUB_HOLD, repeat=self.SCRUB_REPEAT))
+        if direction:
+            self.rewind.restore(self.state, self.state.tick + direction * step)
+
+    def _update_camera(self) -> None:
+        """Zoom with the mouse wheel, scroll with arrow keys, F to fit the board."""
+        camera = self.camera
+
+        if pyxel.mouse_wheel:
+            factor = self.ZOOM_STEP if pyxel.mouse_wheel > 0 else 1 / self.ZOOM_STEP
+            camera.zoom_by(factor, pyxel.mouse_x, pyxel.mouse_y)
+
+        dx = pyxel.btn(pyxel.KEY_RIGHT) - pyxel.btn(pyxel.KEY_LEFT)
+        dy = pyxel.btn(pyxel.KEY_DOWN) - pyxel.btn(pyxel.KEY_UP)
+        if dx or dy:
+            camera.scroll_by(dx * self.SCROLL_SPEED, dy * self.SCROLL_SPEED)
+
+        if pyxel.btnp(pyxel.KEY_F):
+            camera.fit()
 
     def _end_game(self, reason: str) -> None:
         """
@@ -175,75 +305,158 @@ class PlayScene:
         Args:
             reason: Reason for game over
         """
-        self.game_over = True
-        self.game_over_reason = reason
+        self.state.end(reason)
 
         # Switch to result scene
         result_scene = self.app.scenes["result"]
-        result_scene.set_result(self.score_tracker, reason)
+        result_scene.set_result(self.state.score_tracker, reason)
         self.app.change_scene("result")
 
     def draw(self) -> None:
-        """Draw play scene."""
+        """Draw play scene (timed for the quality governor)."""
+        start = time.perf_counter()
+        self._draw_scene()
+        self._draw_seconds = time.perf_counter() - start
+        self.governor.end_frame(self._draw_seconds)
+
+    def _draw_scene(self) -> None:
+        """Draw the board and HUD at the governor's quality level."""
         pyxel.cls(0)
 
+        state = self.state
+        camera = self.camera
+
+        # Board contents are clipped to the viewport
+        pyxel.clip(self.PLAY_X, self.PLAY_Y, self.VIEW_WIDTH, self.VIEW_HEIGHT)
+
         # Draw play area background
-        pyxel.rect(self.PLAY_X, self.PLAY_Y,
-                  self.PLAY_WIDTH, self.PLAY_HEIGHT, 1)
+        board_x, board_y = camera.to_screen(0, 0)
+        pyxel.rect(board_x, board_y, camera.scale(self.play_width),
+                  camera.scale(self.play_height), 1)
 
         # Draw danger line
-        danger_y = self.PLAY_Y + self.danger_line_y
-        line_color = 8 if self.above_line_time > 0 else 2
-        pyxel.line(self.PLAY_X, danger_y,
-                  self.PLAY_X + self.PLAY_WIDTH, danger_y, line_color)
+        line_left, danger_y = camera.to_screen(0, state.danger_line_y)
+        line_right = line_left + camera.scale(self.play_width)
+        line_color = 8 if state.above_line_time > 0 else 2
+        pyxel.line(line_left, danger_y, line_right, danger_y, line_color)
 
         # Draw grace timer if in danger
-        if self.above_line_time > 0:
-            grace_ms = game_config.get("game_over", "grace_ms", default=3000)
-            remaining = grace_ms / 1000.0 - self.above_line_time
+        if state.above_line_time > 0:
+            remaining = state.grace_remaining()
             pyxel.text(5, danger_y - 8, f"DANGER: {remaining:.1f}s", 8)
 
         # Draw fruits
         fresh_max = game_config.get("freshness", "fresh_max", default=100)
-        for fruit in self.fruits:
-            # Draw fruit circle
-            screen_x = self.PLAY_X + fruit.x
-            screen_y = self.PLAY_Y + fruit.y
-            pyxel.circ(screen_x, screen_y, fruit.radius, fruit.color)
-            pyxel.circb(screen_x, screen_y, fruit.radius, 7)
-
-            # Draw freshness indicator (no numeric value)
-            HUD.draw_freshness_indicator(screen_x, screen_y,
-                                        fruit.fresh, fresh_max, False)
+        governor = self.governor
+        self._outlines, self._sparkles, self._lod = (governor.outlines, governor.sparkles,
+                                                     governor.lod)
+        if self.remote:
+            self._draw_remote_fruits(fresh_max)
+        else:
+            for fruit in state.fruits:
+                self._draw_fruit(fruit.x, fruit.y, fruit.radius, fruit.color,
+                                 fruit.fresh, fresh_max)
 
         # Draw next fruit (not dropped yet)
-        if self.next_fruit and not self.next_fruit.dropped:
-            screen_x = self.PLAY_X + self.next_fruit.x
+        next_fruit = state.next_fruit
+        if next_fruit and not next_fruit.dropped:
+            screen_x, drop_screen_y = camera.to_screen(next_fruit.x, state.drop_y)
+            radius = camera.scale(next_fruit.radius)
             screen_y = 20
 
-            pyxel.circ(screen_x, screen_y, self.next_fruit.radius, self.next_fruit.color)
-            pyxel.circb(screen_x, screen_y, self.next_fruit.radius, 7)
+            # Landing preview: where the fruit would first touch
+            landing_y = state.landing_y()
+            if landing_y is not None:
+                _, landing_screen_y = camera.to_screen(next_fruit.x, landing_y)
+                for dot_y in range(int(drop_screen_y), int(landing_screen_y), 4):
+                    pyxel.pset(screen_x, dot_y, 13)
+                pyxel.circb(screen_x, landing_screen_y, radius, 13)
+
+            pyxel.clip()
+
+            pyxel.circ(screen_x, screen_y, radius, next_fruit.color)
+            pyxel.circb(screen_x, screen_y, radius, 7)
 
             # Show freshness VALUE before dropping
             HUD.draw_freshness_indicator(screen_x, screen_y,
-                                        self.next_fruit.fresh, fresh_max, True)
+                                        next_fruit.fresh, fresh_max, True)
 
             # Show fruit name
-            name_x = screen_x - len(self.next_fruit.display_name) * 2
-            pyxel.text(name_x, screen_y - 25, self.next_fruit.display_name, 7)
+            name_x = screen_x - font.text_width(next_fruit.display_name) // 2
+            font.text(name_x, screen_y - 25, next_fruit.display_name, 7)
+
+        pyxel.clip()
 
         # Draw UI
-        HUD.draw_score_panel(self.PLAY_WIDTH + 5, 5, self.score_tracker)
+        HUD.draw_score_panel(self.VIEW_WIDTH + 5, 5, state.score_tracker)
 
         # Draw controls hint
-        pyxel.text(5, 5, "ESC:Pause S:Ship F1:Beta", 6)
+        font.text(5, 5, "ESC:Pause S:Ship F1:Beta R:Rewind", 6)
+        if self.rewinding:
+            behind = (self.rewind.last_tick - state.tick) * PlayState.TICK_DT
+            pyxel.text(5, 13, f"REWIND -{behind:.1f}s  Z/X:Scrub R:Resume", 10)
+        elif self.time_scale > 1:
+            # Red when the simulation can't keep up with the target
+            achieved = self.achieved_speed()
+            color = 11 if achieved >= self.time_scale * 0.95 else 8
+            pyxel.text(5, 13, f">> x{self.time_scale} (x{achieved:.1f})  1-4:Speed", color)
+
+        if governor.level:
+            font.text(5, self.PLAY_Y + self.VIEW_HEIGHT + 4, f"QUALITY -{governor.level}", 5)
+
+        # Upcoming spawns after the waiting fruit
+        HUD.draw_spawn_preview(self.VIEW_WIDTH - 90, 2, state.preview(self.PREVIEW_COUNT))
 
         # Draw pause overlay
         if self.paused:
-            pyxel.rect(self.PLAY_X + 50, self.PLAY_Y + 80, 140, 40, 1)
-            pyxel.rectb(self.PLAY_X + 50, self.PLAY_Y + 80, 140, 40, 7)
-            pyxel.text(self.PLAY_X + 90, self.PLAY_Y + 90, "PAUSED", 11)
-            pyxel.text(self.PLAY_X + 60, self.PLAY_Y + 100, "ESC:Resume S:Ship", 7)
+            self.pause_overlay.draw(self.PLAY_X + 50, self.PLAY_Y + 80)
 
         # Draw beta panel (if visible)
         self.beta_panel.draw(pyxel.width, pyxel.height)
+
+    def _draw_fruit(self, x: float, y: float, radius: float, color: int,
+                    fresh: float, fresh_max: float) -> None:
+        """Draw one board fruit (world coordinates) at the current quality level."""
+        camera = self.camera
+        if self._lod and not camera.is_visible(x, y, radius):
+            return
+        screen_x, screen_y = camera.to_screen(x, y)
+        screen_radius = camera.scale(radius)
+        if self._lod and screen_radius < self.LOD_RADIUS:
+            # Coarse: a square of the fruit's color, no outline or sparkles
+            size = max(1, int(screen_radius * 2))
+            pyxel.rect(screen_x - size // 2, screen_y - size // 2, size, size, color)
+            return
+
+        # Draw fruit circle
+        pyxel.circ(screen_x, screen_y, screen_radius, color)
+        if self._outlines:
+            pyxel.circb(screen_x, screen_y, screen_radius, 7)
+
+        # Draw freshness indicator (no numeric value)
+        if self._sparkles:
+            HUD.draw_freshness_indicator(screen_x, screen_y, fresh, fresh_max, False)
+
+    def _draw_remote_fruits(self, fresh_max: float) -> None:
+        """Draw board fruits straight from the worker's shared buffer."""
+        xs, ys, stages, fresh_values = self.state.fruit_arrays()
+        table = stage_table()
+        radii, colors, last = table.radii, table.colors, table.final_stage
+        # tolist() converts each column in one C call; zipping the views would
+        # box a NumPy scalar per element (slower, and NumPy types downstream)
+        for x, y, stage, fresh in zip(xs.tolist(), ys.tolist(), stages.tolist(),
+                                      fresh_values.tolist()):
+            stage = min(stage, last)
+            self._draw_fruit(x, y, radii[stage], colors[stage], fresh, fresh_max)
+
+    def _render_pause_overlay(self, overlay: pyxel.Image) -> None:
+        """
+        Render the pause box.
+
+        Args:
+            overlay: 140x40 image
+        """
+        overlay.rect(0, 0, 140, 40, 1)
+        overlay.rectb(0, 0, 140, 40, 7)
+        overlay.text(40, 10, "PAUSED", 11)
+        overlay.text(10, 20, "ESC:Resume S:Ship", 7)
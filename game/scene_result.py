@@ -1,5 +1,6 @@
 """Result scene showing final score."""
 import pyxel
+from game.frame_cache import FrameCache
 
 
 class ResultScene:
@@ -16,6 +17,9 @@ class ResultScene:
         self.score_tracker = None
         self.game_over_reason = ""
 
+        # Results are fixed once set: render once, then blit
+        self.frame = FrameCache(pyxel.width, pyxel.height, self._render)
+
     def set_result(self, score_tracker, reason: str) -> None:
         """
         Set result data.
@@ -26,6 +30,7 @@ class ResultScene:
         """
         self.score_tracker = score_tracker
         self.game_over_reason = reason
+        self.frame.invalidate()
 
     def update(self) -> None:
         """Update result scene."""
@@ -39,19 +44,26 @@ class ResultScene:
 
     def draw(self) -> None:
         """Draw result scene."""
-        pyxel.cls(0)
+        self.frame.draw(0, 0)
+
+    def _render(self, screen: pyxel.Image) -> None:
+        """
+        Render the result screen.
 
+        Args:
+            screen: Image to draw into
+        """
         if not self.score_tracker:
             return
 
         # Title
-        pyxel.text(pyxel.width // 2 - 20, 20, "GAME OVER", 8)
-        pyxel.text(pyxel.width // 2 - 30, 30, self.game_over_reason, 7)
+        screen.text(screen.width // 2 - 20, 20, "GAME OVER", 8)
+        screen.text(screen.width // 2 - 30, 30, self.game_over_reason, 7)
 
         # Score
         score = self.score_tracker.get_score()
         score_text = f"FINAL SCORE: {score}"
-        pyxel.text(pyxel.width // 2 - len(score_text) * 2, 50, score_text, 11)
+        screen.text(screen.width // 2 - len(score_text) * 2, 50, score_text, 11)
 
         # Details
         y = 70
@@ -66,26 +78,26 @@ class ResultScene:
         for label, value, color in details:
             if label:
                 text = f"{label} {value}"
-                pyxel.text(30, y, text, color)
+                screen.text(30, y, text, color)
             y += 10
 
         # Rot damage
         if self.score_tracker.rotten_count > 0:
             damage = self.score_tracker.get_rot_damage_percent()
-            pyxel.text(30, y, f"Rot Damage: -{damage:.1f}%", 8)
+            screen.text(30, y, f"Rot Damage: -{damage:.1f}%", 8)
             y += 10
 
         # Performance evaluation
         y += 10
         if self.score_tracker.rotten_count == 0:
-            pyxel.text(40, y, "PERFECT! No rotten mikan!", 11)
+            screen.text(40, y, "PERFECT! No rotten mikan!", 11)
         elif self.score_tracker.rotten_count <= 2:
-            pyxel.text(40, y, "Good job! Very fresh!", 10)
+            screen.text(40, y, "Good job! Very fresh!", 10)
         elif damage < 30:
-            pyxel.text(40, y, "Not bad, but watch freshness", 9)
+            screen.text(40, y, "Not bad, but watch freshness", 9)
         else:
-            pyxel.text(40, y, "Too much rot! Merge faster!", 8)
+            screen.text(40, y, "Too much rot! Merge faster!", 8)
 
         # Return instruction
-        pyxel.text(pyxel.width // 2 - 40, pyxel.height - 20,
+        screen.text(screen.width // 2 - 40, screen.height - 20,
                   "Press SPACE to continue", 7)
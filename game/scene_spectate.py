@@ -0,0 +1,97 @@
+"""Spectator scene rendering a board received from a live game."""
+import pyxel
+from game.camera import Camera
+from game.config import game_config
+from game.spectator import SpectatorClient
+from game.stages import stage_table
+from game.ui_beta import HUD
+
+
+class SpectateScene:
+    """Watches a live session published by StatePublisher."""
+
+    # Board viewport on screen (matches PlayScene)
+    VIEW_WIDTH = 240
+    VIEW_HEIGHT = 200
+    PLAY_X = 0
+    PLAY_Y = 40
+
+    # Representative freshness ratio per level (for sparkles)
+    LEVEL_RATIOS = (0.0, 0.3, 0.55, 1.0)
+
+    def __init__(self, app, address: str):
+        """
+        Initialize spectate scene.
+
+        Args:
+            app: Main application instance
+            address: Stream address to connect to
+        """
+        self.app = app
+        self.client = SpectatorClient(address)
+        self.camera = None  # Created once the board size is known
+
+    def reset(self) -> None:
+        """Nothing to reset; the stream drives all state."""
+
+    def update(self) -> None:
+        """Read pending frames from the stream."""
+        self.client.poll()
+
+        if pyxel.btnp(pyxel.KEY_Q):
+            pyxel.quit()
+
+    def draw(self) -> None:
+        """Draw the mirrored board."""
+        pyxel.cls(0)
+        mirror = self.client.mirror
+
+        if not mirror.synced:
+            status = "WAITING FOR STREAM..." if self.client.connected else "DISCONNECTED"
+            pyxel.text(pyxel.width // 2 - len(status) * 2, pyxel.height // 2, status, 7)
+            return
+
+        table = stage_table()
+        camera = self.camera
+        if camera is None or (camera.world_w, camera.world_h) != (mirror.width, mirror.height):
+            camera = self.camera = Camera(self.PLAY_X, self.PLAY_Y, self.VIEW_WIDTH,
+                                          self.VIEW_HEIGHT, mirror.width, mirror.height)
+
+        # Play area and danger line
+        board_x, board_y = camera.to_screen(0, 0)
+        board_w = camera.scale(mirror.width)
+        pyxel.rect(board_x, board_y, board_w, camera.scale(mirror.height), 1)
+        _, danger_y = camera.to_screen(0, mirror.danger_line_y)
+        line_color = 8 if mirror.danger_ms >= 0 else 2
+        pyxel.line(board_x, danger_y, board_x + board_w, danger_y, line_color)
+        if mirror.danger_ms >= 0:
+            pyxel.text(5, danger_y - 8, f"DANGER: {mirror.danger_ms / 1000.0:.1f}s", 8)
+
+        # Fruits
+        for stage, x, y, level in mirror.fruits.values():
+            stage = min(stage, table.final_stage)  # The streamed ladder may be longer
+            screen_x, screen_y = camera.to_screen(x, y)
+            radius = camera.scale(table.radii[stage])
+            pyxel.circ(screen_x, screen_y, radius, table.colors[stage])
+            pyxel.circb(screen_x, screen_y, radius, 7)
+            HUD.draw_freshness_indicator(screen_x, screen_y,
+                                        self.LEVEL_RATIOS[level], 1.0, False)
+
+        # Merge / delivery flashes from the latest frame
+        for x, y, delivered in mirror.recent_merges:
+            screen_x, screen_y = camera.to_screen(x, y)
+            pyxel.circb(screen_x, screen_y, 6, 10 if delivered else 7)
+
+        # Next fruit with its freshness value (as the player sees it)
+        if mirror.next_stage >= 0:
+            next_stage = min(mirror.next_stage, table.final_stage)
+            radius = camera.scale(table.radii[next_stage])
+            screen_x, _ = camera.to_screen(mirror.next_x, 0)
+            pyxel.circ(screen_x, 20, radius, table.colors[next_stage])
+            pyxel.circb(screen_x, 20, radius, 7)
+            fresh_max = game_config.get("freshness", "fresh_max", default=100)
+            HUD.draw_freshness_indicator(screen_x, 20, mirror.next_fresh, fresh_max, True)
+
+        # Status
+        pyxel.text(5, 5, f"SPECTATING  SCORE {mirror.score}", 7)
+        pyxel.text(5, 13, f"Delivered: {mirror.delivered}  Rotten: {mirror.rotten}", 6)
@@ -1,5 +1,6 @@
 """Title scene with game instructions."""
 import pyxel
+from game.frame_cache import FrameCache
 
 
 class TitleScene:
@@ -14,6 +15,9 @@ class TitleScene:
         """
         self.app = app
 
+        # The title never changes: render once, then blit
+        self.frame = FrameCache(pyxel.width, pyxel.height, self._render)
+
     def update(self) -> None:
         """Update title scene."""
         # Start game on space or click
@@ -26,14 +30,21 @@ class TitleScene:
 
     def draw(self) -> None:
         """Draw title scene."""
-        pyxel.cls(0)
+        self.frame.draw(0, 0)
+
+    def _render(self, screen: pyxel.Image) -> None:
+        """
+        Render the title screen.
 
+        Args:
+            screen: Image to draw into
+        """
         # Title
         title = "WAKAYAMA MIKAN"
-        pyxel.text(pyxel.width // 2 - len(title) * 2, 20, title, 10)
+        screen.text(screen.width // 2 - len(title) * 2, 20, title, 10)
 
         subtitle = "Delivery Game (BETA)"
-        pyxel.text(pyxel.width // 2 - len(subtitle) * 2, 30, subtitle, 7)
+        screen.text(screen.width // 2 - len(subtitle) * 2, 30, subtitle, 7)
 
         # Instructions
         y = 50
@@ -67,12 +78,12 @@ class TitleScene:
 
         for line in instructions:
             if line.startswith("-"):
-                pyxel.text(20, y, line, 6)
+                screen.text(20, y, line, 6)
             elif line.endswith(":"):
-                pyxel.text(20, y, line, 11)
+                screen.text(20, y, line, 11)
             elif line:
-                pyxel.text(20, y, line, 7)
+                screen.text(20, y, line, 7)
             y += 7
 
         # Version
-        pyxel.text(5, pyxel.height - 8, "v0.1 Beta", 5)
+        screen.text(5, screen.height - 8, "v0.1 Beta", 5)
@@ -0,0 +1,136 @@
+"""Versus scene: two mirrored boards synchronized in lockstep."""
+import pyxel
+from game.camera import Camera
+from game.config import game_config
+from game.lockstep import LockstepMatch
+from game.ui_beta import HUD
+
+
+class VersusScene:
+    """Local board (left) against the opponent's board (right)."""
+
+    # Board viewports on screen
+    VIEW_WIDTH = 124
+    VIEW_HEIGHT = 160
+    LOCAL_X = 2
+    REMOTE_X = 130
+    PLAY_Y = 50
+
+    def __init__(self, app, match: LockstepMatch):
+        """
+        Initialize versus scene.
+
+        Args:
+            app: Main application instance
+            match: Lockstep match (its link may still be waiting for the opponent)
+        """
+        self.app = app
+        self.match = match
+        self.cameras = None  # Created once the boards exist
+
+    def reset(self) -> None:
+        """Nothing to reset; a match is played once."""
+
+    def update(self) -> None:
+        """Send local input and advance the match."""
+        match = self.match
+
+        if pyxel.btnp(pyxel.KEY_Q):
+            match.close()
+            pyxel.quit()
+
+        if match.started and not match.local.game_over:
+            local = match.local
+            aim_x = self.cameras[0].to_world_x(pyxel.mouse_x)
+            local.aim(aim_x)
+            if pyxel.btnp(pyxel.KEY_S):
+                match.queue_ship()
+            elif pyxel.btnp(pyxel.MOUSE_BUTTON_LEFT) and local.can_drop():
+                match.queue_drop(local.next_fruit.x)
+
+        match.update()
+
+        if match.started and self.cameras is None:
+            board = match.local
+            self.cameras = [Camera(x, self.PLAY_Y, self.VIEW_WIDTH, self.VIEW_HEIGHT,
+                                   board.width, board.height)
+                            for x in (self.LOCAL_X, self.REMOTE_X)]
+
+    def draw(self) -> None:
+        """Draw both boards and the match status."""
+        pyxel.cls(0)
+        match = self.match
+        link = match.link
+
+        if not match.started:
+            if link.error:
+                status = link.error
+            elif link.connected:
+                status = "CONNECTING..."
+            else:
+                status = "WAITING FOR OPPONENT..."
+            pyxel.text(pyxel.width // 2 - len(status) * 2, pyxel.height // 2, status, 7)
+            return
+
+        for index, (board, camera) in enumerate(zip((match.local, match.remote), self.cameras)):
+            self._draw_board(board, camera, show_aim=index == 0)
+            label = "YOU" if index == 0 else "OPPONENT"
+            pyxel.text(camera.view_x, 5, label, 10 if index == 0 else 6)
+            pyxel.text(camera.view_x, 13, f"SCORE {board.score_tracker.get_score()}", 7)
+            pyxel.text(camera.view_x, 21, f"Delivered: {board.score_tracker.delivered_count}", 6)
+            if board.game_over:
+                pyxel.text(camera.view_x, 29, board.game_over_reason, 8)
+
+        # Link status
+        status = f"TICK {match.tick}  {match.bytes_per_tick:.1f}B/t"
+        if match.desync_tick >= 0:
+            status += f"  DESYNC@{match.desync_tick}"
+        elif link.error and not match.finished:
+            status += f"  {link.error}"
+        pyxel.text(2, pyxel.height - 26, status, 8 if match.desync_tick >= 0 else 6)
+        pyxel.text(2, pyxel.height - 18, "Click:Drop S:Ship Q:Quit", 6)
+
+        if match.finished:
+            scores = [board.score_tracker.get_score() for board in (match.local, match.remote)]
+            if scores[0] == scores[1]:
+                result = "DRAW"
+            else:
+                result = "YOU WIN!" if scores[0] > scores[1] else "YOU LOSE"
+            pyxel.text(pyxel.width // 2 - len(result) * 2, pyxel.height - 10, result, 10)
+
+    def _draw_board(self, board, camera: Camera, show_aim: bool) -> None:
+        """
+        Draw one board inside its viewport.
+
+        Args:
+            board: PlayState to draw
+            camera: Viewport for this board
+            show_aim: Draw the waiting fruit at the aim position (local board)
+        """
+        fresh_max = game_config.get("freshness", "fresh_max", default=100)
+        pyxel.clip(camera.view_x, camera.view_y, camera.view_w, camera.view_h)
+
+        board_x, board_y = camera.to_screen(0, 0)
+        board_w = camera.scale(board.width)
+        pyxel.rect(board_x, board_y, board_w, camera.scale(board.height), 1)
+        _, danger_y = camera.to_screen(0, board.danger_line_y)
+        pyxel.line(board_x, danger_y, board_x + board_w, danger_y,
+                   8 if board.above_line_time > 0 else 2)
+
+        for fruit in board.fruits:
+            screen_x, screen_y = camera.to_screen(fruit.x, fruit.y)
+            radius = camera.scale(fruit.radius)
+            pyxel.circ(screen_x, screen_y, radius, fruit.color)
+            pyxel.circb(screen_x, screen_y, radius, 7)
+            HUD.draw_freshness_indicator(screen_x, screen_y, fruit.fresh, fresh_max, False)
+
+        pyxel.clip()
+
+        # Waiting fruit above the board (the opponent's aim is not transmitted)
+        next_fruit = board.next_fruit
+        if next_fruit and not next_fruit.dropped and not board.game_over:
+            x = next_fruit.x if show_aim else board.width / 2
+            screen_x, _ = camera.to_screen(x, 0)
+            radius = camera.scale(next_fruit.radius)
+            pyxel.circ(screen_x, self.PLAY_Y - 10, radius, next_fruit.color)
+            pyxel.circb(screen_x, self.PLAY_Y - 10, radius, 7)
@@ -12,6 +12,7 @@ class ScoreTracker:
         self.rotten_count = 0  # Rotten mikan count
         self.fresh_sum = 0.0  # Sum of all fresh values at delivery
         self.delivered_fresh_values: List[float] = []  # History
+        self.version = 0  # Bumped on every change (lets displays cache formatted values)
 
     def deliver_mikan(self, fresh: float) -> None:
         """
@@ -20,6 +21,7 @@ class ScoreTracker:
         Args:
             fresh: Freshness value at delivery
         """
+        self.version += 1
         self.delivered_count += 1
         self.fresh_sum += fresh
         self.delivered_fresh_values.append(fresh)
@@ -68,6 +70,7 @@ class ScoreTracker:
 
     def reset(self) -> None:
         """Reset all tracking."""
+        self.version += 1
         self.delivered_count = 0
         self.rotten_count = 0
         self.fresh_sum = 0.0
@@ -0,0 +1,497 @@
+"""Asyncio session server hosting many headless games for external bots.
+
+Protocol: one JSON object per line in each direction. Requests carry an
+``op`` and an optional ``id`` that is echoed back:
+
+    {"id": 1, "op": "create", "seed": 42}
+    {"id": 2, "op": "step", "session": 1, "drop_x": 120, "ticks": 30}
+    {"id": 3, "op": "observe", "session": 1}
+    {"id": 4, "op": "drop", "session": 1, "x": 80}
+    {"id": 5, "op": "ship", "session": 1}
+    {"id": 6, "op": "close", "session": 1}
+
+Replies are ``{"id": ..., "ok": true, "session": ..., "obs": {...}}`` or
+``{"id": ..., "ok": false, "error": "..."}``. A connection may pipeline
+requests; replies for one session keep their order, replies for different
+sessions may be interleaved.
+
+Sessions live in worker processes (each session is pinned to one shard), so
+stepping never blocks the event loop. Backpressure: each connection has a
+bounded number of requests in flight and each shard a bounded queue, and
+replies wait for the client to read them before more requests are read.
+Sessions idle for longer than the timeout (or left by a closed connection)
+are reaped.
+
+Usage:
+    python -m game.session_server 127.0.0.1:7800 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set
+
+from game.config import game_config
+from game.play_state import PlayState
+from game.spectator import parse_address
+
+# Most ticks a single step request may advance
+MAX_TICKS_PER_STEP = 600
+
+# Upcoming spawns included in observations
+PREVIEW_COUNT = 3
+
+# Longest accepted request line (bytes)
+MAX_LINE = 64 * 1024
+
+
+class SessionError(Exception):
+    """A request that cannot be served (reported to the client, not raised further)."""
+
+
+def observe(state: PlayState) -> Dict[str, Any]:
+    """
+    Build the JSON observation of a session.
+
+    Args:
+        state: Session board
+
+    Returns:
+        Observation dict (fruits as [stage, x, y, fresh] lists, preview as
+        [stage, fresh] lists of the spawns after "next")
+    """
+    tracker = state.score_tracker
+    next_fruit = state.next_fruit
+    return {
+        "tick": state.tick,
+        "width": state.width,
+        "height": state.height,
+        "score": tracker.get_score(),
+        "delivered": tracker.delivered_count,
+        "rotten": tracker.rotten_count,
+        "game_over": state.game_over,
+        "reason": state.game_over_reason,
+        "can_drop": state.can_drop(),
+        "danger": round(state.above_line_time, 3),
+        "next": [next_fruit.stage, round(next_fruit.fresh, 1)] if next_fruit else None,
+        "preview": [[stage, round(fresh, 1)] for stage, fresh in state.preview(PREVIEW_COUNT)],
+        "fruits": [[f.stage, round(f.x, 1), round(f.y, 1), round(f.fresh, 1)]
+                   for f in state.fruits],
+    }
+
+
+def _apply(sessions: Dict[int, PlayState], op: str, session_id: int,
+           args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Run one operation on a shard's sessions.
+
+    Returns:
+        Observation after the operation (None for close)
+    """
+    if op == "create":
+        width = game_config.get("board", "width", default=240)
+        height = game_config.get("board", "height", default=200)
+        drop_y = game_config.get("board", "drop_y", default=40)
+        sessions[session_id] = PlayState(width, height, drop_y, seed=args.get("seed"))
+        return observe(sessions[session_id])
+
+    state = sessions.get(session_id)
+    if state is None:
+        raise SessionError("unknown session")
+
+    if op == "close":
+        del sessions[session_id]
+        return None
+    if op == "drop":
+        state.drop(args["x"])
+    elif op == "step":
+        drop_x = args.get("drop_x")
+        for _ in range(args["ticks"]):
+            if state.game_over:
+                break
+            state.step(drop_x)
+            drop_x = None
+    elif op == "ship":
+        state.ship()
+    return observe(state)
+
+
+def _shard_main(conn, config_path: str) -> None:
+    """Worker process: owns a set of sessions and serves operations on them."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the server shuts workers down
+    game_config.load(config_path)
+    sessions: Dict[int, PlayState] = {}
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        request_id, op, session_id, args = message
+        try:
+            reply = ("ok", _apply(sessions, op, session_id, args))
+        except (SessionError, KeyError, TypeError, ValueError) as e:
+            reply = ("error", str(e) if isinstance(e, SessionError) else f"bad request: {e!r}")
+        except Exception as e:  # One failing session must not take down the shard's others
+            reply = ("error", f"session failed: {e!r}")
+        conn.send((request_id, reply))
+
+
+class _Shard:
+    """One worker process and the requests waiting for it."""
+
+    def __init__(self, process, conn, max_inflight: int):
+        self.process = process
+        self.conn = conn
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.pending: Dict[int, asyncio.Future] = {}
+        # Pipe writes block when the worker falls behind; one thread per shard
+        # keeps them off the event loop and in order
+        self.sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shard-send")
+
+
+class ShardPool:
+    """Worker processes holding the sessions; each session is pinned to one shard."""
+
+    def __init__(self, workers: int, config_path: str, max_inflight: int = 64):
+        """
+        Start the workers (call from a running event loop).
+
+        Args:
+            workers: Number of worker processes
+            config_path: Game config loaded by every worker
+            max_inflight: Requests queued per shard before callers wait
+        """
+        self.loop = asyncio.get_running_loop()
+        self.shards = []
+        self._next_request = 0
+
+        context = multiprocessing.get_context()
+        for _ in range(workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_shard_main, args=(child_conn, config_path),
+                                      daemon=True)
+            process.start()
+            child_conn.close()
+            shard = _Shard(process, parent_conn, max_inflight)
+            self.loop.add_reader(parent_conn.fileno(), self._on_reply, shard)
+            self.shards.append(shard)
+
+    async def call(self, session_id: int, op: str,
+                   args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Run an operation on the shard owning a session.
+
+        Raises:
+            SessionError: If the operation failed
+        """
+        shard = self.shards[session_id % len(self.shards)]
+        async with shard.slots:
+            if shard.conn is None:
+                raise SessionError("worker unavailable")
+            self._next_request += 1
+            request_id = self._next_request
+            future = self.loop.create_future()
+            shard.pending[request_id] = future
+            try:
+                await self.loop.run_in_executor(shard.sender, shard.conn.send,
+                                                (request_id, op, session_id, args))
+            except (OSError, ValueError):
+                shard.pending.pop(request_id, None)
+                raise SessionError("worker unavailable")
+            status, value = await future
+
+        if status != "ok":
+            raise SessionError(value)
+        return value
+
+    def _on_reply(self, shard: _Shard) -> None:
+        """Resolve futures for every reply the worker sent."""
+        try:
+            while shard.conn.poll():
+                request_id, reply = shard.conn.recv()
+                future = shard.pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (EOFError, OSError):
+            self._lost(shard)
+
+    def _lost(self, shard: _Shard) -> None:
+        """Fail everything waiting on a worker that exited."""
+        self.loop.remove_reader(shard.conn.fileno())
+        shard.conn.close()
+        shard.conn = None
+        for future in shard.pending.values():
+            if not future.done():
+                future.set_result(("error", "worker exited"))
+        shard.pending.clear()
+
+    def close(self) -> None:
+        """Stop the workers."""
+        for shard in self.shards:
+            if shard.conn is not None:
+                self.loop.remove_reader(shard.conn.fileno())
+                try:
+                    shard.conn.send(None)
+                except OSError:
+                    pass
+                shard.conn.close()
+                shard.conn = None
+            shard.sender.shutdown(wait=False)
+        for shard in self.shards:
+            shard.process.join(timeout=2.0)
+            if shard.process.is_alive():
+                shard.process.terminate()
+
+
+class SessionServer:
+    """Line-delimited JSON front end for the shard pool."""
+
+    OPS = ("create", "observe", "drop", "step", "ship", "close", "stats")
+
+    def __init__(self, address: str, workers: Optional[int] = None,
+                 idle_timeout: float = 300.0, max_sessions: int = 2000,
+                 max_pipeline: int = 32):
+        """
+        Initialize server.
+
+        Args:
+            address: Listen address (see game.spectator.parse_address)
+            workers: Worker processes (CPU count if None)
+            idle_timeout: Seconds without requests before a session is reaped
+            max_sessions: Sessions allowed at once
+            max_pipeline: Requests in flight per connection
+        """
+        self.address = address
+        self.workers = workers or os.cpu_count() or 1
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_pipeline = max_pipeline
+
+        self.pool: Optional[ShardPool] = None
+        self.server = None
+        self.last_used: Dict[int, float] = {}  # session id -> last request time
+        self.reaped = 0
+        self._next_session = 0
+        self._reaper = None
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}  # handler -> its writer
+
+    async def start(self) -> None:
+        """Start workers, listening socket and the idle reaper."""
+        self.pool = ShardPool(self.workers, game_config.config_path)
+
+        family, sock_addr = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(sock_addr):
+                os.unlink(sock_addr)
+            self.server = await asyncio.start_unix_server(self._serve_client, sock_addr,
+                                                          limit=MAX_LINE)
+        else:
+            host, port = sock_addr
+            self.server = await asyncio.start_server(self._serve_client, host, port,
+                                                     limit=MAX_LINE)
+        self._reaper = asyncio.ensure_future(self._reap_idle())
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled."""
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """Stop accepting, let the client handlers finish, then stop the workers."""
+        if self._reaper:
+            self._reaper.cancel()
+        if self.server:
+            self.server.close()
+        # A closed transport ends the handler's readline() with EOF, so it
+        # closes its sessions and returns instead of being cancelled mid-read
+        for writer in list(self._clients.values()):
+            writer.close()
+        if self._clients:
+            await asyncio.gather(*self._clients, return_exceptions=True)
+        self.close()
+
+    def close(self) -> None:
+        """Stop accepting, reaping and the workers."""
+        if self._reaper:
+            self._reaper.cancel()
+        if self.server:
+            self.server.close()
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+
+    async def _serve_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Read requests from one connection and answer them (pipelined)."""
+        handler = asyncio.current_task()
+        self._clients[handler] = writer
+        created: Set[int] = set()
+        slots = asyncio.Semaphore(self.max_pipeline)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line: bytes) -> None:
+            try:
+                reply = await self._handle(line, created)
+                data = json.dumps(reply, separators=(",", ":")).encode("utf-8") + b"\n"
+                async with write_lock:
+                    writer.write(data)
+                    await writer.drain()  # a slow reader holds its slot until it catches up
+            except ConnectionError:
+                pass
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    line = await reader.readline()
+                except ValueError:  # line longer than MAX_LINE
+                    slots.release()
+                    break
+                if not line:
+                    slots.release()
+                    break
+                task = asyncio.ensure_future(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            # Sessions die with the connection that created them
+            for session_id in created:
+                await self._close_session(session_id)
+            writer.close()
+            self._clients.pop(handler, None)
+
+    async def _handle(self, line: bytes, created: Set[int]) -> Dict[str, Any]:
+        """Decode, validate and run one request."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise SessionError("request must be an object")
+            request_id = request.get("id")
+            op = request.get("op")
+            if op not in self.OPS:
+                raise SessionError(f"unknown op {op!r}")
+
+            if op == "stats":
+                return {"id": request_id, "ok": True, "sessions": len(self.last_used),
+                        "workers": len(self.pool.shards), "reaped": self.reaped}
+
+            if op == "create":
+                if len(self.last_used) >= self.max_sessions:
+                    raise SessionError("server full")
+                self._next_session += 1
+                session_id = self._next_session
+                seed = request.get("seed")
+                if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+                    raise SessionError("seed must be an integer")
+                self.last_used[session_id] = time.monotonic()
+                created.add(session_id)
+                try:
+                    obs = await self.pool.call(session_id, op, {"seed": seed})
+                except SessionError:
+                    self.last_used.pop(session_id, None)
+                    created.discard(session_id)
+                    raise
+                return {"id": request_id, "ok": True, "session": session_id, "obs": obs}
+
+            session_id = request.get("session")
+            if not isinstance(session_id, int) or isinstance(session_id, bool):
+                raise SessionError("session must be an integer")
+            if session_id not in self.last_used:
+                raise SessionError("unknown session")
+            self.last_used[session_id] = time.monotonic()
+
+            if op == "close":
+                created.discard(session_id)
+                await self._close_session(session_id)
+                return {"id": request_id, "ok": True, "session": session_id}
+
+            args = {}
+            if op == "drop":
+                args["x"] = float(request["x"])
+            elif op == "step":
+                ticks = request.get("ticks", 1)
+                if not isinstance(ticks, int) or isinstance(ticks, bool):
+                    raise SessionError("ticks must be an integer")
+                args["ticks"] = max(1, min(MAX_TICKS_PER_STEP, ticks))
+                drop_x = request.get("drop_x")
+                args["drop_x"] = None if drop_x is None else float(drop_x)
+
+            obs = await self.pool.call(session_id, op, args)
+            return {"id": request_id, "ok": True, "session": session_id, "obs": obs}
+        except SessionError as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+        except (KeyError, TypeError, ValueError) as e:
+            return {"id": request_id, "ok": False, "error": f"bad request: {e!r}"}
+
+    async def _close_session(self, session_id: int) -> bool:
+        """
+        Forget a session and free it in its worker.
+
+        Returns:
+            True if the session was open (False if something closed it first)
+        """
+        if self.last_used.pop(session_id, None) is None:
+            return False
+        if self.pool is not None:
+            try:
+                await self.pool.call(session_id, "close", {})
+            except SessionError:
+                pass
+        return True
+
+    async def _reap_idle(self) -> None:
+        """Periodically close sessions nobody has touched for idle_timeout."""
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            deadline = time.monotonic() - self.idle_timeout
+            idle = [sid for sid, used in self.last_used.items() if used < deadline]
+            for session_id in idle:
+                if await self._close_session(session_id):
+                    self.reaped += 1
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Host headless game sessions for bots")
+    parser.add_argument("address", help="listen address (HOST:PORT, PORT or unix:/path)")
+    parser.add_argument("--config", metavar="PATH", help="game config for every session")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--idle-timeout", type=float, default=300.0,
+                        help="seconds before an idle session is reaped")
+    parser.add_argument("--max-sessions", type=int, default=2000,
+                        help="concurrent sessions allowed")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        game_config.load(args.config)
+
+    server = SessionServer(args.address, args.workers, args.idle_timeout, args.max_sessions)
+    print(f"serving sessions on {args.address} with {server.workers} workers")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""Quasi-static settle solver: jump a board straight to its next rest state.
+
+Full simulation integrates every fruit tick by tick until the board falls
+asleep. For bot and batch runs only the rest state matters, so the solver
+works on positions alone:
+
+1. the dropped fruit is swept straight down to its first contact, which
+   wakes the pile it landed on (like an island waking in PhysicsEngine)
+2. awake fruits take large damped gravity steps and are projected out of
+   walls and fruits; a fruit that stops moving freezes into a fixed support,
+   and fruits whose support moved away wake up
+3. relaxation stops early when two fruits of the same stage touch so the
+   caller can fire the merge and continue from there
+
+Elapsed game time is estimated from how far fruits travelled (using the same
+gravity and friction as the physics step) and returned in ticks; PlayState
+charges it to freshness decay, cooldowns and the jam timer.
+"""
+import math
+from typing import Dict, List, Tuple
+from game.config import game_config
+from game.fruit import Fruit
+from game.physics import PhysicsEngine
+
+
+class SettleSolver:
+    """Position-based relaxation of a board's awake fruits."""
+
+    # Iterations below the tolerance before a fruit counts as at rest
+    QUIET_ITERATIONS = 2
+
+    def __init__(self, physics: PhysicsEngine, step: float = 2.0, damping: float = 0.8,
+                 max_speed: float = 8.0, sweeps: int = 2, tolerance: float = 0.05,
+                 max_iterations: int = 150, slack: float = 8.0):
+        """
+        Initialize solver.
+
+        Args:
+            physics: The board's physics engine (walls, spatial index)
+            step: Gravity displacement per iteration in pixels
+            damping: Share of the previous iteration's movement carried over
+            max_speed: Movement limit per iteration in pixels (keeps fruits
+                from passing through each other)
+            sweeps: Projection passes per iteration
+            tolerance: Movement per iteration (pixels) counted as at rest
+            max_iterations: Iteration limit per relaxation
+            slack: Movement allowed before neighbour lists are rebuilt
+        """
+        self.physics = physics
+        self.step = step
+        self.damping = damping
+        self.max_speed = max_speed
+        self.sweeps = sweeps
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.slack = slack
+
+        self.iterations = 0  # Total relaxation iterations (for benchmarks)
+        self._fall_cache: Dict[Tuple[int, float, float], int] = {}
+
+    def land(self, fruit: Fruit) -> float:
+        """
+        Move a just-dropped fruit straight down to its first contact.
+
+        The spatial index must hold the board without this fruit.
+
+        Args:
+            fruit: Dropped fruit
+
+        Returns:
+            Distance fallen
+        """
+        landing_y, _ = self.physics.cast_circle_down(fruit.x, fruit.radius, fruit.y)
+        distance = max(0.0, landing_y - fruit.y)
+        fruit.y = landing_y
+        fruit.vx = 0.0
+        fruit.vy = 0.0
+        return distance
+
+    def relax(self, fruits: List[Fruit], active: List[Fruit]) -> Tuple[float, bool]:
+        """
+        Let awake fruits slide into a rest position.
+
+        Fruits resting on an awake fruit that moves away join the awake set.
+        Awake fruits are marked not sleeping and every other fruit sleeping,
+        so MergeManager allows resting contacts the usual slop.
+
+        Args:
+            fruits: Board fruits
+            active: Fruits free to move
+
+        Returns:
+            (largest distance an awake fruit moved, True if relaxation
+            stopped because two mergeable fruits of the same stage touch)
+        """
+        active = [f for f in active if f.dropped]
+        if not active:
+            return 0.0, False
+
+        active_set = set(active)
+        for fruit in fruits:
+            fruit.sleeping = fruit not in active_set
+            fruit.island = None
+        for fruit in active:
+            fruit.vx = 0.0
+            fruit.vy = 0.0
+            fruit.start_x = fruit.x
+            fruit.start_y = fruit.y
+
+        width = self.physics.width
+        floor = self.physics.height
+        slop = self.physics.CONTACT_SLOP
+        step = self.step
+        damping = self.damping
+        max_speed = self.max_speed
+        max_speed_sq = max_speed * max_speed
+        sweeps = self.sweeps
+        limit = self.tolerance * self.tolerance
+        drift_limit = self.slack * self.slack
+        quiet = self.QUIET_ITERATIONS
+
+        moving = active  # Fruits still settling (others act as fixed supports)
+        still = {fruit: 0 for fruit in active}  # Consecutive quiet iterations
+        neighbors, touching, anchors = self._neighbors(fruits, moving)
+
+        for _ in range(self.max_iterations):
+            if not moving:
+                # Everything stopped: wake fruits whose support moved away
+                dislodged = self._dislodged(fruits, active, active_set)
+                if not dislodged:
+                    break
+                for fruit in dislodged:
+                    fruit.sleeping = False
+                    fruit.vx = 0.0
+                    fruit.vy = 0.0
+                    fruit.start_x = fruit.x
+                    fruit.start_y = fruit.y
+                    still[fruit] = 0
+                    active_set.add(fruit)
+                    active.append(fruit)
+                moving = dislodged
+                neighbors, touching, anchors = self._neighbors(fruits, moving)
+
+            self.iterations += 1
+            before = []
+            for fruit in moving:
+                x = fruit.x
+                y = fruit.y
+                before.append((x, y))
+                # Carry part of the last move so fruits roll down slopes quickly
+                vx = fruit.vx * damping
+                vy = fruit.vy * damping + step
+                speed_sq = vx * vx + vy * vy
+                if speed_sq > max_speed_sq:
+                    scale = max_speed / math.sqrt(speed_sq)
+                    vx *= scale
+                    vy *= scale
+                fruit.x = x + vx
+                fruit.y = y + vy
+
+            for _ in range(sweeps):
+                for fruit in moving:
+                    x = fruit.x
+                    y = fruit.y
+                    for other, min_dist in neighbors[fruit]:
+                        dx = x - other.x
+                        dy = y - other.y
+                        dist_sq = dx * dx + dy * dy
+                        if dist_sq >= min_dist * min_dist:
+                            continue
+                        dist = math.sqrt(dist_sq)
+                        if dist == 0.0:
+                            dx, dy, dist = 0.0, -1.0, 1.0
+                        push = (min_dist - dist) / dist
+                        if other.sleeping:
+                            x += dx * push
+                            y += dy * push
+                        else:
+                            push *= 0.5
+                            x += dx * push
+                            y += dy * push
+                            other.x -= dx * push
+                            other.y -= dy * push
+
+                    radius = fruit.radius
+                    if x < radius:
+                        x = radius
+                    elif x > width - radius:
+                        x = width - radius
+                    if y > floor - radius:
+                        y = floor - radius
+                    fruit.x = x
+                    fruit.y = y
+
+            # Merges fire as soon as a same-stage pair touches
+            for fruit, other, touch in touching:
+                if other.sleeping:
+                    touch += slop
+                dx = fruit.x - other.x
+                dy = fruit.y - other.y
+                if dx * dx + dy * dy < touch * touch:
+                    return self._travel(active), True
+
+            stopped = False
+            rebuild = False
+            for fruit, (x, y) in zip(moving, before):
+                dx = fruit.x - x
+                dy = fruit.y - y
+                fruit.vx = dx  # Pixels per iteration while relaxing
+                fruit.vy = dy
+                if dx * dx + dy * dy < limit:
+                    still[fruit] += 1
+                    if still[fruit] >= quiet:
+                        fruit.sleeping = True
+                        fruit.vx = 0.0
+                        fruit.vy = 0.0
+                        stopped = True
+                else:
+                    still[fruit] = 0
+                ax, ay = anchors[fruit]
+                dx = fruit.x - ax
+                dy = fruit.y - ay
+                if dx * dx + dy * dy > drift_limit:
+                    rebuild = True
+
+            if stopped:
+                moving = [fruit for fruit in moving if not fruit.sleeping]
+            if rebuild and moving:
+                neighbors, touching, anchors = self._neighbors(fruits, moving)
+
+        for fruit in active:
+            fruit.sleeping = False
+        return self._travel(active), False
+
+    def island(self, fruits: List[Fruit], fruit: Fruit) -> List[Fruit]:
+        """
+        A fruit and every fruit connected to it through contacts.
+
+        Args:
+            fruits: Board fruits
+            fruit: Starting fruit
+
+        Returns:
+            The connected fruits, starting fruit first
+        """
+        slop = self.physics.CONTACT_SLOP
+        found = [fruit]
+        seen = {fruit}
+        for current in found:
+            for other in fruits:
+                if other in seen or not other.dropped:
+                    continue
+                dx = other.x - current.x
+                dy = other.y - current.y
+                touch = other.radius + current.radius + slop
+                if dx * dx + dy * dy < touch * touch:
+                    seen.add(other)
+                    found.append(other)
+        return found
+
+    def resting_on(self, fruits: List[Fruit], removed: List[Fruit]) -> List[Fruit]:
+        """
+        Fruits that rest on fruits about to leave the board.
+
+        Args:
+            fruits: Board fruits
+            removed: Fruits being removed (e.g. merged away)
+
+        Returns:
+            Fruits above and touching a removed fruit
+        """
+        slop = self.physics.CONTACT_SLOP
+        gone = set(removed)
+        found = []
+        for other in fruits:
+            if other in gone:
+                continue
+            for fruit in removed:
+                if other.y >= fruit.y:
+                    continue
+                dx = other.x - fruit.x
+                dy = other.y - fruit.y
+                touch = other.radius + fruit.radius + slop
+                if dx * dx + dy * dy < touch * touch:
+                    found.append(other)
+                    break
+        return found
+
+    def merge_wait(self, fruits: List[Fruit]) -> float:
+        """
+        Seconds until the first touching same-stage pair comes off cooldown.
+
+        Args:
+            fruits: Board fruits (at rest)
+
+        Returns:
+            Remaining cooldown of the earliest blocked merge (0.0 if none)
+        """
+        slop = self.physics.CONTACT_SLOP
+        wait = 0.0
+        for fruit in fruits:
+            cooldown = fruit.merge_cooldown
+            if cooldown <= 0 or (wait and cooldown >= wait):
+                continue
+            for other in fruits:
+                if other is fruit or other.stage != fruit.stage:
+                    continue
+                if max(cooldown, other.merge_cooldown) >= wait > 0:
+                    continue
+                if self.physics.check_collision(fruit, other, slop):
+                    wait = max(cooldown, other.merge_cooldown)
+        return wait
+
+    def sleep(self, fruits: List[Fruit]) -> None:
+        """
+        Put a board at rest to sleep.
+
+        Each fruit sleeps on its own (no island); the physics step wakes
+        neighbours by contact if full simulation takes over again.
+
+        Args:
+            fruits: Board fruits
+        """
+        for fruit in fruits:
+            fruit.sleeping = True
+            fruit.sleep_timer = 0.0
+            fruit.vx = 0.0
+            fruit.vy = 0.0
+            fruit.island = None
+
+    def fall_ticks(self, distance: float, dt: float) -> int:
+        """
+        Ticks the physics step needs to drop a fruit a distance from rest.
+
+        Args:
+            distance: Pixels travelled
+            dt: Tick length in seconds
+
+        Returns:
+            Number of ticks (0 for no movement)
+        """
+        if distance <= 0.0:
+            return 0
+        gravity = game_config.get("physics", "gravity", default=300.0)
+        friction = game_config.get("physics", "friction", default=0.98)
+        key = (int(distance), gravity, friction)
+        ticks = self._fall_cache.get(key)
+        if ticks is None:
+            target = key[0] + 1.0
+            travelled = 0.0
+            speed = 0.0
+            ticks = 0
+            while travelled < target and ticks < 3600:
+                speed = (speed + gravity * dt) * friction
+                travelled += speed * dt
+                ticks += 1
+            self._fall_cache[key] = ticks
+        return ticks
+
+    def _neighbors(self, fruits: List[Fruit], moving: List[Fruit]):
+        """
+        Contact candidates for the moving fruits.
+
+        Returns:
+            ({fruit: [(other, touch distance)]}, [(fruit, other, touch
+            distance)] for same-stage pairs free to merge, {fruit: (x, y)})
+        """
+        # Anything this close can touch before either side drifts past slack
+        pad = 2.0 * self.slack + self.physics.CONTACT_SLOP
+        neighbors = {}
+        touching = []
+        anchors = {}
+        for fruit in moving:
+            x = fruit.x
+            y = fruit.y
+            radius = fruit.radius
+            can_merge = fruit.merge_cooldown <= 0
+            near = []
+            for other in fruits:
+                if other is fruit or not other.dropped:
+                    continue
+                dx = other.x - x
+                dy = other.y - y
+                min_dist = radius + other.radius
+                gap = min_dist + pad
+                if dx * dx + dy * dy < gap * gap:
+                    near.append((other, min_dist))
+                    if (can_merge and other.stage == fruit.stage
+                            and other.merge_cooldown <= 0):
+                        touching.append((fruit, other, min_dist))
+            neighbors[fruit] = near
+            anchors[fruit] = (x, y)
+        return neighbors, touching, anchors
+
+    def _dislodged(self, fruits: List[Fruit], active: List[Fruit], woken) -> List[Fruit]:
+        """Fruits that lost contact with a support that moved away (or down)."""
+        slop = self.physics.CONTACT_SLOP
+        tolerance_sq = self.tolerance * self.tolerance
+        moved = []
+        for fruit in active:
+            dx = fruit.x - fruit.start_x
+            dy = fruit.y - fruit.start_y
+            if dx * dx + dy * dy > tolerance_sq:
+                moved.append(fruit)
+
+        found = []
+        for other in fruits:
+            if other in woken or not other.dropped:
+                continue  # Each fruit is woken at most once per relaxation
+            for fruit in moved:
+                if other.y >= fruit.start_y:
+                    continue
+                touch = other.radius + fruit.radius + slop
+                # Touching this fruit before it moved, but not any more?
+                dx = other.x - fruit.start_x
+                dy = other.y - fruit.start_y
+                if dx * dx + dy * dy >= touch * touch:
+                    continue
+                dx = other.x - fruit.x
+                dy = other.y - fruit.y
+                if dx * dx + dy * dy >= touch * touch:
+                    found.append(other)
+                    break
+        return found
+
+    @staticmethod
+    def _travel(active: List[Fruit]) -> float:
+        """Largest distance an awake fruit moved since relaxation started."""
+        travel = 0.0
+        for fruit in active:
+            dx = fruit.x - fruit.start_x
+            dy = fruit.y - fruit.start_y
+            travel = max(travel, dx * dx + dy * dy)
+        return math.sqrt(travel)
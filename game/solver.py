@@ -0,0 +1,402 @@
+"""Offline best-play search: beam search over drop positions for a seed.
+
+For every spawned fruit, each board on the beam is forked (rewind keyframe)
+and the fruit is dropped at ``positions`` evenly spaced X positions plus
+above every fruit of the same stage. Each candidate is simulated to rest
+(every fruit landed and slower than ``physics.sleep_speed``, no merge
+cooldown left; at most ``rest_ticks``) and ranked by its score
+(``ScoreTracker``) plus board heuristics: touching fruits of the same or
+neighbouring stages (merges on the way), stack height and time above the
+danger line. The best ``beam_width`` boards go on to the next fruit.
+
+Lines only drop onto a board at rest, so the result is the ceiling of
+settled play; the bot drops again while the last fruit is still falling.
+A ``rest_ticks`` of ``drop_ticks`` drops on the cooldown like the bot (the
+boards are then keyed mid-motion and rarely match).
+
+Candidates are keyed by a quantized board hash (per fruit: stage, position,
+freshness, sleep flag, speed and merge cooldown, rounded; the waiting fruit,
+spawn position and drop slot, i.e. the tick divided by ``drop_ticks``). A
+candidate whose key was already reached with at least its score is dropped
+before it is ranked or kept. Boards with the same key differ by less than
+the rounding, so they are treated as the same board; the key is an
+approximation, not an exact equivalence.
+
+Shipping out is allowed at any moment, so a line's result is the best score
+it reached. By default candidates are simulated tick by tick, so the best
+line is a real game: replaying its drops reproduces its score exactly. With
+``settle`` the quasi-static solver is used (faster); its scores are only
+estimates, so the best ``beam_width`` lines are replayed with full physics
+and the best replayed score is the result.
+
+The best line found is a reachable score, not a proof of optimality; it is a
+reference for bot and human results on the same seed.
+
+Usage:
+    python -m game.solver --seeds 0-7 --workers 4
+"""
+import argparse
+import math
+import multiprocessing
+import heapq
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from game.config import game_config
+from game.headless import play_game
+from game.play_state import PlayState
+from game.rewind import encode_keyframe, restore_keyframe
+
+
+class _Node:
+    """A board on the beam."""
+
+    __slots__ = ("value", "score", "best_score", "best_tick", "keyframe", "line", "over")
+
+    def __init__(self, value: float, score: int, best_score: int, best_tick: int,
+                 keyframe: tuple, line: Optional[tuple], over: bool):
+        self.value = value
+        self.score = score
+        self.best_score = best_score
+        self.best_tick = best_tick
+        self.keyframe = keyframe
+        self.line = line  # (tick, x, parent line) of the last drop
+        self.over = over
+
+
+class BeamSolver:
+    """Beam search for the highest score reachable on one seed."""
+
+    # Heuristic weights (score points)
+    SAME_STAGE_WEIGHT = 12.0  # Per touching pair of the same stage
+    NEXT_STAGE_WEIGHT = 4.0  # Per touching pair one stage apart
+    HEIGHT_WEIGHT = 150.0  # Per board height filled (0..1)
+    DANGER_WEIGHT = 400.0  # Per second above the danger line
+
+    # Pairs count as touching up to this gap (pixels)
+    TOUCH_GAP = 2.0
+
+    def __init__(self, beam_width: int = 8, positions: int = 12, drop_ticks: int = 15,
+                 max_ticks: int = 5400, settle: bool = False, quantum: float = 4.0,
+                 fresh_quantum: float = 5.0, rest_ticks: int = 300):
+        """
+        Initialize solver.
+
+        Args:
+            beam_width: Boards kept after each drop
+            positions: Evenly spaced drop positions tried per board
+            drop_ticks: Minimum ticks between drops
+            max_ticks: Ship out at this tick at the latest
+            settle: Use the quasi-static settle solver for candidates (faster,
+                approximate; the best lines are replayed with full physics)
+            quantum: Position rounding of the board hash (pixels; also
+                pixels per tick for the speed of moving fruits)
+            fresh_quantum: Freshness rounding of the board hash
+            rest_ticks: Stop waiting for a candidate to come to rest after
+                this many ticks (it is then keyed with its motion)
+        """
+        self.beam_width = beam_width
+        self.positions = positions
+        self.drop_ticks = drop_ticks
+        self.max_ticks = max_ticks
+        self.settle = settle
+        self.quantum = quantum
+        self.fresh_quantum = fresh_quantum
+        self.rest_ticks = rest_ticks
+        self.evaluated = 0
+        self.transpositions = 0
+
+    def solve(self, seed: int) -> Dict[str, Any]:
+        """
+        Search one seed.
+
+        Args:
+            seed: Spawn sequence seed
+
+        Returns:
+            Result dict: seed, score (best reached), ship_tick, replayed
+            (score of the line with full physics), estimate (best settle
+            score, settle only), drops (list of (tick, x)), evaluated,
+            transpositions, seconds
+        """
+        start = time.perf_counter()
+        self.evaluated = 0
+        self.transpositions = 0
+        width = game_config.get("board", "width", default=240)
+        height = game_config.get("board", "height", default=200)
+        drop_y = game_config.get("board", "drop_y", default=40)
+
+        state = PlayState(width, height, drop_y, seed=seed)
+        beam = [_Node(0.0, 0, 0, 0, encode_keyframe(state), None, False)]
+        best = beam[0]
+        top: List[tuple] = []  # Settle: (best_score, order, node) of the best lines
+        table: Dict[tuple, int] = {}  # Board hash -> best score reached there
+
+        while beam:
+            candidates = []
+            for node in beam:
+                restore_keyframe(state, *node.keyframe)
+                for x in self._drop_positions(state):
+                    child = self._expand(state, node, x, table)
+                    if child is None:
+                        continue
+                    if child.best_score > best.best_score:
+                        best = child
+                    if self.settle:
+                        entry = (child.best_score, self.evaluated, child)
+                        if len(top) < self.beam_width:
+                            heapq.heappush(top, entry)
+                        elif entry > top[0]:
+                            heapq.heapreplace(top, entry)
+                    if not child.over:
+                        candidates.append(child)
+            candidates.sort(key=lambda c: c.value, reverse=True)
+            beam = candidates[:self.beam_width]
+
+        result = {"seed": seed, "evaluated": self.evaluated,
+                  "transpositions": self.transpositions}
+        if self.settle:
+            # Settle scores are estimates: rank the best lines by what they replay to
+            result["estimate"] = best.best_score
+            replayed = []
+            for _, _, node in top:
+                drops = _line_drops(node.line)
+                replayed.append((replay_line(seed, drops, node.best_tick), node.best_tick, drops))
+            score, ship_tick, drops = max(replayed, key=lambda r: r[0],
+                                          default=(0, 0, []))
+            result.update(score=score, ship_tick=ship_tick, replayed=score, drops=drops)
+        else:
+            drops = _line_drops(best.line)
+            result.update(score=best.best_score, ship_tick=best.best_tick,
+                          replayed=replay_line(seed, drops, best.best_tick), drops=drops)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def _drop_positions(self, state: PlayState) -> List[float]:
+        """Evenly spaced positions plus the tops of same-stage fruits."""
+        radius = state.next_fruit.radius
+        low = radius
+        high = state.width - radius
+        count = max(2, self.positions)
+        xs = [low + (high - low) * i / (count - 1) for i in range(count)]
+        stage = state.next_fruit.stage
+        xs.extend(f.x for f in state.fruits if f.stage == stage and low <= f.x <= high)
+
+        # Positions that round together land the same way
+        unique = {}
+        for x in xs:
+            unique.setdefault(round(x / self.quantum), x)
+        return list(unique.values())
+
+    def _expand(self, state: PlayState, node: _Node, x: float,
+                table: Dict[tuple, int]) -> Optional[_Node]:
+        """
+        Drop at x from the node's board and run until it is at rest (or rest_ticks).
+
+        Returns:
+            Child node, or None if an equivalent board already scored as well
+        """
+        restore_keyframe(state, *node.keyframe)
+        self.evaluated += 1
+        best_score, best_tick = node.best_score, node.best_tick
+
+        # The first drop waits for the cooldown
+        while not state.can_drop() and not state.game_over:
+            state.step(None)
+        drop_tick = state.tick
+        if drop_tick >= self.max_ticks or state.game_over:
+            return None
+
+        if self.settle:
+            state.settle(x)
+        else:
+            state.step(x)
+        ready = drop_tick + self.drop_ticks
+        give_up = drop_tick + self.rest_ticks
+        while not state.game_over and state.tick < self.max_ticks:
+            score = state.score_tracker.get_score()
+            if score > best_score:
+                best_score, best_tick = score, state.tick
+            if (state.tick >= ready and state.can_drop()
+                    and (state.tick >= give_up or self._at_rest(state))):
+                break
+            state.step(None)
+
+        score = state.score_tracker.get_score()
+        if score > best_score and not state.game_over:
+            best_score, best_tick = score, state.tick
+        over = state.game_over or state.tick >= self.max_ticks
+
+        key = self._board_key(state)
+        if table.get(key, -1) >= score:
+            self.transpositions += 1
+            return None
+        table[key] = score
+
+        value = score + self._heuristic(state)
+        return _Node(value, score, best_score, best_tick, encode_keyframe(state),
+                     (drop_tick, x, node.line), over)
+
+    @staticmethod
+    def _at_rest(state: PlayState) -> bool:
+        """
+        True once every fruit has landed, sleeps or moved less than
+        ``physics.sleep_speed`` last tick, and no merge cooldown is left.
+        """
+        return all(f.landed and (f.sleeping or f.sleep_timer > 0) and f.merge_cooldown <= 0
+                   for f in state.fruits)
+
+    def _board_key(self, state: PlayState) -> tuple:
+        """Quantized board hash key (with the motion of fruits still moving)."""
+        q = self.quantum
+        fq = self.fresh_quantum
+        dt = state.TICK_DT
+        fruits = sorted((f.stage, round(f.x / q), round(f.y / q), round(f.fresh / fq),
+                         f.sleeping, round(f.vx * dt / q), round(f.vy * dt / q),
+                         round(max(0.0, f.merge_cooldown) / dt))
+                        for f in state.fruits)
+        waiting = state.next_fruit
+        # Candidates come to rest a few ticks sooner or later; boards in the
+        # same drop slot count as the same point in the game
+        return (state.tick // self.drop_ticks, state.spawn_queue.taken,
+                waiting.stage, round(waiting.fresh / fq),
+                round(state.above_line_time, 1), tuple(fruits))
+
+    def _heuristic(self, state: PlayState) -> float:
+        """Board quality beyond the score so far."""
+        fruits = state.fruits
+        pairs = 0.0
+        for i, a in enumerate(fruits):
+            for b in fruits[i + 1:]:
+                gap = math.hypot(a.x - b.x, a.y - b.y) - a.radius - b.radius
+                if gap > self.TOUCH_GAP:
+                    continue
+                if a.stage == b.stage:
+                    pairs += self.SAME_STAGE_WEIGHT
+                elif abs(a.stage - b.stage) == 1:
+                    pairs += self.NEXT_STAGE_WEIGHT
+
+        top = min((f.y - f.radius for f in fruits), default=state.height)
+        filled = max(0.0, (state.height - top) / state.height)
+        return pairs - self.HEIGHT_WEIGHT * filled - self.DANGER_WEIGHT * state.above_line_time
+
+
+def _line_drops(line: Optional[tuple]) -> List[Tuple[int, float]]:
+    """Unwind a node's (tick, x, parent) line into drops in order."""
+    drops = []
+    while line is not None:
+        tick, x, line = line
+        drops.append((tick, x))
+    drops.reverse()
+    return drops
+
+
+def replay_line(seed: int, drops: List[Tuple[int, float]], ship_tick: int) -> int:
+    """
+    Play a line of drops with full physics and ship at a tick.
+
+    Args:
+        seed: Spawn sequence seed
+        drops: (tick, x) drops in order (a drop the cooldown blocks is held
+            until it can happen)
+        ship_tick: Tick to ship out at
+
+    Returns:
+        Score at the ship tick (or when the board jammed)
+    """
+    width = game_config.get("board", "width", default=240)
+    height = game_config.get("board", "height", default=200)
+    drop_y = game_config.get("board", "drop_y", default=40)
+    state = PlayState(width, height, drop_y, seed=seed)
+    pending = deque(drops)
+    while not state.game_over and state.tick < ship_tick:
+        drop_x = pending[0][1] if pending and state.tick >= pending[0][0] else None
+        state.step(drop_x)
+        if drop_x is not None and state.last_dropped is not None:
+            pending.popleft()
+    return state.score_tracker.get_score()
+
+
+def search(seeds: List[int], workers: Optional[int] = None,
+           **solver_kwargs) -> List[Dict[str, Any]]:
+    """
+    Search seeds in parallel (one seed per task) and play the bot on each.
+
+    Args:
+        seeds: Seeds to search
+        workers: Worker processes (CPU count if None); 1 searches in-process
+        **solver_kwargs: BeamSolver options
+
+    Returns:
+        Result dicts (see BeamSolver.solve, plus "bot") in seed order
+    """
+    jobs = [(seed, solver_kwargs, game_config.config) for seed in seeds]
+    if workers == 1:
+        return [_solve_seed(*job) for job in jobs]
+    context = multiprocessing.get_context()
+    with context.Pool(workers) as pool:
+        results = pool.starmap(_solve_seed, jobs, chunksize=1)
+    return sorted(results, key=lambda r: r["seed"])
+
+
+def _solve_seed(seed: int, solver_kwargs: Dict[str, Any],
+                config: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker process: search one seed and play the bot on it for comparison."""
+    game_config.replace(config)
+    result = BeamSolver(**solver_kwargs).solve(seed)
+    max_ticks = solver_kwargs.get("max_ticks", 5400)
+    result["bot"] = play_game(seed, max_ticks)["score"]
+    return result
+
+
+def parse_seeds(text: str) -> List[int]:
+    """Parse "3", "0-7" or "1,5,9" into a list of seeds."""
+    seeds = []
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        seeds.extend(range(int(first), int(last or first) + 1))
+    return seeds
+
+
+def main(argv=None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Beam-search the best reachable score per seed")
+    parser.add_argument("--config", metavar="PATH", help="config to search (default: current)")
+    parser.add_argument("--seeds", type=parse_seeds, default=[0], metavar="SEEDS",
+                        help='seeds: "3", "0-7" or "1,5,9" (default 0)')
+    parser.add_argument("--beam", type=int, default=8, help="boards kept per drop (default 8)")
+    parser.add_argument("--positions", type=int, default=12,
+                        help="drop positions per board (default 12)")
+    parser.add_argument("--drop-ticks", type=int, default=15, help="minimum ticks between drops")
+    parser.add_argument("--rest-ticks", type=int, default=300,
+                        help="stop waiting for a candidate to come to rest after this many ticks")
+    parser.add_argument("--max-ticks", type=int, default=5400,
+                        help="ship out at this tick at the latest")
+    parser.add_argument("--settle", action="store_true",
+                        help="simulate candidates with the settle solver (faster, approximate)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        game_config.load(args.config)
+
+    results = search(args.seeds, args.workers, beam_width=args.beam, positions=args.positions,
+                     drop_ticks=args.drop_ticks, max_ticks=args.max_ticks, settle=args.settle,
+                     rest_ticks=args.rest_ticks)
+
+    print(f"{'seed':>6} {'best':>7} {'replayed':>9} {'ship':>6} {'bot':>7} {'best/bot':>9} "
+          f"{'boards':>8} {'pruned':>7} {'time':>7}")
+    for r in results:
+        ratio = r["score"] / r["bot"] if r["bot"] else float("inf")
+        print(f"{r['seed']:>6} {r['score']:>7} {r['replayed']:>9} {r['ship_tick']:>6} "
+              f"{r['bot']:>7} {ratio:>9.2f} {r['evaluated']:>8} {r['transpositions']:>7} "
+              f"{r['seconds']:>6.1f}s")
+    if len(results) > 1:
+        mean_best = sum(r["score"] for r in results) / len(results)
+        mean_bot = sum(r["bot"] for r in results) / len(results)
+        print(f"{'mean':>6} {mean_best:>7.0f} {'':>9} {'':>6} {mean_bot:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Uniform grid spatial index for circular fruits."""
+import heapq
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+from game.fruit import Fruit
+
+
+class SpatialGrid:
+    """
+    Buckets fruits by center into square cells.
+
+    With a cell size of at least the largest fruit diameter, every fruit that
+    can touch a given fruit lies in the 3x3 block of cells around it.
+    """
+
+    def __init__(self, cell_size: float):
+        """
+        Initialize grid.
+
+        Args:
+            cell_size: Cell edge length (should be >= largest fruit diameter)
+        """
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.items: List[Fruit] = []
+        self.max_radius = 0.0
+
+    def build(self, fruits: List[Fruit]) -> None:
+        """
+        Rebuild the index from dropped fruits.
+
+        Args:
+            fruits: Fruits to index (undropped ones are skipped)
+        """
+        cells = {}
+        items = []
+        max_radius = 0.0
+        inv = 1.0 / self.cell_size
+
+        for fruit in fruits:
+            if not fruit.dropped:
+                continue
+            key = (int(math.floor(fruit.x * inv)), int(math.floor(fruit.y * inv)))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [len(items)]
+            else:
+                bucket.append(len(items))
+            items.append(fruit)
+            if fruit.radius > max_radius:
+                max_radius = fruit.radius
+
+        self.cells = cells
+        self.items = items
+        self.max_radius = max_radius
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        """Cell coordinates containing a point."""
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float) -> Iterator[Fruit]:
+        """
+        Yield fruits whose centers lie in cells overlapping a rectangle.
+
+        Args:
+            x0, y0: Top-left corner
+            x1, y1: Bottom-right corner
+        """
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        cells = self.cells
+        items = self.items
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for index in bucket:
+                        yield items[index]
+
+    def candidate_pairs(self) -> List[Tuple[Fruit, Fruit]]:
+        """
+        Pairs of fruits in the same or adjacent cells.
+
+        Returns:
+            (fruit_a, fruit_b) pairs in the same order a nested i < j loop
+            over the indexed list would visit them
+        """
+        cells = self.cells
+        items = self.items
+        count = len(items)
+        pairs = []  # i * count + j: sorts like (i, j) without a tuple per pair
+        neighbors = []
+
+        for (cx, cy), bucket in cells.items():
+            del neighbors[:]
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    other = cells.get((cx + dx, cy + dy))
+                    if other:
+                        neighbors.extend(other)
+            for i in bucket:
+                base = i * count
+                for j in neighbors:
+                    if i < j:
+                        pairs.append(base + j)
+
+        pairs.sort()
+        return [(items[key // count], items[key % count]) for key in pairs]
+
+    def cast_circle_down(self, x: float, radius: float, start_y: float,
+                         floor_y: float) -> Tuple[float, Optional[Fruit]]:
+        """
+        Sweep a circle straight down and find where it first touches.
+
+        Args:
+            x: Circle center X
+            radius: Circle radius
+            start_y: Center Y where the sweep starts
+            floor_y: Floor Y (the circle rests at floor_y - radius)
+
+        Returns:
+            (center_y, fruit) at first contact; fruit is None for the floor
+        """
+        best_y = floor_y - radius
+        best_fruit = None
+        reach = radius + self.max_radius
+
+        for fruit in self.query_rect(x - reach, start_y - reach, x + reach, best_y + reach):
+            touch = radius + fruit.radius
+            dx = fruit.x - x
+            if dx >= touch or dx <= -touch:
+                continue
+            half_chord = math.sqrt(touch * touch - dx * dx)
+            contact_y = fruit.y - half_chord
+            if contact_y < start_y:
+                # Already overlapping at the start of the sweep
+                if start_y < fruit.y + half_chord:
+                    contact_y = start_y
+                else:
+                    continue
+            if contact_y < best_y:
+                best_y = contact_y
+                best_fruit = fruit
+
+        return best_y, best_fruit
+
+    def overlap_point(self, x: float, y: float) -> List[Fruit]:
+        """
+        Fruits containing a point.
+
+        Args:
+            x, y: Point position
+        """
+        reach = self.max_radius
+        hits = []
+        for fruit in self.query_rect(x - reach, y - reach, x + reach, y + reach):
+            dx = fruit.x - x
+            dy = fruit.y - y
+            if dx * dx + dy * dy <= fruit.radius * fruit.radius:
+                hits.append(fruit)
+        return hits
+
+    def k_nearest(self, x: float, y: float, k: int) -> List[Fruit]:
+        """
+        The k fruits whose centers are nearest to a point.
+
+        Searches rings of cells outward and stops once the ring is farther
+        than the k-th best candidate.
+
+        Args:
+            x, y: Point position
+            k: Number of fruits to return
+        """
+        if k <= 0 or not self.items:
+            return []
+
+        cx, cy = self._cell(x, y)
+        cells = self.cells
+        items = self.items
+        heap: List[Tuple[float, int]] = []  # max-heap of (-dist_sq, index)
+        ring = 0
+        visited = 0
+
+        while visited < len(cells):
+            for gy in range(cy - ring, cy + ring + 1):
+                for gx in range(cx - ring, cx + ring + 1):
+                    if ring and cx - ring < gx < cx + ring and cy - ring < gy < cy + ring:
+                        continue  # inner cells were visited in earlier rings
+                    bucket = cells.get((gx, gy))
+                    if not bucket:
+                        continue
+                    visited += 1
+                    for index in bucket:
+                        fruit = items[index]
+                        dx = fruit.x - x
+                        dy = fruit.y - y
+                        entry = (-(dx * dx + dy * dy), index)
+                        if len(heap) < k:
+                            heapq.heappush(heap, entry)
+                        elif entry > heap[0]:
+                            heapq.heapreplace(heap, entry)
+
+            # Anything in the next ring is at least ring * cell_size away
+            if len(heap) == k:
+                limit = ring * self.cell_size
+                if -heap[0][0] <= limit * limit:
+                    break
+            ring += 1
+
+        return [items[index] for _, index in sorted(heap, reverse=True)]
@@ -0,0 +1,180 @@
+"""Pre-generated spawn sequence (stages and freshness) drawn in NumPy blocks."""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from game.config import game_config
+from game.stages import stage_table
+
+# Shared by every queue; refills are short NumPy calls, one worker is enough
+_refill_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Get the background refill executor (created on first use)."""
+    global _refill_executor
+    if _refill_executor is None:
+        _refill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spawn-refill")
+    return _refill_executor
+
+
+class SpawnQueue:
+    """
+    Upcoming spawns as (stage, fresh) pairs, generated ahead in blocks.
+
+    The same seed always gives the same sequence for a given config: blocks
+    are drawn one after another from a single NumPy Generator, whether they
+    are generated in the background or on demand. If the spawn settings
+    change mid-game, queued spawns are discarded and the sequence continues
+    with the new settings.
+    """
+
+    def __init__(self, seed: Optional[int] = None, block_size: int = 256,
+                 background: bool = True):
+        """
+        Initialize queue.
+
+        Args:
+            seed: Generator seed (fresh entropy if None)
+            block_size: Spawns generated per block
+            background: Refill on a background thread before the queue runs dry
+        """
+        self.block_size = block_size
+        self.background = background
+        self.low_water = block_size // 4
+        self._queue = deque()
+        self._future = None
+        self._rng = None
+        self._revision = -1
+        self._params = None
+        self.taken = 0  # Spawns popped since the last reset
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Restart the sequence.
+
+        Args:
+            seed: Generator seed (fresh entropy if None)
+        """
+        self._discard()
+        self._rng = np.random.default_rng(seed)
+        self.taken = 0
+
+    def pop(self) -> Tuple[int, float]:
+        """Take the next spawn."""
+        self._ensure(1)
+        self.taken += 1
+        return self._queue.popleft()
+
+    def peek(self, count: int) -> List[Tuple[int, float]]:
+        """
+        Look at upcoming spawns without taking them.
+
+        Args:
+            count: Number of spawns to return
+
+        Returns:
+            List of (stage, fresh) pairs, next spawn first
+        """
+        self._ensure(count)
+        return list(islice(self._queue, count))
+
+    def get_state(self) -> tuple:
+        """
+        Capture the sequence position (see set_state).
+
+        Returns:
+            (generator state, queued stages, queued freshness, spawn params, taken)
+        """
+        if self._future is not None:
+            self._queue.extend(self._future.result())
+            self._future = None
+        stages = np.fromiter((stage for stage, _ in self._queue), dtype=np.int8,
+                             count=len(self._queue))
+        fresh = np.fromiter((fresh for _, fresh in self._queue), dtype=np.float64,
+                            count=len(self._queue))
+        return self._rng.bit_generator.state, stages, fresh, self._params, self.taken
+
+    def set_state(self, state: tuple) -> None:
+        """
+        Return to a position captured by get_state.
+
+        If the spawn settings changed since, the queued spawns are discarded
+        on the next pop and the sequence continues with the new settings.
+        """
+        rng_state, stages, fresh, params, taken = state
+        self._discard()
+        self._rng.bit_generator.state = rng_state
+        self._queue.extend(zip(stages.tolist(), fresh.tolist()))
+        self._params = params
+        self._revision = -1
+        self.taken = taken
+
+    def _discard(self) -> None:
+        """Drop queued spawns (waiting for an in-flight refill so the generator stays in order)."""
+        if self._future is not None:
+            self._future.result()
+            self._future = None
+        self._queue.clear()
+
+    def _current_params(self) -> tuple:
+        """Spawn settings from the config (looked up only when the config changed)."""
+        if self._revision != game_config.revision:
+            self._revision = game_config.revision
+            table = stage_table()
+            params = (
+                table.spawn_stage_min,
+                table.spawn_stage_max,
+                game_config.get("freshness", "spawn_min", default=50),
+                game_config.get("freshness", "spawn_max", default=100),
+                game_config.get("freshness", "spawn_distribution", default="triangular"),
+            )
+            if params != self._params:
+                self._discard()
+                self._params = params
+        return self._params
+
+    def _ensure(self, count: int) -> None:
+        """Make sure at least ``count`` spawns are queued, refilling ahead if enabled."""
+        params = self._current_params()
+        queue = self._queue
+
+        if self._future is not None and (self._future.done() or len(queue) < count):
+            queue.extend(self._future.result())
+            self._future = None
+        while len(queue) < count:
+            queue.extend(self._generate(self._rng, self.block_size, params))
+
+        if self.background and self._future is None and len(queue) - count < self.low_water:
+            self._future = _executor().submit(self._generate, self._rng, self.block_size, params)
+
+    @staticmethod
+    def _generate(rng: np.random.Generator, size: int,
+                  params: tuple) -> List[Tuple[int, float]]:
+        """
+        Draw a block of spawns.
+
+        Args:
+            rng: Generator (used by one block at a time)
+            size: Number of spawns
+            params: Settings from _current_params
+
+        Returns:
+            List of (stage, fresh) pairs
+        """
+        stage_min, stage_max, spawn_min, spawn_max, distribution = params
+        stages = rng.integers(stage_min, stage_max + 1, size)
+
+        if spawn_max <= spawn_min:
+            fresh = np.full(size, float(spawn_min))
+        elif distribution == "uniform":
+            fresh = rng.uniform(spawn_min, spawn_max, size)
+        else:
+            # Triangular with mode at max (bias toward high freshness)
+            fresh = rng.triangular(spawn_min, spawn_max, spawn_max, size)
+
+        return list(zip(stages.tolist(), fresh.tolist()))
@@ -0,0 +1,561 @@
+"""Delta-compressed play state stream for local spectators.
+
+The publisher encodes each tick once and broadcasts the same bytes to every
+connected spectator. Messages are length-prefixed binary frames:
+
+- KEYFRAME: board size, status, next fruit and every fruit on the board
+- DELTA: only what changed since the previous tick (spawns, moves beyond the
+  quantization threshold, freshness level changes, removals, merges and
+  status changes). Ticks with no changes send nothing at all.
+
+Addresses are either ``HOST:PORT`` / ``PORT`` (TCP on loopback) or
+``unix:/path/to/socket``.
+"""
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+# Message types
+MSG_KEYFRAME = 1
+MSG_DELTA = 2
+
+# Delta flags
+FLAG_STATUS = 0x01
+FLAG_NEXT = 0x02
+
+# Merge target id for mikan that were delivered instead of added to the board
+DELIVERED_ID = 0xFFFF
+
+# Freshness levels (see Fruit.get_freshness_level)
+LEVELS = {"rotten": 0, "low": 1, "medium": 2, "high": 3}
+
+FRAME_HEADER = struct.Struct("<IBI")   # body length, message type, tick
+BOARD = struct.Struct("<HHH")          # width, height, danger line y
+STATUS = struct.Struct("<iHHh")        # score, delivered, rotten, danger ms (-1 = safe)
+NEXT = struct.Struct("<bhB")           # stage (-1 = none), x, fresh
+COUNT = struct.Struct("<H")
+DELTA_COUNTS = struct.Struct("<BHHHHH")  # flags, spawn, move, level, remove, merge
+FRUIT = struct.Struct("<HBhhB")        # id, stage, x, y, level
+MOVE = struct.Struct("<Hhh")           # id, x, y
+LEVEL = struct.Struct("<HB")           # id, level
+REMOVE = struct.Struct("<H")           # id
+MERGE = struct.Struct("<HHH")          # id_a, id_b, id_new (DELIVERED_ID if delivered)
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """
+    Parse a spectator stream address.
+
+    Args:
+        address: "HOST:PORT", "PORT" or "unix:/path"
+
+    Returns:
+        (socket family, socket address) tuple
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class _TrackedFruit:
+    """Last state of a fruit as sent to spectators."""
+
+    __slots__ = ("fid", "stage", "x", "y", "level")
+
+    def __init__(self, fid: int, stage: int, x: int, y: int, level: int):
+        self.fid = fid
+        self.stage = stage
+        self.x = x
+        self.y = y
+        self.level = level
+
+
+class StateDeltaEncoder:
+    """Encodes a PlayState into keyframes and per-tick deltas."""
+
+    def __init__(self, move_threshold: int = 1):
+        """
+        Initialize encoder.
+
+        Args:
+            move_threshold: Minimum movement (pixels) before a move is sent
+        """
+        self.move_threshold = move_threshold
+        self.tracked: Dict[object, _TrackedFruit] = {}
+        self.status = None
+        self.next_info = None
+        self.board = None
+        self.tick = 0
+        self._next_id = 0
+        self._used_ids = set()
+
+    def reset(self) -> None:
+        """Forget all tracked state (the next encode should be a keyframe)."""
+        self.tracked.clear()
+        self._used_ids.clear()
+        self.status = None
+        self.next_info = None
+        self.board = None
+
+    def _allocate_id(self) -> int:
+        """Allocate a 16-bit fruit id not currently in use."""
+        while True:
+            fid = self._next_id
+            self._next_id = (self._next_id + 1) % DELIVERED_ID
+            if fid not in self._used_ids:
+                self._used_ids.add(fid)
+                return fid
+
+    def _release(self, fruit) -> int:
+        """Stop tracking a fruit and return its id."""
+        tracked = self.tracked.pop(fruit)
+        self._used_ids.discard(tracked.fid)
+        return tracked.fid
+
+    @staticmethod
+    def _status_of(state) -> tuple:
+        """Quantized status tuple for a play state."""
+        tracker = state.score_tracker
+        danger_ms = -1
+        if state.above_line_time > 0:
+            danger_ms = max(0, min(32767, int(state.grace_remaining() * 1000)))
+        return (tracker.get_score(), min(tracker.delivered_count, 0xFFFF),
+                min(tracker.rotten_count, 0xFFFF), danger_ms)
+
+    @staticmethod
+    def _next_of(state) -> tuple:
+        """Quantized next fruit tuple for a play state."""
+        fruit = state.next_fruit
+        if fruit is None:
+            return (-1, 0, 0)
+        return (fruit.stage, int(fruit.x), max(0, min(255, int(fruit.fresh))))
+
+    def encode_delta(self, state) -> Optional[bytes]:
+        """
+        Encode changes since the last call and update tracked state.
+
+        Args:
+            state: PlayState after a tick
+
+        Returns:
+            DELTA frame bytes, or None if nothing visible changed
+        """
+        self.tick = state.tick
+        self.board = (state.width, state.height, state.danger_line_y)
+        threshold = self.move_threshold
+
+        # Merges: parents leave the board, the result (if not delivered) spawns below
+        merges = []
+        for fruit_a, fruit_b, merged in state.last_merges:
+            if fruit_a not in self.tracked or fruit_b not in self.tracked:
+                continue
+            id_a = self._release(fruit_a)
+            id_b = self._release(fruit_b)
+            if merged.is_mikan():
+                id_new = DELIVERED_ID
+            else:
+                id_new = self._allocate_id()
+                self.tracked[merged] = _TrackedFruit(
+                    id_new, merged.stage, int(merged.x), int(merged.y),
+                    LEVELS[merged.get_freshness_level()])
+            merges.append(MERGE.pack(id_a, id_b, id_new))
+
+        current = set(state.fruits)
+        removes = [REMOVE.pack(self._release(f)) for f in list(self.tracked)
+                   if f not in current]
+
+        spawns = []
+        moves = []
+        levels = []
+        for fruit in state.fruits:
+            x = int(fruit.x)
+            y = int(fruit.y)
+            level = LEVELS[fruit.get_freshness_level()]
+            tracked = self.tracked.get(fruit)
+
+            if tracked is None:
+                tracked = _TrackedFruit(self._allocate_id(), fruit.stage, x, y, level)
+                self.tracked[fruit] = tracked
+                spawns.append(FRUIT.pack(tracked.fid, tracked.stage, x, y, level))
+                continue
+
+            if tracked.x != x or tracked.y != y:
+                if abs(tracked.x - x) >= threshold or abs(tracked.y - y) >= threshold:
+                    tracked.x = x
+                    tracked.y = y
+                    moves.append(MOVE.pack(tracked.fid, x, y))
+
+            if tracked.level != level:
+                tracked.level = level
+                levels.append(LEVEL.pack(tracked.fid, level))
+
+        # Merged fruits tracked above are new to spectators too
+        for fruit_a, fruit_b, merged in state.last_merges:
+            tracked = self.tracked.get(merged)
+            if tracked is not None and merged in current:
+                spawns.append(FRUIT.pack(tracked.fid, tracked.stage, tracked.x,
+                                         tracked.y, tracked.level))
+
+        flags = 0
+        extra = b""
+        status = self._status_of(state)
+        if status != self.status:
+            self.status = status
+            flags |= FLAG_STATUS
+            extra += STATUS.pack(*status)
+        next_info = self._next_of(state)
+        if next_info != self.next_info:
+            self.next_info = next_info
+            flags |= FLAG_NEXT
+            extra += NEXT.pack(*next_info)
+
+        if not (flags or spawns or moves or levels or removes or merges):
+            return None
+
+        body = b"".join((
+            DELTA_COUNTS.pack(flags, len(spawns), len(moves), len(levels),
+                              len(removes), len(merges)),
+            extra,
+            *spawns, *moves, *levels, *removes, *merges,
+        ))
+        return FRAME_HEADER.pack(len(body), MSG_DELTA, self.tick) + body
+
+    def encode_keyframe(self) -> bytes:
+        """Encode the full tracked state as a KEYFRAME frame."""
+        parts = [
+            BOARD.pack(*self.board),
+            STATUS.pack(*self.status),
+            NEXT.pack(*self.next_info),
+            COUNT.pack(len(self.tracked)),
+        ]
+        parts.extend(FRUIT.pack(t.fid, t.stage, t.x, t.y, t.level)
+                     for t in self.tracked.values())
+        body = b"".join(parts)
+        return FRAME_HEADER.pack(len(body), MSG_KEYFRAME, self.tick) + body
+
+
+class _Client:
+    """A connected spectator with its pending outbound bytes."""
+
+    __slots__ = ("sock", "pending")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.pending = bytearray()
+
+
+class LoopbackBroadcaster:
+    """Non-blocking stream server on a loopback TCP port or Unix socket."""
+
+    # Spectators further behind than this are dropped (they can reconnect)
+    MAX_PENDING = 256 * 1024
+
+    def __init__(self, address: str):
+        """
+        Start listening.
+
+        Args:
+            address: Stream address (see parse_address)
+        """
+        family, sock_addr = parse_address(address)
+        self.server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(sock_addr)
+        self.server.listen(16)
+        self.server.setblocking(False)
+        self.clients: List[_Client] = []
+
+    def accept_new(self) -> List[_Client]:
+        """Accept pending connections and return the new clients."""
+        new_clients = []
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            sock.setblocking(False)
+            if sock.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            new_clients.append(_Client(sock))
+        return new_clients
+
+    def add(self, client: _Client) -> None:
+        """Start broadcasting to a client."""
+        self.clients.append(client)
+
+    def send(self, client: _Client, data: bytes) -> bool:
+        """
+        Queue data for one client and send as much as possible.
+
+        Returns:
+            False if the client was disconnected
+        """
+        if client.pending:
+            client.pending += data
+            data = client.pending
+        try:
+            sent = client.sock.send(data)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self._drop(client)
+            return False
+
+        remaining = data[sent:]
+        if len(remaining) > self.MAX_PENDING:
+            self._drop(client)
+            return False
+        client.pending = bytearray(remaining)
+        return True
+
+    def broadcast(self, data: bytes) -> None:
+        """Send the same bytes to every client."""
+        for client in list(self.clients):
+            self.send(client, data)
+
+    def flush(self) -> None:
+        """Retry sending pending bytes."""
+        for client in list(self.clients):
+            if client.pending:
+                self.send(client, b"")
+
+    def _drop(self, client: _Client) -> None:
+        """Disconnect a client."""
+        if client in self.clients:
+            self.clients.remove(client)
+        client.sock.close()
+
+    def close(self) -> None:
+        """Disconnect everyone and stop listening."""
+        for client in list(self.clients):
+            self._drop(client)
+        self.server.close()
+
+
+class StatePublisher:
+    """Publishes per-tick deltas and periodic keyframes to spectators."""
+
+    def __init__(self, transport: LoopbackBroadcaster, keyframe_interval: int = 90,
+                 move_threshold: int = 1):
+        """
+        Initialize publisher.
+
+        Args:
+            transport: Broadcaster to send frames through
+            keyframe_interval: Ticks between keyframes (resync for lossy viewers)
+            move_threshold: Minimum movement (pixels) before a move is sent
+        """
+        self.transport = transport
+        self.keyframe_interval = keyframe_interval
+        self.encoder = StateDeltaEncoder(move_threshold)
+        self._last_tick = -1
+        self._last_keyframe_tick = 0
+
+    def publish(self, state) -> None:
+        """
+        Publish the state after a tick.
+
+        Args:
+            state: PlayState that just stepped
+        """
+        # A new game started: resync everyone
+        force_keyframe = state.tick < self._last_tick
+        if force_keyframe:
+            self.encoder.reset()
+        self._last_tick = state.tick
+
+        delta = self.encoder.encode_delta(state)
+
+        if force_keyframe or state.tick - self._last_keyframe_tick >= self.keyframe_interval:
+            self._last_keyframe_tick = state.tick
+            self.transport.broadcast(self.encoder.encode_keyframe())
+        elif delta is not None:
+            self.transport.broadcast(delta)
+        else:
+            self.transport.flush()
+
+        # Late joiners start from a keyframe of the state just published
+        new_clients = self.transport.accept_new()
+        if new_clients:
+            keyframe = self.encoder.encode_keyframe()
+            for client in new_clients:
+                self.transport.add(client)
+                self.transport.send(client, keyframe)
+
+    def close(self) -> None:
+        """Stop publishing."""
+        self.transport.close()
+
+
+class BoardMirror:
+    """Spectator-side reconstruction of the published board."""
+
+    def __init__(self):
+        """Initialize empty mirror."""
+        self.synced = False
+        self.tick = 0
+        self.width = 0
+        self.height = 0
+        self.danger_line_y = 0
+        self.score = 0
+        self.delivered = 0
+        self.rotten = 0
+        self.danger_ms = -1
+        self.next_stage = -1
+        self.next_x = 0
+        self.next_fresh = 0
+        # id -> [stage, x, y, level]
+        self.fruits: Dict[int, list] = {}
+        # Positions of merges/deliveries seen in the last message
+        self.recent_merges: List[Tuple[int, int, bool]] = []
+
+    def apply(self, msg_type: int, tick: int, body: bytes) -> None:
+        """
+        Apply one decoded frame.
+
+        Args:
+            msg_type: MSG_KEYFRAME or MSG_DELTA
+            tick: Tick number of the frame
+            body: Frame body
+        """
+        if msg_type == MSG_KEYFRAME:
+            self._apply_keyframe(body)
+        elif msg_type == MSG_DELTA and self.synced:
+            self._apply_delta(body)
+        self.tick = tick
+
+    def _apply_keyframe(self, body: bytes) -> None:
+        """Replace the mirror with a keyframe."""
+        offset = 0
+        self.width, self.height, self.danger_line_y = BOARD.unpack_from(body, offset)
+        offset += BOARD.size
+        self.score, self.delivered, self.rotten, self.danger_ms = STATUS.unpack_from(body, offset)
+        offset += STATUS.size
+        self.next_stage, self.next_x, self.next_fresh = NEXT.unpack_from(body, offset)
+        offset += NEXT.size
+        (count,) = COUNT.unpack_from(body, offset)
+        offset += COUNT.size
+
+        self.fruits = {}
+        for fid, stage, x, y, level in FRUIT.iter_unpack(body[offset:offset + count * FRUIT.size]):
+            self.fruits[fid] = [stage, x, y, level]
+        self.recent_merges = []
+        self.synced = True
+
+    def _apply_delta(self, body: bytes) -> None:
+        """Apply a delta frame."""
+        offset = 0
+        flags, n_spawn, n_move, n_level, n_remove, n_merge = DELTA_COUNTS.unpack_from(body, offset)
+        offset += DELTA_COUNTS.size
+
+        if flags & FLAG_STATUS:
+            self.score, self.delivered, self.rotten, self.danger_ms = STATUS.unpack_from(body, offset)
+            offset += STATUS.size
+        if flags & FLAG_NEXT:
+            self.next_stage, self.next_x, self.next_fresh = NEXT.unpack_from(body, offset)
+            offset += NEXT.size
+
+        fruits = self.fruits
+        spawn_end = offset + n_spawn * FRUIT.size
+        spawned = list(FRUIT.iter_unpack(body[offset:spawn_end]))
+        offset = spawn_end
+
+        for _ in range(n_move):
+            fid, x, y = MOVE.unpack_from(body, offset)
+            offset += MOVE.size
+            fruit = fruits.get(fid)
+            if fruit is not None:
+                fruit[1] = x
+                fruit[2] = y
+        for _ in range(n_level):
+            fid, level = LEVEL.unpack_from(body, offset)
+            offset += LEVEL.size
+            fruit = fruits.get(fid)
+            if fruit is not None:
+                fruit[3] = level
+        for _ in range(n_remove):
+            (fid,) = REMOVE.unpack_from(body, offset)
+            offset += REMOVE.size
+            fruits.pop(fid, None)
+
+        self.recent_merges = []
+        for _ in range(n_merge):
+            id_a, id_b, id_new = MERGE.unpack_from(body, offset)
+            offset += MERGE.size
+            fruit_a = fruits.pop(id_a, None)
+            fruit_b = fruits.pop(id_b, None)
+            if fruit_a and fruit_b:
+                self.recent_merges.append(((fruit_a[1] + fruit_b[1]) // 2,
+                                           (fruit_a[2] + fruit_b[2]) // 2,
+                                           id_new == DELIVERED_ID))
+
+        # Spawns last: merged fruits may reuse ids released by the same delta
+        for fid, stage, x, y, level in spawned:
+            fruits[fid] = [stage, x, y, level]
+
+
+class SpectatorClient:
+    """Non-blocking connection to a StatePublisher feeding a BoardMirror."""
+
+    RECV_SIZE = 65536
+
+    def __init__(self, address: str):
+        """
+        Connect to a stream.
+
+        Args:
+            address: Stream address (see parse_address)
+        """
+        family, sock_addr = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(sock_addr)
+        self.sock.setblocking(False)
+        self.buffer = bytearray()
+        self.mirror = BoardMirror()
+        self.connected = True
+
+    def poll(self) -> int:
+        """
+        Read everything available and apply complete frames.
+
+        Returns:
+            Number of frames applied
+        """
+        if not self.connected:
+            return 0
+
+        while True:
+            try:
+                chunk = self.sock.recv(self.RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                chunk = b""
+            if not chunk:
+                self.close()
+                break
+            self.buffer += chunk
+
+        applied = 0
+        buffer = self.buffer
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            length, msg_type, tick = FRAME_HEADER.unpack_from(buffer, offset)
+            end = offset + FRAME_HEADER.size + length
+            if end > len(buffer):
+                break
+            self.mirror.apply(msg_type, tick, bytes(buffer[offset + FRAME_HEADER.size:end]))
+            offset = end
+            applied += 1
+        if offset:
+            del buffer[:offset]
+        return applied
+
+    def close(self) -> None:
+        """Disconnect."""
+        self.connected = False
+        self.sock.close()
+
@@ -0,0 +1,46 @@
+"""Compiled fruit ladder (stage table) built from the config."""
+from typing import List
+from game.config import game_config
+
+
+class StageTable:
+    """Per-stage values precomputed from the ``fruits``, ``freshness`` and ``board`` config."""
+
+    def __init__(self):
+        """Compile the table from the current config."""
+        fruits = game_config.get("fruits")
+
+        self.num_stages = len(fruits)
+        self.final_stage = self.num_stages - 1  # mikan: delivered on creation
+
+        self.names: List[str] = [f["name"] for f in fruits]
+        self.display_names: List[str] = [f["display_name"] for f in fruits]
+        self.radii: List[float] = [f["radius"] for f in fruits]
+        self.colors: List[int] = [f["color"] for f in fruits]
+        self.max_radius = max(self.radii)
+
+        # Higher stages decay faster
+        decay_base = game_config.get("freshness", "decay_base", default=2.0)
+        decay_mult = game_config.get("freshness", "decay_stage_mult", default=1.2)
+        self.decay_rates: List[float] = [decay_base * (decay_mult ** stage)
+                                         for stage in range(self.num_stages)]
+
+        # Spawnable stages (never the final stage)
+        spawn_min = game_config.get("board", "spawn_stage_min", default=0)
+        spawn_max = game_config.get("board", "spawn_stage_max", default=2)
+        self.spawn_stage_min = max(0, min(spawn_min, self.final_stage - 1))
+        self.spawn_stage_max = max(self.spawn_stage_min, min(spawn_max, self.final_stage - 1))
+
+
+_table = None
+_table_revision = -1
+
+
+def stage_table() -> StageTable:
+    """Get the stage table, recompiling it whenever the config changed."""
+    global _table, _table_revision
+
+    if _table_revision != game_config.revision:
+        _table = StageTable()
+        _table_revision = game_config.revision
+    return _table
@@ -1,6 +1,9 @@
 """Beta adjustment UI panel for parameter tuning."""
 import pyxel
+from game import font
 from game.config import game_config
+from game.frame_cache import FrameCache
+from game.stages import stage_table
 
 
 class BetaPanel:
@@ -29,6 +32,9 @@ class BetaPanel:
             ("game_over", "grace_ms", "Grace (ms)", 1000, 10000, 500),
         ]
 
+        # Panel contents only change with the selection or a config value
+        self.frame = None  # FrameCache, created on first draw
+
     def toggle(self) -> None:
         """Toggle panel visibility."""
         self.visible = not self.visible
@@ -55,7 +61,8 @@ class BetaPanel:
             else:
                 new_val = min(max_val, current + step)
 
-            game_config.set(category, key, value=new_val)
+            if new_val != current:
+                game_config.set(category, key, value=new_val)
 
     def draw(self, screen_width: int, screen_height: int) -> None:
         """
@@ -68,13 +75,28 @@ class BetaPanel:
         if not self.visible:
             return
 
+        if self.frame is None:
+            self.frame = FrameCache(screen_width - 10, screen_height - 10, self._render)
+        self.frame.draw(5, 5, key=(self.scroll, game_config.revision))
+
+    def _render(self, panel: pyxel.Image) -> None:
+        """
+        Render the panel contents.
+
+        Args:
+            panel: Image covering the panel area (screen position 5, 5)
+        """
+        screen_width = panel.width + 10
+        screen_height = panel.height + 10
+        panel.camera(5, 5)  # Draw using screen coordinates
+
         # Draw semi-transparent background
-        pyxel.rect(5, 5, screen_width - 10, screen_height - 10, 1)
-        pyxel.rectb(5, 5, screen_width - 10, screen_height - 10, 7)
+        panel.rect(5, 5, screen_width - 10, screen_height - 10, 1)
+        panel.rectb(5, 5, screen_width - 10, screen_height - 10, 7)
 
         # Title
-        pyxel.text(10, 10, "BETA PANEL (F1:Close F5:Save F9:Reset)", 7)
-        pyxel.text(10, 18, "UP/DOWN: Select  LEFT/RIGHT: Adjust", 6)
+        panel.text(10, 10, "BETA PANEL (F1:Close F5:Save F9:Reset)", 7)
+        panel.text(10, 18, "UP/DOWN: Select  LEFT/RIGHT: Adjust", 6)
 
         # Draw parameters
         y = 30
@@ -91,11 +113,11 @@ class BetaPanel:
                 value_str = str(value)
 
             text = f"{label}: {value_str}"
-            pyxel.text(15, y, text, color)
+            panel.text(15, y, text, color)
 
             # Show range
             range_text = f"[{min_val}-{max_val}]"
-            pyxel.text(140, y, range_text, 5)
+            panel.text(140, y, range_text, 5)
 
             y += 8
 
@@ -103,13 +125,18 @@ class BetaPanel:
                 break
 
         # Instructions at bottom
-        pyxel.text(10, screen_height - 15, "F5: Save Config", 11)
-        pyxel.text(100, screen_height - 15, "F9: Reset to Default", 8)
+        panel.text(10, screen_height - 15, "F5: Save Config", 11)
+        panel.text(100, screen_height - 15, "F9: Reset to Default", 8)
+        panel.camera()
 
 
 class HUD:
     """Heads-up display for game info."""
 
+    # Score panel lines, re-formatted only when the tracker or config changes
+    _score_lines_key = None
+    _score_lines = []
+
     @staticmethod
     def draw_freshness_indicator(x: float, y: float, fresh: float,
                                  fresh_max: float, show_value: bool) -> None:
@@ -136,7 +163,7 @@ class HUD:
 
         if show_value:
             # Show numeric value (before dropping)
-            pyxel.text(x - 8, y - 10, f"{int(fresh)}", color)
+            font.text(x - 8, y - 10, f"{int(fresh)}", color)
         else:
             # Show visual indicator only (after dropping)
             # Draw small sparkles for high freshness
@@ -145,6 +172,27 @@ class HUD:
                 pyxel.pset(x + 3, y - 5, 7)
                 pyxel.pset(x, y - 7, 7)
 
+    @staticmethod
+    def draw_spawn_preview(x: int, y: int, upcoming: list) -> None:
+        """
+        Draw the upcoming spawns as small fruit icons.
+
+        Args:
+            x, y: Top-left position
+            upcoming: (stage, fresh) pairs, soonest first
+        """
+        table = stage_table()
+        fresh_max = game_config.get("freshness", "fresh_max", default=100)
+
+        font.text(x, y + 3, "NEXT", 6)
+        icon_x = x + 22
+        for stage, fresh in upcoming:
+            radius = min(5, max(2, table.radii[stage] // 4))
+            pyxel.circ(icon_x, y + 5, radius, table.colors[stage])
+            # Value text sits 10px above/8px left of the given point: put it under the icon
+            HUD.draw_freshness_indicator(icon_x + 2, y + 22, fresh, fresh_max, True)
+            icon_x += 16
+
     @staticmethod
     def draw_score_panel(x: int, y: int, score_tracker) -> None:
         """
@@ -154,17 +202,35 @@ class HUD:
             x, y: Top-left position
             score_tracker: ScoreTracker instance
         """
+        key = (id(score_tracker), score_tracker.version, game_config.revision)
+        if key != HUD._score_lines_key:
+            HUD._score_lines = HUD._format_score_lines(score_tracker)
+            HUD._score_lines_key = key
+
         pyxel.rectb(x, y, 110, 55, 7)
+        for offset_y, text, color in HUD._score_lines:
+            font.text(x + 3, y + offset_y, text, color)
 
-        pyxel.text(x + 3, y + 3, "SCORE", 7)
-        pyxel.text(x + 3, y + 11, f"{score_tracker.get_score()}", 11)
+    @staticmethod
+    def _format_score_lines(score_tracker) -> list:
+        """
+        Format the score panel text.
 
-        pyxel.text(x + 3, y + 21, f"Delivered: {score_tracker.delivered_count}", 7)
-        pyxel.text(x + 3, y + 29, f"Rotten: {score_tracker.rotten_count}", 8)
+        Returns:
+            List of (y offset, text, color) tuples
+        """
+        lines = [
+            (3, "SCORE", 7),
+            (11, f"{score_tracker.get_score()}", 11),
+            (21, f"Delivered: {score_tracker.delivered_count}", 7),
+            (29, f"Rotten: {score_tracker.rotten_count}", 8),
+        ]
 
         fresh_eff = score_tracker.get_effective_fresh()
-        pyxel.text(x + 3, y + 37, f"Fresh: {int(fresh_eff)}", 10)
+        lines.append((37, f"Fresh: {int(fresh_eff)}", 10))
 
         if score_tracker.rotten_count > 0:
             damage = score_tracker.get_rot_damage_percent()
-            pyxel.text(x + 3, y + 45, f"Damage: -{damage:.1f}%", 8)
+            lines.append((45, f"Damage: -{damage:.1f}%", 8))
+
+        return lines
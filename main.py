@@ -5,12 +5,134 @@ Delivery! Wakayama Mikan (Beta)
 A fruit merging game with freshness and rot mechanics.
 Built with Pyxel.
 """
-from game.app import App
+import argparse
+from game.config import game_config
+from game.memstats import GCPolicy, parse_thresholds
+
+ARENA_CONFIG_PATH = "config/arena_config.json"
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Wakayama Mikan Delivery (Beta)")
+    parser.add_argument("--config", metavar="PATH",
+                        help="load game config from PATH instead of config/game_config.json")
+    parser.add_argument("--arena", action="store_true",
+                        help=f"stress/arena mode (shortcut for --config {ARENA_CONFIG_PATH})")
+    parser.add_argument("--stream", metavar="ADDRESS",
+                        help="publish live play for spectators (HOST:PORT, PORT or unix:/path)")
+    parser.add_argument("--spectate", metavar="ADDRESS",
+                        help="watch a game published with --stream")
+    parser.add_argument("--event-log", metavar="PATH",
+                        help="log gameplay events to PATH (.jsonl, or .bin for binary records)")
+    parser.add_argument("--versus", metavar="ADDRESS",
+                        help="host a lockstep versus match and wait for an opponent on ADDRESS")
+    parser.add_argument("--join", metavar="ADDRESS",
+                        help="join a versus match hosted with --versus")
+    parser.add_argument("--seed", type=int,
+                        help="spawn sequence seed (versus host, or first headless game)")
+    parser.add_argument("--input-delay", type=int, default=3, metavar="TICKS",
+                        help="versus input delay in ticks (host only)")
+    parser.add_argument("--physics-worker", action="store_true",
+                        help="simulate the board in a separate process (large arena boards)")
+    parser.add_argument("--headless", type=int, metavar="GAMES",
+                        help="play GAMES bot games without a window and print a summary")
+    parser.add_argument("--max-ticks", type=int, default=5400,
+                        help="headless and --bot: ship out after this many ticks")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="headless: sample stacks into PREFIX.folded and PREFIX.txt")
+    parser.add_argument("--profile-interval", type=float, default=0.005, metavar="SECONDS",
+                        help="headless: seconds between profiler samples")
+    parser.add_argument("--settle", action="store_true",
+                        help="headless: skip to the next rest state after each drop (approximate)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="headless: worker processes to spread the games over")
+    parser.add_argument("--metrics", metavar="ADDRESS",
+                        help="headless: serve Prometheus metrics on http://ADDRESS/metrics")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="headless: rewrite Prometheus metrics to PATH every few seconds")
+    parser.add_argument("--mem-stats", action="store_true",
+                        help="report allocations/collections per frame and memory growth per scene")
+    parser.add_argument("--gc-freeze", action="store_true",
+                        help="gc.freeze() long-lived objects when a game starts")
+    parser.add_argument("--gc-threshold", type=parse_thresholds, metavar="T0[,T1[,T2]]",
+                        help="collector thresholds while a game is played")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="append every game to a seekable replay archive (headless too)")
+    parser.add_argument("--bot", action="store_true",
+                        help="watch the bot play in the window (keys 1-4: 1x/2x/4x/16x speed)")
+    parser.add_argument("--replay", nargs=2, metavar=("ARCHIVE", "SESSION"),
+                        help="watch a recorded session from a replay archive")
+    parser.add_argument("--build-assets", action="store_true",
+                        help="pack assets/sprites and assets/sfx into the asset bundle and exit")
+    parser.add_argument("--load-times", action="store_true",
+                        help="print startup and scene switch times")
+    args = parser.parse_args(argv)
+    if args.headless:
+        if args.workers > 1 and (args.profile or args.mem_stats or args.archive):
+            parser.error("--profile, --mem-stats and --archive need --workers 1")
+        if args.settle and args.archive:
+            parser.error("--archive can't be combined with --settle")
+    elif not args.build_assets:
+        if args.physics_worker and args.stream:
+            parser.error("--stream needs the local board (can't be combined with --physics-worker)")
+        if args.physics_worker and args.archive:
+            parser.error("--archive needs the local board (can't be combined with --physics-worker)")
+        if args.physics_worker and (args.bot or args.replay):
+            parser.error("--bot and --replay need the local board "
+                         "(can't be combined with --physics-worker)")
+        if args.replay and (args.bot or args.archive):
+            parser.error("--replay can't be combined with --bot or --archive")
+    return args
 
 
 def main():
     """Entry point for the game."""
-    app = App()
+    args = parse_args()
+    if args.arena:
+        game_config.load(ARENA_CONFIG_PATH)
+    elif args.config:
+        game_config.load(args.config)
+
+    gc_policy = None
+    if args.gc_freeze or args.gc_threshold:
+        gc_policy = GCPolicy(freeze=args.gc_freeze, thresholds=args.gc_threshold)
+
+    if args.build_assets:
+        from game.asset_bundle import BUNDLE_PATH, build_bundle
+        built, reused, removed = build_bundle(
+            bundle_path=game_config.get("assets", "bundle", default=BUNDLE_PATH))
+        print(f"Asset bundle: {built} built, {reused} unchanged, {removed} removed")
+        return
+
+    if args.headless:
+        from game.headless import run  # no Pyxel needed
+        run(args.headless, args.max_ticks, args.seed or 0, args.profile, args.profile_interval,
+            args.mem_stats, gc_policy, args.settle, args.workers, args.metrics, args.metrics_file,
+            args.archive)
+        return
+
+    from game.app import App
+    from game.lockstep import LockstepLink
+
+    autoplay = None
+    if args.bot:
+        from game.bots import GreedyBot
+        autoplay = GreedyBot(args.seed, think_ticks=15, ship_after=args.max_ticks)
+    elif args.replay:
+        from game.replay_archive import ReplayArchive, ReplayPlayer
+        path, session = args.replay
+        autoplay = ReplayPlayer(ReplayArchive(path), int(session))  # Switches to its config
+
+    versus = None
+    if args.versus or args.join:
+        versus = LockstepLink(args.versus or args.join, host=bool(args.versus),
+                              seed=args.seed, input_delay=args.input_delay)
+
+    app = App(stream=args.stream, spectate=args.spectate, event_log=args.event_log,
+              versus=versus, mem_stats=args.mem_stats, gc_policy=gc_policy,
+              physics_worker=args.physics_worker, load_times=args.load_times,
+              archive=args.archive, autoplay=autoplay)
     app.run()
 
 